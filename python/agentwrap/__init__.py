@@ -10,7 +10,7 @@ __version__ = "0.1.0"
 from .agent import BaseAgent, JSONExtractor, StructuredOutputParser, create_structured_prompt
 
 # Agent implementations
-from .agents import CodexAgent
+from .agents import CodexAgent, CodexProcessPool
 
 # Server
 from .base_server import BaseServer
@@ -45,6 +45,7 @@ __all__ = [
     # Agent
     "BaseAgent",
     "CodexAgent",
+    "CodexProcessPool",
     # Server
     "BaseServer",
     "OpenAICompatibleServer",
@@ -1,10 +1,11 @@
 """Base agent interface and implementations."""
 
+import asyncio
 import json
 import os
 import re
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Iterator, List, Optional, Union
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
 
 from jsonschema import ValidationError, validate
 
@@ -232,6 +233,44 @@ class BaseAgent(ABC):
         """
         pass
 
+    async def arun(
+        self,
+        agent_input: Union[AgentInput, str],
+        config_overrides: Optional[AllAgentConfigs] = None,
+    ) -> AsyncIterator[Event]:
+        """
+        Execute agent with streaming output without blocking the event loop.
+
+        The default implementation drives the synchronous run() iterator in
+        the default executor, one event at a time. Subclasses that can spawn
+        their work natively on asyncio should override this.
+
+        Args:
+            agent_input: AgentInput object or string query
+            config_overrides: Optional runtime configuration overrides
+
+        Yields:
+            Event objects (reasoning, tool_use, message, etc.)
+        """
+        loop = asyncio.get_running_loop()
+        iterator = iter(self.run(agent_input, config_overrides))
+        exhausted = object()
+
+        try:
+            while True:
+                event = await loop.run_in_executor(None, next, iterator, exhausted)
+                if event is exhausted:
+                    break
+                yield event
+        finally:
+            close = getattr(iterator, "close", None)
+            if close:
+                try:
+                    await loop.run_in_executor(None, close)
+                except ValueError:
+                    # Generator is still executing in the worker thread
+                    pass
+
     def run_structured(
         self,
         agent_input: Union[AgentInput, str],
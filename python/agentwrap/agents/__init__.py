@@ -1,5 +1,6 @@
 """Agent implementations."""
 
 from .codex_agent import CodexAgent
+from .codex_pool import CodexProcessPool
 
-__all__ = ["CodexAgent"]
+__all__ = ["CodexAgent", "CodexProcessPool"]
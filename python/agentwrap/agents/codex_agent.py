@@ -1,15 +1,36 @@
 """CodexAgent implementation using OpenAI Codex CLI."""
 
+import asyncio
+import hashlib
 import json
 import os
 import re
+import secrets
 import shutil
+import signal
 import subprocess
+import tempfile
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterator, List, Optional, Union
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Set, Tuple, Union
 
 import toml
 
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, writes are still atomic
+    fcntl = None
+
+try:
+    import msgspec
+except ImportError:  # Optional: codex events are decoded to dicts instead
+    msgspec = None
+
+from .. import jsoncodec
 from ..agent import BaseAgent
 from ..config import (
     AgentInput,
@@ -21,8 +42,8 @@ from ..config import (
 )
 from ..events import (
     CommandExecutionEvent,
+    ErrorEvent,
     Event,
-    EventType,
     MessageEvent,
     ReasoningEvent,
     SkillInvokedEvent,
@@ -30,6 +51,43 @@ from ..events import (
     TurnCompletedEvent,
     TurnStartedEvent,
 )
+from .codex_pool import CodexProcessPool
+
+
+if msgspec is not None:
+
+    class _CodexItem(msgspec.Struct):
+        """Typed codex `item` (defaults match _parse_event's dict defaults)."""
+
+        type: Optional[str] = None
+        id: Optional[str] = None
+        text: str = ""
+        command: str = ""
+        aggregated_output: str = ""
+        exit_code: Optional[int] = None
+        status: Optional[str] = None
+        server: str = ""
+        tool: str = ""
+
+    class _CodexEvent(msgspec.Struct):
+        """Typed codex JSONL event; unknown fields are skipped while decoding."""
+
+        type: Optional[str] = None
+        thread_id: str = ""
+        item: Optional[_CodexItem] = None
+        usage: Optional[Dict[str, Any]] = msgspec.field(default_factory=dict)
+
+    # Decodes JSONL bytes straight into structs, without intermediate dicts
+    _codex_event_decoder = msgspec.json.Decoder(_CodexEvent)
+else:
+    _codex_event_decoder = None
+
+
+def _field(data: Any, name: str, default: Any = None) -> Any:
+    """Read a field of a codex event or item decoded as a dict or a typed struct."""
+    if isinstance(data, dict):
+        return data.get(name, default)
+    return getattr(data, name, default)
 
 
 # Codex configuration paths
@@ -38,6 +96,43 @@ CODEX_SKILLS_DIR = CODEX_DIR / "skills"
 CODEX_CONFIG_PATH = CODEX_DIR / "config.toml"
 CODEX_AUTH_PATH = CODEX_DIR / "auth.json"
 
+# Private CODEX_HOME directories for agents with isolated_home enabled
+CODEX_HOMES_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "agentwrap" / "codex-homes"
+)
+
+# Homes materialized by this process (config hash -> path)
+_codex_homes: Dict[str, Path] = {}
+_codex_homes_lock = threading.Lock()
+
+# Seconds a terminated codex process group gets before SIGKILL
+TERMINATE_GRACE_SECONDS = 5.0
+
+# SIGKILL does not exist on Windows, where SIGTERM already kills outright
+_KILL_SIGNAL = getattr(signal, "SIGKILL", signal.SIGTERM)
+
+# Background tasks reaping terminated codex processes
+_reaper_tasks: Set[asyncio.Task] = set()
+
+# Bytes of codex stderr kept for the ErrorEvent (older output is dropped)
+STDERR_TAIL_BYTES = 64 * 1024
+
+# Seconds to wait for stderr EOF after codex exits (grandchildren may hold it open)
+STDERR_DRAIN_SECONDS = 1.0
+
+# Max JSONL line length for the asyncio reader (command outputs are inlined)
+STREAM_LINE_LIMIT = 16 * 1024 * 1024
+
+# Prompt argument telling `codex exec` to read the prompt from stdin
+STDIN_PROMPT = "-"
+
+# Prompts larger than this (UTF-8 bytes) are sent over stdin instead of argv:
+# Linux caps a single argument at 128 KiB (MAX_ARG_STRLEN) and fails exec with E2BIG
+STDIN_PROMPT_THRESHOLD = 32 * 1024
+
+# Marker in each installed skill recording the source it was built from
+SKILL_MARKER_NAME = ".agentwrap-skill.json"
+
 
 class CodexAgent(BaseAgent):
     """
@@ -47,9 +142,19 @@ class CodexAgent(BaseAgent):
     event-based execution with skills support.
     """
 
-    def __init__(self):
-        """Initialize Codex agent."""
+    def __init__(self, process_pool: Optional[CodexProcessPool] = None):
+        """
+        Initialize Codex agent.
+
+        Args:
+            process_pool: Optional warm process pool used by arun()
+        """
         super().__init__()
+        self.process_pool = process_pool
+        # Private CODEX_HOME (set by configure() when isolated_home is enabled)
+        self.codex_home: Optional[Path] = None
+        # Codex executable found by check_prerequisites() (None = not resolved yet)
+        self.codex_path: Optional[str] = None
 
     def configure(
         self,
@@ -116,14 +221,21 @@ class CodexAgent(BaseAgent):
         # Configure API key if provided or from environment variable
         agent_config = all_configs.agent_config
         api_key = agent_config.api_key or os.environ.get("OPENAI_API_KEY")
-        if api_key:
-            _configure_codex_auth(api_key, verbose=verbose)
 
-        # Install skills
-        install_codex_skills(all_configs, verbose=verbose)
+        if agent_config.isolated_home:
+            # Auth and skills go into a private CODEX_HOME for this config
+            self.codex_home = _materialize_codex_home(all_configs, api_key, verbose=verbose)
+        else:
+            self.codex_home = None
+            if api_key:
+                _configure_codex_auth(api_key, verbose=verbose)
+
+            # Install skills
+            install_codex_skills(all_configs, verbose=verbose)
 
-        # Store config
+        # Store config (codex is resolved again for it)
         self.config = all_configs
+        self.codex_path = None
 
         # Print config summary if verbose
         if verbose:
@@ -135,10 +247,25 @@ class CodexAgent(BaseAgent):
         """
         Check if codex CLI is available.
 
+        Resolves the codex executable once (`codex_path` from the config, or
+        a PATH lookup) and caches it in `self.codex_path`; later calls return
+        immediately.
+
         Raises:
-            RuntimeError: If codex CLI is not found in PATH
+            RuntimeError: If codex CLI is not found in PATH (or at codex_path)
         """
-        if not shutil.which("codex"):
+        if self.codex_path is not None:
+            return
+
+        pinned = self._get_effective_config(None).codex_path
+        if pinned:
+            if not os.access(pinned, os.X_OK):
+                raise RuntimeError(f"Codex CLI not found at codex_path: {pinned}")
+            self.codex_path = pinned
+            return
+
+        resolved = shutil.which("codex")
+        if not resolved:
             error_msg = """
 ╔══════════════════════════════════════════════════════════════╗
 ║  Codex CLI not found!                                        ║
@@ -157,6 +284,14 @@ Node.js CLI tools. You need to install Codex globally.
 """
             raise RuntimeError(error_msg)
 
+        self.codex_path = os.path.abspath(resolved)
+
+    def _recheck_prerequisites(self) -> None:
+        """Resolve codex again after spawning the cached path failed with ENOENT."""
+        print(f"[CodexAgent] Codex not found at {self.codex_path}, resolving it again")
+        self.codex_path = None
+        self.check_prerequisites()
+
     def run(
         self,
         agent_input: Union[AgentInput, str],
@@ -177,53 +312,296 @@ Node.js CLI tools. You need to install Codex globally.
         # Check prerequisites (codex CLI availability)
         self.check_prerequisites()
 
-        # Normalize input (convert string to AgentInput if needed)
-        normalized_input = self._normalize_input(agent_input)
-
-        # Merge config with overrides
-        effective_config = self._get_effective_config(config_overrides)
-
-        # Build prompt from messages
-        prompt = self._build_prompt_from_messages(normalized_input.messages)
+        config, prompt, thread_id, mcp_args, mcp_env = self._prepare_run(
+            agent_input, config_overrides
+        )
+        prompt_via_stdin = _prompt_via_stdin(prompt)
 
-        # Build command
-        cmd = self._build_command(effective_config, prompt)
+        def spawn() -> subprocess.Popen:
+            cmd = self._build_command(
+                config, STDIN_PROMPT if prompt_via_stdin else prompt, thread_id, mcp_args=mcp_args
+            )
+            return subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE if prompt_via_stdin else None,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                # codex reads and writes UTF-8 whatever the locale
+                text=True,
+                encoding="utf-8",
+                bufsize=1,
+                env=self._process_env(mcp_env),
+                start_new_session=True,
+            )
 
         # Execute and stream
-        process = subprocess.Popen(
-            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1
+        try:
+            process = spawn()
+        except FileNotFoundError:
+            self._recheck_prerequisites()
+            process = spawn()
+
+        if prompt_via_stdin:
+            # Write from a thread: codex may start writing output before it has read it all
+            threading.Thread(
+                target=_write_prompt_sync, args=(process.stdin, prompt), daemon=True
+            ).start()
+
+        # Drain stderr on a thread so a chatty codex cannot fill the pipe and stall
+        stderr_tail = _StderrTail()
+        stderr_thread = threading.Thread(
+            target=_pump_stderr, args=(process.stderr, stderr_tail), daemon=True
         )
+        stderr_thread.start()
 
         try:
             for line in process.stdout:
-                if not line.strip():
-                    continue
-
-                try:
-                    event_data = json.loads(line)
-                    event = self._parse_event(event_data)
-                    if event:
-                        yield event
-                except json.JSONDecodeError:
-                    # Log but continue on malformed JSON
-                    continue
+                event = self._decode_line(line)
+                if event:
+                    yield event
 
             process.wait()
+            stderr_thread.join(STDERR_DRAIN_SECONDS)
 
             # Check for errors
             if process.returncode != 0:
-                stderr = process.stderr.read()
-                if stderr:
-                    yield Event(
-                        type=EventType.ERROR,
-                        content=f"Codex execution failed: {stderr}",
-                    )
+                error = stderr_tail.error_event(process.returncode)
+                if error:
+                    yield error
 
         finally:
-            # Ensure process is terminated
+            # Ensure process is terminated, along with anything it spawned
             if process.poll() is None:
-                process.terminate()
-                process.wait(timeout=5)
+                _signal_process_group(process, signal.SIGTERM)
+                try:
+                    process.wait(timeout=TERMINATE_GRACE_SECONDS)
+                except subprocess.TimeoutExpired:
+                    _signal_process_group(process, _KILL_SIGNAL)
+                    process.wait()
+
+    async def arun(
+        self,
+        agent_input: Union[AgentInput, str],
+        config_overrides: Optional[AllAgentConfigs] = None,
+    ) -> AsyncIterator[Event]:
+        """
+        Execute codex on the running event loop with streaming JSONL events.
+
+        Same contract as run(), but the codex process is spawned with
+        asyncio subprocesses so concurrent callers share one event loop
+        instead of blocking it.
+
+        Args:
+            agent_input: AgentInput object or string query
+            config_overrides: Optional runtime configuration overrides
+
+        Yields:
+            Event objects parsed from codex JSONL output
+        """
+        # Check prerequisites (codex CLI availability)
+        self.check_prerequisites()
+
+        config, prompt, thread_id, mcp_args, mcp_env = self._prepare_run(
+            agent_input, config_overrides
+        )
+
+        # Execute and stream
+        process = await self._spawn_async(config, prompt, thread_id, mcp_args, mcp_env)
+
+        # Read stderr alongside stdout so neither pipe can fill up
+        stderr_tail = _StderrTail()
+        stderr_task = asyncio.ensure_future(_apump_stderr(process.stderr, stderr_tail))
+
+        try:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+
+                event = self._decode_line(line)
+                if event:
+                    yield event
+
+            await process.wait()
+            await asyncio.wait({stderr_task}, timeout=STDERR_DRAIN_SECONDS)
+
+            # Check for errors
+            if process.returncode != 0:
+                error = stderr_tail.error_event(process.returncode)
+                if error:
+                    yield error
+
+        finally:
+            # Ensure process is terminated without holding up the caller:
+            # signal the whole process group and reap it in the background
+            if process.returncode is None:
+                _terminate_process_group(process)
+            if not stderr_task.done():
+                stderr_task.cancel()
+
+    async def prewarm(self) -> None:
+        """
+        Park warm codex processes for the configured command.
+
+        No-op unless the agent was created with a process pool.
+        """
+        if self.process_pool is None:
+            return
+
+        cmd = self._build_command(self._get_effective_config(None), STDIN_PROMPT)
+        await self.process_pool.prewarm(cmd, self._process_env())
+
+    async def _spawn_async(
+        self,
+        config: CodexAgentConfig,
+        prompt: str,
+        thread_id: Optional[str] = None,
+        mcp_args: Tuple[str, ...] = (),
+        mcp_env: Optional[Dict[str, str]] = None,
+    ) -> asyncio.subprocess.Process:
+        """Spawn codex for one run, resolving codex again if its cached path is gone."""
+        try:
+            return await self._spawn_codex(config, prompt, thread_id, mcp_args, mcp_env)
+        except FileNotFoundError:
+            self._recheck_prerequisites()
+            return await self._spawn_codex(config, prompt, thread_id, mcp_args, mcp_env)
+
+    async def _spawn_codex(
+        self,
+        config: CodexAgentConfig,
+        prompt: str,
+        thread_id: Optional[str] = None,
+        mcp_args: Tuple[str, ...] = (),
+        mcp_env: Optional[Dict[str, str]] = None,
+    ) -> asyncio.subprocess.Process:
+        """Spawn codex for one run, taking a warm process from the pool if set."""
+        env = self._process_env(mcp_env)
+
+        # Resumed threads and per-run MCP servers (e.g. a request's function
+        # endpoint) make the command line unique, so never pool them
+        if self.process_pool is None or thread_id or mcp_args:
+            prompt_via_stdin = _prompt_via_stdin(prompt)
+            process = await asyncio.create_subprocess_exec(
+                *self._build_command(
+                    config,
+                    STDIN_PROMPT if prompt_via_stdin else prompt,
+                    thread_id,
+                    mcp_args=mcp_args,
+                ),
+                stdin=asyncio.subprocess.PIPE if prompt_via_stdin else None,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=env,
+                limit=STREAM_LINE_LIMIT,
+                start_new_session=True,
+            )
+            if prompt_via_stdin:
+                try:
+                    await self._write_prompt(process, prompt)
+                except (BrokenPipeError, ConnectionResetError):
+                    # codex exited early; its exit code and stderr report why
+                    pass
+            return process
+
+        cmd = self._build_command(config, STDIN_PROMPT)
+        process = await self.process_pool.acquire(cmd, env)
+        try:
+            await self._write_prompt(process, prompt)
+        except (BrokenPipeError, ConnectionResetError):
+            # Warm process died while parked, retry on a fresh one
+            await process.wait()
+            process = await self.process_pool.spawn(cmd, env)
+            await self._write_prompt(process, prompt)
+
+        return process
+
+    def _process_env(
+        self, extra: Optional[Dict[str, str]] = None
+    ) -> Optional[Dict[str, str]]:
+        """
+        Environment for codex processes (None = inherit ours).
+
+        Args:
+            extra: Variables to add, e.g. the env of per-run MCP servers
+        """
+        if self.codex_home is None and not extra:
+            return None
+        env = {**os.environ, **(extra or {})}
+        if self.codex_home is not None:
+            env["CODEX_HOME"] = str(self.codex_home)
+        return env
+
+    async def _write_prompt(
+        self, process: asyncio.subprocess.Process, prompt: str
+    ) -> None:
+        """
+        Send the prompt to a codex process reading from stdin.
+
+        If writing fails other than on a closed pipe, e.g. because the run is
+        cancelled while a large prompt drains, the process group is
+        terminated: the caller never gets the process to clean it up.
+        """
+        try:
+            process.stdin.write(prompt.encode("utf-8"))
+            await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            raise
+        except BaseException:
+            if process.returncode is None:
+                _terminate_process_group(process)
+            raise
+        process.stdin.close()
+
+    def _prepare_run(
+        self,
+        agent_input: Union[AgentInput, str],
+        config_overrides: Optional[AllAgentConfigs],
+    ) -> Tuple[CodexAgentConfig, str, Optional[str], Tuple[str, ...], Dict[str, str]]:
+        """
+        Resolve the effective config, prompt, thread to resume and per-run
+        MCP server flags and environment for a single run.
+
+        MCP skills in `config_overrides` are passed to codex as `-c` flags
+        rather than written to config.toml, so runs need no disk writes.
+        Their env values go into codex's environment instead (see
+        _mcp_override_env()).
+        """
+        # Normalize input (convert string to AgentInput if needed)
+        normalized_input = self._normalize_input(agent_input)
+
+        # Merge config with overrides
+        effective_config = self._get_effective_config(config_overrides)
+
+        # Build prompt from messages
+        prompt = self._build_prompt_from_messages(normalized_input.messages)
+
+        skills = config_overrides.skills if config_overrides else []
+        mcp_args = _mcp_override_args(skills)
+        mcp_env = _mcp_override_env(skills)
+
+        return effective_config, prompt, normalized_input.thread_id, mcp_args, mcp_env
+
+    def _decode_line(self, line: Union[str, bytes]) -> Optional[Event]:
+        """Decode one codex JSONL line, skipping blank or malformed lines."""
+        if not line.strip():
+            return None
+
+        if _codex_event_decoder is not None:
+            try:
+                return self._parse_event(_codex_event_decoder.decode(line))
+            except msgspec.ValidationError:
+                # Field with an unexpected type: decode loosely below
+                pass
+            except msgspec.DecodeError:
+                return None
+
+        try:
+            event_data = jsoncodec.loads(line)
+        except jsoncodec.DecodeError:
+            # Log but continue on malformed JSON
+            return None
+
+        return self._parse_event(event_data)
 
     def _get_effective_config(
         self, overrides: Optional[AllAgentConfigs]
@@ -236,28 +614,36 @@ Node.js CLI tools. You need to install Codex globally.
             else:
                 return CodexAgentConfig()
 
-        effective = self.config
-        if overrides:
-            effective = self.config.merge_overrides(overrides)
+        # Same as self.config.merge_overrides(overrides).agent_config, memoized
+        effective = self.config.agent_config
+        if overrides and isinstance(overrides.agent_config, CodexAgentConfig):
+            effective = _merged_agent_config(effective, overrides.agent_config)
 
-        return effective.agent_config
+        return effective
 
     def _build_command(
-        self, config: CodexAgentConfig, prompt: str
+        self,
+        config: CodexAgentConfig,
+        prompt: str,
+        thread_id: Optional[str] = None,
+        mcp_args: Tuple[str, ...] = (),
     ) -> List[str]:
         """
         Build codex command with config.
 
         Uses both:
-        1. File-based config (~/.codex/config.toml) for MCP servers
-        2. CLI args (-c flag) for runtime overrides
+        1. File-based config (~/.codex/config.toml) for configured MCP servers
+        2. CLI args (-c flag) for runtime overrides, including per-run MCP
+           servers (`mcp_args`, see _mcp_override_args())
+
+        If thread_id is given, the command continues that codex thread
+        (`codex exec resume <thread_id>`) instead of starting a new one.
         """
         # Apply defaults for None values
         sandbox_mode = config.sandbox_mode or "read-only"
-        codex_config = config.codex_config or {}
 
         cmd = [
-            "codex",
+            config.codex_path or self.codex_path or "codex",
             "exec",
             "--json",  # Output events as JSONL
             "--skip-git-repo-check",  # Allow running outside git repos
@@ -269,17 +655,15 @@ Node.js CLI tools. You need to install Codex globally.
         working_dir = config.working_dir or os.getcwd()
         cmd.extend(["-C", working_dir])
 
-        # Model (use -m flag for better compatibility)
-        if config.model:
-            cmd.extend(["-m", config.model])
+        # Model, endpoint and codex_config flags (assembled once per config)
+        cmd.extend(_codex_config_args(config))
 
-        # Endpoint (for Azure, etc.)
-        if config.endpoint:
-            cmd.extend(["-c", f"api_endpoint={config.endpoint}"])
+        # MCP servers for this run only
+        cmd.extend(mcp_args)
 
-        # Additional codex_config (via -c flag)
-        for key, value in codex_config.items():
-            cmd.extend(["-c", f"{key}={value}"])
+        # Continue an existing thread
+        if thread_id:
+            cmd.extend(["resume", thread_id])
 
         # Prompt (last argument)
         cmd.append(prompt)
@@ -325,13 +709,14 @@ Node.js CLI tools. You need to install Codex globally.
 
         return "\n".join(prompt_lines)
 
-    def _parse_event(self, event_data: Dict[str, Any]) -> Optional[Event]:
+    def _parse_event(self, event_data: Any) -> Optional[Event]:
         """
         Parse codex JSONL event to Event object.
 
         Codex event types:
         - thread.started: {"type": "thread.started", "thread_id": "..."}
         - turn.started: {"type": "turn.started"}
+        - item.started: {"type": "item.started", "item": {"type": "...", ...}}
         - item.completed: {"type": "item.completed", "item": {"type": "...", ...}}
         - turn.completed: {"type": "turn.completed", "usage": {...}}
 
@@ -339,42 +724,49 @@ Node.js CLI tools. You need to install Codex globally.
         - reasoning: {"type": "reasoning", "text": "..."}
         - command_execution: {"type": "command_execution", "command": "...", ...}
         - agent_message: {"type": "agent_message", "text": "..."}
+        - mcp_tool_call: {"type": "mcp_tool_call", "server": "...", "tool": "...", "status": "..."}
+          (also reported by item.started, with status "in_progress")
 
         Args:
-            event_data: Raw JSONL event from codex
+            event_data: Codex JSONL event, as a dict or a typed struct (msgspec)
 
         Returns:
             Parsed Event object or None if event should be skipped
         """
-        event_type = event_data.get("type")
+        event_type = _field(event_data, "type")
 
         if event_type == "thread.started":
             return ThreadStartedEvent(
-                thread_id=event_data.get("thread_id", ""),
+                thread_id=_field(event_data, "thread_id", ""),
             )
 
         elif event_type == "turn.started":
             return TurnStartedEvent()
 
+        elif event_type == "item.started":
+            item = _field(event_data, "item") or {}
+            if _field(item, "type") == "mcp_tool_call":
+                return self._mcp_tool_call_event(item)
+
         elif event_type == "item.completed":
-            item = event_data.get("item", {})
-            item_type = item.get("type")
+            item = _field(event_data, "item") or {}
+            item_type = _field(item, "type")
 
             if item_type == "reasoning":
                 return ReasoningEvent(
-                    content=item.get("text", ""),
+                    content=_field(item, "text", ""),
                 )
 
             elif item_type == "command_execution":
                 return CommandExecutionEvent(
-                    command=item.get("command", ""),
-                    output=item.get("aggregated_output", ""),
-                    exit_code=item.get("exit_code"),
-                    metadata={"status": item.get("status")},
+                    command=_field(item, "command", ""),
+                    output=_field(item, "aggregated_output", ""),
+                    exit_code=_field(item, "exit_code"),
+                    metadata={"status": _field(item, "status")},
                 )
 
             elif item_type == "agent_message":
-                text = item.get("text", "")
+                text = _field(item, "text", "")
 
                 # Check if this is a skill invocation message
                 # Pattern: "Using skill `skill-name`"
@@ -390,42 +782,293 @@ Node.js CLI tools. You need to install Codex globally.
                     content=text,
                 )
 
+            elif item_type == "mcp_tool_call":
+                return self._mcp_tool_call_event(item)
+
         elif event_type == "turn.completed":
             return TurnCompletedEvent(
-                usage=event_data.get("usage", {}),
+                usage=_field(event_data, "usage", {}),
             )
 
         return None
 
+    def _mcp_tool_call_event(self, item: Any) -> SkillInvokedEvent:
+        """Convert a codex mcp_tool_call item to a SkillInvokedEvent."""
+        server = _field(item, "server", "")
+        tool = _field(item, "tool", "")
+        return SkillInvokedEvent(
+            skill_name=f"{server}.{tool}" if server else tool,
+            metadata={
+                "server": server,
+                "tool": tool,
+                "status": _field(item, "status"),
+                "item_id": _field(item, "id"),
+            },
+        )
+
 
 # ============================================================================
 # Codex Configuration
 # ============================================================================
 
 
-def _configure_codex_auth(api_key: str, verbose: bool = False) -> None:
+def _signal_process_group(
+    process: Union[asyncio.subprocess.Process, subprocess.Popen], sig: int
+) -> None:
+    """
+    Send a signal to a codex process and everything it spawned.
+
+    Codex processes lead their own session (start_new_session=True), so on
+    POSIX their process group also holds node workers and stdio MCP servers.
+    Platforms without process groups (Windows) signal the process alone.
+    """
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, sig)
+            return
+        except OSError:
+            # Already gone, or not a group leader: signal the process alone
+            pass
+    try:
+        process.send_signal(sig)
+    except ProcessLookupError:
+        pass
+
+
+def _terminate_process_group(process: asyncio.subprocess.Process) -> None:
+    """Send SIGTERM to a codex process group and reap it in the background."""
+    _signal_process_group(process, signal.SIGTERM)
+    task = asyncio.ensure_future(_reap_process_group(process))
+    _reaper_tasks.add(task)
+    task.add_done_callback(_reaper_tasks.discard)
+
+
+async def _reap_process_group(process: asyncio.subprocess.Process) -> None:
+    """Wait for a terminated codex process, killing its group after the grace period."""
+    try:
+        await asyncio.wait_for(process.wait(), timeout=TERMINATE_GRACE_SECONDS)
+    except asyncio.TimeoutError:
+        _signal_process_group(process, _KILL_SIGNAL)
+        await process.wait()
+
+
+@lru_cache(maxsize=256)
+def _merged_agent_config(
+    base: CodexAgentConfig, overrides: CodexAgentConfig
+) -> CodexAgentConfig:
+    """Effective agent config for a (base config, overrides) pair, merged once."""
+    return base.with_overrides(overrides)
+
+
+@lru_cache(maxsize=256)
+def _codex_config_args(config: CodexAgentConfig) -> Tuple[str, ...]:
+    """Codex flags for a config's model, endpoint and codex_config."""
+    args: List[str] = []
+
+    # Model (use -m flag for better compatibility)
+    if config.model:
+        args.extend(["-m", config.model])
+
+    # Endpoint (for Azure, etc.)
+    if config.endpoint:
+        args.extend(["-c", f"api_endpoint={config.endpoint}"])
+
+    # Additional codex_config (via -c flag)
+    for key, value in (config.codex_config or {}).items():
+        args.extend(["-c", f"{key}={value}"])
+
+    return tuple(args)
+
+
+def _prompt_via_stdin(prompt: str) -> bool:
+    """Whether a prompt is too large to pass to codex as an argument."""
+    # Cheap bound first: a character is at most 4 UTF-8 bytes
+    if len(prompt) * 4 <= STDIN_PROMPT_THRESHOLD:
+        return False
+    return len(prompt.encode("utf-8")) > STDIN_PROMPT_THRESHOLD
+
+
+def _write_prompt_sync(stream, prompt: str) -> None:
+    """Write the prompt to a codex process's stdin and close it (runs on a thread)."""
+    try:
+        stream.write(prompt)
+    except OSError:
+        # codex exited early (BrokenPipeError); its exit code and stderr report why
+        pass
+    finally:
+        # Always close, or codex waits for the rest of the prompt forever
+        try:
+            stream.close()
+        except OSError:
+            pass
+
+
+class _StderrTail:
+    """
+    Last `limit` bytes of a codex stderr stream.
+
+    THREAD SAFETY: append() runs on the pump thread while the run reads the tail.
+    """
+
+    def __init__(self, limit: int = STDERR_TAIL_BYTES):
+        self.limit = limit
+        self.dropped = 0  # Bytes discarded from the front
+        self._chunks: Deque[bytes] = deque()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def append(self, chunk: bytes) -> None:
+        """Add output, dropping whole chunks that fell out of the tail."""
+        with self._lock:
+            self._chunks.append(chunk)
+            self._size += len(chunk)
+            while self._size - len(self._chunks[0]) >= self.limit:
+                dropped = self._chunks.popleft()
+                self._size -= len(dropped)
+                self.dropped += len(dropped)
+
+    def _snapshot(self) -> Tuple[bytes, int]:
+        """Last `limit` bytes and the number of bytes dropped before them."""
+        with self._lock:
+            data = b"".join(self._chunks)
+            dropped = self.dropped
+
+        if len(data) > self.limit:
+            dropped += len(data) - self.limit
+            data = data[-self.limit:]
+        return data, dropped
+
+    @staticmethod
+    def _format(data: bytes, dropped: int) -> str:
+        """Decode a snapshot, marking dropped output."""
+        text = data.decode("utf-8", errors="replace")
+        if dropped:
+            text = f"[... {dropped} earlier bytes of stderr dropped]\n{text}"
+        return text
+
+    def text(self) -> str:
+        """Decoded tail, marked if earlier output was dropped."""
+        return self._format(*self._snapshot())
+
+    def error_event(self, returncode: int) -> Optional[ErrorEvent]:
+        """ErrorEvent for a failed run, or None if codex wrote nothing to stderr."""
+        if not self._size:
+            return None
+        data, dropped = self._snapshot()
+        return ErrorEvent(
+            content=f"Codex execution failed: {self._format(data, dropped)}",
+            metadata={"returncode": returncode, "stderr_dropped_bytes": dropped},
+        )
+
+
+def _pump_stderr(stream, tail: _StderrTail) -> None:
+    """Copy a subprocess stderr pipe into `tail` until EOF (runs on a thread)."""
+    fd = stream.fileno()
+    try:
+        while True:
+            chunk = os.read(fd, STDERR_TAIL_BYTES)
+            if not chunk:
+                break
+            tail.append(chunk)
+    except (OSError, ValueError):
+        # Pipe closed by the run's cleanup
+        pass
+
+
+async def _apump_stderr(stream: asyncio.StreamReader, tail: _StderrTail) -> None:
+    """Copy an asyncio subprocess stderr stream into `tail` until EOF."""
+    while True:
+        chunk = await stream.read(STDERR_TAIL_BYTES)
+        if not chunk:
+            break
+        tail.append(chunk)
+
+
+def _configure_codex_auth(
+    api_key: str, verbose: bool = False, codex_dir: Optional[Path] = None
+) -> None:
     """
     Configure Codex authentication by writing API key to ~/.codex/auth.json.
 
     Args:
         api_key: OpenAI API key
         verbose: Print configuration details
+        codex_dir: Codex home to configure (default: ~/.codex)
     """
-    import json
+    auth_path = codex_dir / "auth.json" if codex_dir else CODEX_AUTH_PATH
+    codex_dir = auth_path.parent
 
     # Create .codex directory if it doesn't exist
-    CODEX_DIR.mkdir(parents=True, exist_ok=True)
+    codex_dir.mkdir(parents=True, exist_ok=True)
 
     # Write auth.json
     auth_config = {
         "OPENAI_API_KEY": api_key,
     }
 
-    with open(CODEX_AUTH_PATH, "w") as f:
+    with open(auth_path, "w") as f:
         json.dump(auth_config, f, indent=2)
 
     if verbose:
-        print(f"✅ Configured API key in {CODEX_AUTH_PATH}")
+        print(f"✅ Configured API key in {auth_path}")
+
+
+def _materialize_codex_home(
+    config: AllAgentConfigs, api_key: Optional[str], verbose: bool = False
+) -> Path:
+    """
+    Build a private CODEX_HOME holding only this config's auth and skills.
+
+    Homes are keyed by a hash of the config, built once per process and
+    reused across restarts (skill and MCP installs are no-ops when unchanged).
+    The user's ~/.codex/config.toml seeds the home's config.toml, and
+    ~/.codex/auth.json is linked in when no API key is configured.
+
+    Args:
+        config: Complete configuration with skills
+        api_key: OpenAI API key (None = reuse ~/.codex/auth.json)
+        verbose: Print installation progress
+
+    Returns:
+        Path to pass to codex as CODEX_HOME
+    """
+    base_config = CODEX_CONFIG_PATH.read_text() if CODEX_CONFIG_PATH.exists() else ""
+    home_key = _digest(
+        {
+            "api_key": hashlib.sha256(api_key.encode("utf-8")).hexdigest() if api_key else None,
+            "skills": [asdict(skill) for skill in config.skills],
+            "base_config": base_config,
+        }
+    )
+
+    with _codex_homes_lock:
+        home = _codex_homes.get(home_key)
+        if home is not None:
+            return home
+
+        home = CODEX_HOMES_DIR / home_key[:16]
+        home.mkdir(parents=True, exist_ok=True)
+        os.chmod(home, 0o700)
+
+        # Seed config.toml from the user's codex config
+        config_path = home / "config.toml"
+        if base_config and not config_path.exists():
+            _write_codex_config(toml.loads(base_config), config_path)
+
+        if api_key:
+            _configure_codex_auth(api_key, verbose=verbose, codex_dir=home)
+        elif CODEX_AUTH_PATH.exists() and not (home / "auth.json").exists():
+            # Share login credentials (codex refreshes tokens in place)
+            (home / "auth.json").symlink_to(CODEX_AUTH_PATH)
+
+        install_codex_skills(config, verbose=verbose, codex_dir=home)
+
+        _codex_homes[home_key] = home
+
+    if verbose:
+        print(f"✅ Materialized isolated CODEX_HOME at {home}")
+
+    return home
 
 
 # ============================================================================
@@ -433,7 +1076,9 @@ def _configure_codex_auth(api_key: str, verbose: bool = False) -> None:
 # ============================================================================
 
 
-def install_codex_skills(config: AllAgentConfigs, verbose: bool = False):
+def install_codex_skills(
+    config: AllAgentConfigs, verbose: bool = False, codex_dir: Optional[Path] = None
+):
     """
     Install skills for Codex.
 
@@ -444,27 +1089,40 @@ def install_codex_skills(config: AllAgentConfigs, verbose: bool = False):
     Args:
         config: Complete configuration with skills
         verbose: Print installation progress
+        codex_dir: Codex home to install into (default: ~/.codex)
     """
+    if codex_dir is None or codex_dir == CODEX_DIR:
+        skills_dir, config_path = CODEX_SKILLS_DIR, CODEX_CONFIG_PATH
+    else:
+        skills_dir, config_path = codex_dir / "skills", codex_dir / "config.toml"
+
     # Create codex skills directory
-    CODEX_SKILLS_DIR.mkdir(parents=True, exist_ok=True)
+    skills_dir.mkdir(parents=True, exist_ok=True)
 
     installed_count = 0
+    mcp_skills = []
 
     for skill in config.skills:
         if isinstance(skill, AnthropicSkillConfig):
-            _install_anthropic_skill(skill, verbose=verbose)
+            _install_anthropic_skill(skill, verbose=verbose, skills_dir=skills_dir)
             installed_count += 1
 
         elif isinstance(skill, (MCPStdioSkillConfig, MCPSSESkillConfig)):
-            _configure_mcp_server(skill, verbose=verbose)
-            # Verbose output is already printed in _configure_mcp_server
+            mcp_skills.append(skill)
+
+    # Verbose output is printed in _configure_mcp_servers
+    _configure_mcp_servers(mcp_skills, verbose=verbose, config_path=config_path)
 
     if verbose:
-        print(f"\n✅ Installed {installed_count} Anthropic skills to {CODEX_SKILLS_DIR}")
+        print(f"\n✅ Installed {installed_count} Anthropic skills to {skills_dir}")
 
 
-def _install_anthropic_skill(skill: AnthropicSkillConfig, verbose: bool = False):
+def _install_anthropic_skill(
+    skill: AnthropicSkillConfig, verbose: bool = False, skills_dir: Optional[Path] = None
+):
     """Install Anthropic skill (copy to codex skills directory)."""
+    skills_dir = skills_dir or CODEX_SKILLS_DIR
+
     source = Path(skill.path)
     if not source.exists():
         raise FileNotFoundError(f"Skill path not found: {source}")
@@ -480,41 +1138,169 @@ def _install_anthropic_skill(skill: AnthropicSkillConfig, verbose: bool = False)
         )
 
     # Target directory
-    target = CODEX_SKILLS_DIR / source.name
-
-    # Remove existing skill if present
-    if target.exists():
-        shutil.rmtree(target)
+    target = skills_dir / source.name
 
-    # Copy skill to codex skills directory
-    shutil.copytree(source, target)
+    # Fast path: source files unchanged (same paths, mtimes and sizes)
+    manifest = _skill_manifest(source)
+    manifest_digest = _digest(manifest)
+    installed = _read_skill_marker(target)
+    if installed.get("manifest") == manifest_digest:
+        if verbose:
+            print(f"✓ Skill up to date: {source.name}")
+        return
+
+    # Files were touched: only reinstall if their content actually changed
+    content_digest = _skill_content_digest(source, manifest)
+    marker = {"manifest": manifest_digest, "content": content_digest}
+    if installed.get("content") == content_digest:
+        _write_skill_marker(target, marker)
+        if verbose:
+            print(f"✓ Skill up to date: {source.name}")
+        return
+
+    # Build the new version next to the target, then swap it in
+    staging = Path(tempfile.mkdtemp(prefix=f".{source.name}.", dir=skills_dir))
+    try:
+        shutil.copytree(source, staging, copy_function=_link_or_copy, dirs_exist_ok=True)
+        _write_skill_marker(staging, marker)
+        _swap_in(staging, target, content_digest)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
 
     if verbose:
         print(f"✓ Installed skill: {source.name}")
 
 
-def _configure_mcp_server(
-    skill: Union[MCPStdioSkillConfig, MCPSSESkillConfig], verbose: bool = False
+def _skill_manifest(source: Path) -> List[Tuple[str, int, int]]:
+    """List (relative path, mtime_ns, size) for every file in a skill directory."""
+    manifest = []
+    for root, dirs, files in os.walk(source):
+        dirs.sort()
+        for name in sorted(files):
+            path = Path(root) / name
+            stat = path.stat()
+            manifest.append((path.relative_to(source).as_posix(), stat.st_mtime_ns, stat.st_size))
+    return manifest
+
+
+def _skill_content_digest(source: Path, manifest: List[Tuple[str, int, int]]) -> str:
+    """Hash the paths and contents of every file in a skill directory."""
+    digest = hashlib.sha256()
+    for relative_path, _, _ in manifest:
+        digest.update(relative_path.encode("utf-8") + b"\0")
+        with open(source / relative_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _digest(data: Any) -> str:
+    """Hash JSON-serializable data."""
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _read_skill_marker(target: Path) -> Dict[str, Any]:
+    """Read the install marker of an installed skill ({} if missing)."""
+    try:
+        with open(target / SKILL_MARKER_NAME) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_skill_marker(target: Path, marker: Dict[str, Any]) -> None:
+    """Write the install marker of a skill atomically."""
+    marker_path = target / SKILL_MARKER_NAME
+    temp_path = marker_path.with_name(f"{SKILL_MARKER_NAME}.{os.getpid()}.tmp")
+    with open(temp_path, "w") as f:
+        json.dump(marker, f)
+    os.replace(temp_path, marker_path)
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """Hardlink a file where possible, copy it otherwise (e.g. across devices)."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _swap_in(staging: Path, target: Path, content_digest: str) -> None:
+    """
+    Replace `target` with the fully built `staging` directory.
+
+    Directories can't be replaced in one rename, so the old version is renamed
+    aside first. If a concurrent installer wins the race with the same
+    content, its copy is kept.
+    """
+    for _ in range(3):
+        if target.exists():
+            retired = target.with_name(f".{target.name}.old-{secrets.token_hex(4)}")
+            try:
+                os.rename(target, retired)
+            except FileNotFoundError:
+                pass  # Another installer moved it first
+            else:
+                shutil.rmtree(retired, ignore_errors=True)
+
+        try:
+            os.rename(staging, target)
+            return
+        except OSError:
+            if _read_skill_marker(target).get("content") == content_digest:
+                return
+
+    raise RuntimeError(f"Failed to install skill to {target}: concurrent installs kept conflicting")
+
+
+def _configure_mcp_servers(
+    skills: List[Union[MCPStdioSkillConfig, MCPSSESkillConfig]],
+    verbose: bool = False,
+    config_path: Optional[Path] = None,
 ):
     """
-    Configure MCP server in ~/.codex/config.toml.
+    Configure MCP servers in ~/.codex/config.toml.
 
     MCP servers need to be configured in the codex config file.
     Some options can only be set this way (e.g., tool_timeout_sec).
+
+    All servers are merged in one pass. The file is left untouched when it
+    already contains them, otherwise it is rewritten once under a file lock
+    via write-temp-then-rename, so concurrent configure() calls can't
+    corrupt it.
     """
-    # Load or create config
-    if CODEX_CONFIG_PATH.exists():
-        with open(CODEX_CONFIG_PATH) as f:
-            config = toml.load(f)
-    else:
-        config = {}
+    config_path = config_path or CODEX_CONFIG_PATH
+    desired = dict(_mcp_server_entry(skill) for skill in skills)
+    if not desired:
+        return
+
+    # Fast path without locking: writers replace the file atomically
+    if _has_mcp_servers(_load_codex_config(config_path), desired):
+        if verbose:
+            print(f"✓ MCP servers already configured in {config_path}")
+        return
+
+    config_path.parent.mkdir(parents=True, exist_ok=True)
+    with _codex_config_lock(config_path):
+        # Re-read under the lock: another process may have written meanwhile
+        config = _load_codex_config(config_path)
+        if not _has_mcp_servers(config, desired):
+            config.setdefault("mcp_servers", {}).update(desired)
+            _write_codex_config(config, config_path)
+
+    if verbose:
+        for server_name in desired:
+            print(f"✓ Configured MCP server '{server_name}' in {config_path}")
 
-    # Ensure mcp_servers section exists
-    if "mcp_servers" not in config:
-        config["mcp_servers"] = {}
 
+def _mcp_server_entry(
+    skill: Union[MCPStdioSkillConfig, MCPSSESkillConfig]
+) -> Tuple[str, Dict[str, Any]]:
+    """Build the config.toml server name and table for an MCP skill."""
     # Build server config based on transport type
-    server_config = {}
+    server_config: Dict[str, Any] = {}
 
     if isinstance(skill, MCPStdioSkillConfig):
         # Generate server name from command
@@ -531,17 +1317,114 @@ def _configure_mcp_server(
     else:
         server_name = "unknown-server"
 
+    # Explicit names win over generated ones
+    if skill.name:
+        server_name = skill.name
+
     # Merge additional config
     if skill.config:
         server_config.update(skill.config)
 
-    # Add to config
-    config["mcp_servers"][server_name] = server_config
+    return server_name, server_config
 
-    # Write config
-    CODEX_CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with open(CODEX_CONFIG_PATH, "w") as f:
-        toml.dump(config, f)
 
-    if verbose:
-        print(f"✓ Configured MCP server '{server_name}' in {CODEX_CONFIG_PATH}")
+def _mcp_override_args(skills: List[Any]) -> Tuple[str, ...]:
+    """
+    Build `-c mcp_servers.<name>.<key>=<value>` flags for per-run MCP skills.
+
+    codex splits -c keys on dots, so characters other than letters, digits,
+    "_" and "-" in server names are replaced with "_".
+
+    A stdio skill's `env` values are not put on the command line, where any
+    local user can read them (ps, /proc); only their names are, as the
+    server's `env_vars`, and codex forwards them from its own environment
+    (see _mcp_override_env()).
+    """
+    args: List[str] = []
+    for skill in skills:
+        if not isinstance(skill, (MCPStdioSkillConfig, MCPSSESkillConfig)):
+            continue
+        server_name, server_config = _mcp_server_entry(skill)
+        server_name = re.sub(r"[^A-Za-z0-9_-]", "_", server_name)
+        env = server_config.pop("env", None)
+        if env:
+            server_config["env_vars"] = sorted(env)
+        for key, value in server_config.items():
+            args.extend(["-c", f"mcp_servers.{server_name}.{key}={_toml_value(value)}"])
+    return tuple(args)
+
+
+def _mcp_override_env(skills: List[Any]) -> Dict[str, str]:
+    """
+    Collect the `env` of per-run stdio MCP skills for codex's environment.
+
+    Raises:
+        ValueError: If two skills set the same variable to different values
+    """
+    env: Dict[str, str] = {}
+    for skill in skills:
+        if not isinstance(skill, MCPStdioSkillConfig):
+            continue
+        for name, value in (_mcp_server_entry(skill)[1].get("env") or {}).items():
+            value = str(value)
+            if env.setdefault(name, value) != value:
+                raise ValueError(
+                    f"MCP skills set conflicting values for environment variable '{name}'"
+                )
+    return env
+
+
+def _toml_value(value: Any) -> str:
+    """Format a value as an inline TOML value for a codex -c flag."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_toml_value(item) for item in value) + "]"
+    if isinstance(value, dict):
+        items = ", ".join(f"{json.dumps(str(key), ensure_ascii=False)} = {_toml_value(item)}" for key, item in value.items())
+        return "{ " + items + " }" if items else "{}"
+    # JSON string escapes are valid in TOML basic strings
+    return json.dumps(str(value), ensure_ascii=False)
+
+
+def _has_mcp_servers(config: Dict[str, Any], desired: Dict[str, Dict[str, Any]]) -> bool:
+    """Check whether config already contains exactly the desired server tables."""
+    servers = config.get("mcp_servers", {})
+    return all(servers.get(name) == entry for name, entry in desired.items())
+
+
+def _load_codex_config(config_path: Path) -> Dict[str, Any]:
+    """Load a codex config.toml ({} if missing)."""
+    if not config_path.exists():
+        return {}
+    with open(config_path) as f:
+        return toml.load(f)
+
+
+def _write_codex_config(config: Dict[str, Any], config_path: Path) -> None:
+    """Write a codex config.toml atomically (write temp file, then rename)."""
+    fd, temp_path = tempfile.mkstemp(prefix=".config.", suffix=".toml", dir=config_path.parent)
+    try:
+        with os.fdopen(fd, "w") as f:
+            toml.dump(config, f)
+        os.replace(temp_path, config_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+@contextmanager
+def _codex_config_lock(config_path: Path):
+    """Hold an exclusive lock on a codex config.toml across processes."""
+    lock_path = config_path.with_name(config_path.name + ".lock")
+    with open(lock_path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
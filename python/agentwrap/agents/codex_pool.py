@@ -0,0 +1,249 @@
+"""
+Warm pool of pre-spawned codex processes.
+
+Every `codex exec` pays a cold start before the first token: starting Node,
+loading the codex CLI and reading its config. The pool hides that cost by
+spawning processes ahead of time with the prompt argument set to "-", so
+each one boots and then parks waiting for its prompt on stdin.
+
+`codex exec` serves exactly one turn per process, so a process is handed out
+once and the pool spawns a replacement in the background.
+
+THREAD SAFETY:
+- The pool holds asyncio subprocesses and must be used from a single event loop
+- No locks needed: state is only mutated between awaits on that loop
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+PoolKey = Tuple[Tuple[str, ...], Tuple[Tuple[str, str], ...]]
+
+
+@dataclass
+class _WarmProcess:
+    """A parked codex process and when it was spawned."""
+
+    process: asyncio.subprocess.Process
+    spawned_at: float
+
+
+class CodexProcessPool:
+    """
+    Keeps warm codex processes parked and ready for a prompt.
+
+    Processes are keyed by their exact command line (and environment), so a
+    warm process is only reused for a run that would have spawned the same
+    command. Runs with a command the pool has not seen fall back to a cold
+    spawn and the pool starts warming processes for that command.
+
+    Example:
+        ```python
+        pool = CodexProcessPool(min_size=2, max_size=8)
+        agent = CodexAgent(process_pool=pool).configure(config)
+        await agent.prewarm()
+        ```
+    """
+
+    def __init__(
+        self,
+        min_size: int = 1,
+        max_size: int = 4,
+        max_idle_seconds: float = 300.0,
+        stream_limit: int = 16 * 1024 * 1024,
+    ):
+        """
+        Initialize pool.
+
+        Args:
+            min_size: Warm processes to keep parked per command
+            max_size: Maximum parked processes across all commands
+            max_idle_seconds: Recycle parked processes older than this
+            stream_limit: Max line length for the stdout reader
+        """
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(
+                f"Invalid pool size: min_size={min_size}, max_size={max_size}"
+            )
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_idle_seconds = max_idle_seconds
+        self.stream_limit = stream_limit
+
+        # Parked processes per command, oldest first; keys in LRU order
+        self._parked: OrderedDict[PoolKey, Deque[_WarmProcess]] = OrderedDict()
+        self._replenishing: Set[PoolKey] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._closed = False
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.recycled = 0
+
+    async def acquire(
+        self, cmd: List[str], env: Optional[Dict[str, str]] = None
+    ) -> asyncio.subprocess.Process:
+        """
+        Get a process for `cmd`, warm if one is parked, otherwise cold.
+
+        The caller owns the returned process: it must write the prompt to
+        stdin, close stdin and consume stdout/stderr.
+
+        Args:
+            cmd: Full codex command line (prompt argument must be "-")
+            env: Optional environment for the process
+
+        Returns:
+            Running asyncio subprocess
+        """
+        key = self._make_key(cmd, env)
+        process = self._take_healthy(key)
+
+        if process is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            process = await self.spawn(cmd, env)
+
+        self._schedule_replenish(key, cmd, env)
+        return process
+
+    async def prewarm(
+        self, cmd: List[str], env: Optional[Dict[str, str]] = None
+    ) -> None:
+        """Spawn processes for `cmd` until `min_size` are parked."""
+        key = self._make_key(cmd, env)
+        await self._replenish(key, cmd, env)
+
+    async def spawn(
+        self, cmd: List[str], env: Optional[Dict[str, str]] = None
+    ) -> asyncio.subprocess.Process:
+        """
+        Spawn a codex process that reads its prompt from stdin.
+
+        The process leads its own session so it can be stopped together
+        with its children by signalling the process group.
+        """
+        return await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+            limit=self.stream_limit,
+            start_new_session=True,
+        )
+
+    async def close(self) -> None:
+        """Stop replenishing and kill all parked processes."""
+        self._closed = True
+
+        for task in list(self._tasks):
+            task.cancel()
+
+        for entries in self._parked.values():
+            while entries:
+                await self._discard(entries.popleft())
+        self._parked.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool counters and the number of parked processes."""
+        return {
+            "parked": sum(len(entries) for entries in self._parked.values()),
+            "commands": len(self._parked),
+            "hits": self.hits,
+            "misses": self.misses,
+            "recycled": self.recycled,
+        }
+
+    def _make_key(self, cmd: List[str], env: Optional[Dict[str, str]]) -> PoolKey:
+        """Build the pool key for a command line and environment."""
+        env_items = tuple(sorted(env.items())) if env else ()
+        return (tuple(cmd), env_items)
+
+    def _is_healthy(self, entry: _WarmProcess) -> bool:
+        """Check a parked process is still alive and not stale."""
+        if entry.process.returncode is not None:
+            return False
+        return time.monotonic() - entry.spawned_at < self.max_idle_seconds
+
+    def _take_healthy(self, key: PoolKey) -> Optional[asyncio.subprocess.Process]:
+        """Pop the oldest healthy parked process for `key`."""
+        entries = self._parked.get(key)
+        if not entries:
+            return None
+
+        self._parked.move_to_end(key)
+        while entries:
+            entry = entries.popleft()
+            if self._is_healthy(entry):
+                return entry.process
+            self._spawn_task(self._discard(entry))
+
+        return None
+
+    def _schedule_replenish(
+        self, key: PoolKey, cmd: List[str], env: Optional[Dict[str, str]]
+    ) -> None:
+        """Refill parked processes for `key` in the background."""
+        if self._closed or self.min_size == 0 or key in self._replenishing:
+            return
+        self._spawn_task(self._replenish(key, cmd, env))
+
+    async def _replenish(
+        self, key: PoolKey, cmd: List[str], env: Optional[Dict[str, str]]
+    ) -> None:
+        """Spawn processes for `key` until `min_size` healthy ones are parked."""
+        if self._closed or key in self._replenishing:
+            return
+
+        self._replenishing.add(key)
+        try:
+            entries = self._parked.setdefault(key, deque())
+            self._parked.move_to_end(key)
+
+            # Health check: drop dead or stale processes before counting
+            for entry in [e for e in entries if not self._is_healthy(e)]:
+                entries.remove(entry)
+                await self._discard(entry)
+
+            while len(entries) < self.min_size and not self._closed:
+                await self._make_room(key)
+                process = await self.spawn(cmd, env)
+                entries.append(_WarmProcess(process=process, spawned_at=time.monotonic()))
+        except OSError as error:
+            print(f"[CodexProcessPool] Failed to spawn warm process: {error}")
+        finally:
+            self._replenishing.discard(key)
+
+    async def _make_room(self, key: PoolKey) -> None:
+        """Evict parked processes of least recently used commands over `max_size`."""
+        while sum(len(entries) for entries in self._parked.values()) >= self.max_size:
+            victim_key = next(k for k in self._parked if k != key or len(self._parked) == 1)
+            victims = self._parked[victim_key]
+            if victims:
+                await self._discard(victims.popleft())
+            if not victims and victim_key != key:
+                del self._parked[victim_key]
+
+    async def _discard(self, entry: _WarmProcess) -> None:
+        """Kill and reap a parked process."""
+        self.recycled += 1
+        process = entry.process
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+        await process.wait()
+
+    def _spawn_task(self, coro) -> None:
+        """Run a coroutine in the background, keeping a reference to it."""
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -12,6 +12,7 @@ capabilities with common routes.
 """
 
 import asyncio
+import socket
 import threading
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
@@ -69,6 +70,9 @@ class BaseServer(ABC, Generic[TRequest, TResponse]):
         self.server: Optional[uvicorn.Server] = None
         self.agent: Optional[BaseAgent] = None
         self._server_thread: Optional[threading.Thread] = None
+        # Address the HTTP server listens on (set by start_http_server)
+        self.http_host: Optional[str] = None
+        self.http_port: Optional[int] = None
 
         # Thread-safe state management
         self._state_lock = threading.Lock()
@@ -126,7 +130,9 @@ class BaseServer(ABC, Generic[TRequest, TResponse]):
         Run agent and collect output (shared logic).
 
         This method runs in the same process and doesn't need thread safety
-        for agent execution itself (agent.run() handles its own state).
+        for agent execution itself (agent.arun() handles its own state).
+        Events are consumed with agent.arun() so concurrent requests do not
+        block the event loop.
         """
         if not self.agent:
             raise RuntimeError(
@@ -135,7 +141,7 @@ class BaseServer(ABC, Generic[TRequest, TResponse]):
 
         messages: list[str] = []
 
-        for event in self.agent.run(agent_input, config_overrides):
+        async for event in self.agent.arun(agent_input, config_overrides):
             if isinstance(event, MessageEvent):
                 messages.append(event.content or "")
 
@@ -202,6 +208,19 @@ class BaseServer(ABC, Generic[TRequest, TResponse]):
                 }
             )
 
+        # Bind a random port up front so routes can know the actual port
+        sockets = None
+        port = options.port
+        if port == 0:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind((options.host, 0))
+            port = sock.getsockname()[1]
+            sockets = [sock]
+
+        self.http_host = options.host
+        self.http_port = port
+
         # Let subclass register custom routes
         self.register_routes(self.app)
 
@@ -209,16 +228,16 @@ class BaseServer(ABC, Generic[TRequest, TResponse]):
         config = uvicorn.Config(
             app=self.app,
             host=options.host,
-            port=options.port,
+            port=port,
             log_level="info",
         )
         self.server = uvicorn.Server(config)
 
         # Run server in background thread (for async compatibility)
-        print(f"[BaseServer] HTTP server starting on {options.host}:{options.port}")
+        print(f"[BaseServer] HTTP server starting on {options.host}:{port}")
 
         # Start server (blocking call, should be run in asyncio.run or background thread)
-        await self.server.serve()
+        await self.server.serve(sockets=sockets)
 
     async def stop_http_server(self) -> None:
         """
@@ -1,6 +1,12 @@
-"""Unified configuration structures for agentwrap."""
+"""
+Unified configuration structures for agentwrap.
 
-from dataclasses import dataclass, field
+Configs are frozen: merged configs share unchanged parts (e.g. the skills
+list) with the configs they were built from, so those must not be mutated
+in place either.
+"""
+
+from dataclasses import dataclass, field, replace
 from typing import Any, Dict, List, Literal, Optional, Union
 
 
@@ -9,7 +15,7 @@ from typing import Any, Dict, List, Literal, Optional, Union
 # ============================================================================
 
 
-@dataclass
+@dataclass(frozen=True)
 class MCPStdioSkillConfig:
     """
     MCP skill using stdio transport.
@@ -23,6 +29,7 @@ class MCPStdioSkillConfig:
     args: List[str] = field(default_factory=list)  # Command arguments
     env: Dict[str, str] = field(default_factory=dict)  # Environment variables
     config: Optional[Dict[str, Any]] = None  # Additional MCP config
+    name: Optional[str] = None  # Server name (default: generated from command)
 
     def __post_init__(self):
         """Validate configuration."""
@@ -30,7 +37,7 @@ class MCPStdioSkillConfig:
             raise ValueError("MCP stdio transport requires 'command' field")
 
 
-@dataclass
+@dataclass(frozen=True)
 class MCPSSESkillConfig:
     """
     MCP skill using SSE (Server-Sent Events) transport.
@@ -42,6 +49,7 @@ class MCPSSESkillConfig:
     transport: str = "sse"  # Fixed transport
     url: str = ""  # Server URL (required)
     config: Optional[Dict[str, Any]] = None  # Additional MCP config
+    name: Optional[str] = None  # Server name (default: generated from URL)
 
     def __post_init__(self):
         """Validate configuration."""
@@ -49,7 +57,7 @@ class MCPSSESkillConfig:
             raise ValueError("MCP sse transport requires 'url' field")
 
 
-@dataclass
+@dataclass(frozen=True)
 class AnthropicSkillConfig:
     """
     Anthropic Skill configuration (Markdown-based skills).
@@ -78,7 +86,7 @@ SkillConfig = Union[MCPStdioSkillConfig, MCPSSESkillConfig, AnthropicSkillConfig
 # ============================================================================
 
 
-@dataclass
+@dataclass(frozen=True)
 class CodexAgentConfig:
     """
     Configuration for CodexAgent.
@@ -94,6 +102,44 @@ class CodexAgentConfig:
     working_dir: Optional[str] = None  # Working directory
     # Additional codex config (passed via -c flag)
     codex_config: Optional[Dict[str, Any]] = None  # Extra config flags
+    # Install auth and skills into a private CODEX_HOME instead of ~/.codex
+    isolated_home: bool = False
+    # Codex executable to run (skips the PATH lookup)
+    codex_path: Optional[str] = None
+
+    # Fields an override replaces when it sets them (not None)
+    OVERRIDABLE_FIELDS = ("api_key", "endpoint", "model", "sandbox_mode", "working_dir", "codex_path")
+
+    def __hash__(self) -> int:
+        # Hashable despite the codex_config dict, so configs can key caches.
+        # Only its keys are hashed: values that compare equal can differ in
+        # repr or type (1 and 1.0), and __eq__ still tells configs apart.
+        codex_config = (
+            tuple(sorted(self.codex_config)) if self.codex_config is not None else None
+        )
+        return hash(
+            (*(getattr(self, name) for name in self.OVERRIDABLE_FIELDS), codex_config, self.isolated_home)
+        )
+
+    def with_overrides(self, overrides: "CodexAgentConfig") -> "CodexAgentConfig":
+        """
+        Overlay the fields `overrides` sets onto this config.
+
+        codex_config entries are merged; other fields are replaced.
+
+        Returns:
+            New config, or self if the overrides change nothing
+        """
+        changes: Dict[str, Any] = {}
+        for field_name in self.OVERRIDABLE_FIELDS:
+            override_value = getattr(overrides, field_name)
+            if override_value is not None:
+                changes[field_name] = override_value
+
+        if overrides.codex_config is not None:
+            changes["codex_config"] = {**(self.codex_config or {}), **overrides.codex_config}
+
+        return replace(self, **changes) if changes else self
 
 
 # Union type for agent configs
@@ -105,7 +151,7 @@ AgentConfigType = CodexAgentConfig  # Add more agent types in future
 # ============================================================================
 
 
-@dataclass
+@dataclass(frozen=True)
 class AllAgentConfigs:
     """
     Complete configuration for agentwrap.
@@ -199,39 +245,17 @@ class AllAgentConfigs:
         Returns:
             New AllAgentConfigs with overrides applied
         """
-        # Deep copy current config
-        import copy
-
-        merged = copy.deepcopy(self)
-
-        # Override agent config fields
+        # Shallow overlay: unchanged parts are shared with self and overrides
+        agent_config = self.agent_config
         if isinstance(overrides.agent_config, CodexAgentConfig) and isinstance(
-            merged.agent_config, CodexAgentConfig
+            agent_config, CodexAgentConfig
         ):
-            for field_name in [
-                "api_key",
-                "endpoint",
-                "model",
-                "sandbox_mode",
-                "working_dir",
-            ]:
-                override_value = getattr(overrides.agent_config, field_name)
-                if override_value is not None:
-                    setattr(merged.agent_config, field_name, override_value)
-
-            # Merge codex_config if present in overrides
-            if overrides.agent_config.codex_config is not None:
-                if merged.agent_config.codex_config is None:
-                    merged.agent_config.codex_config = {}
-                merged.agent_config.codex_config.update(
-                    overrides.agent_config.codex_config
-                )
+            agent_config = agent_config.with_overrides(overrides.agent_config)
 
         # Override skills (replace completely)
-        if overrides.skills:
-            merged.skills = overrides.skills
+        skills = overrides.skills if overrides.skills else self.skills
 
-        return merged
+        return AllAgentConfigs(agent_config=agent_config, skills=skills)
 
     def print_summary(self):
         """Print configuration summary."""
@@ -285,6 +309,8 @@ class AgentInput:
     functions: Optional[List[Dict[str, Any]]] = None
     temperature: Optional[float] = None
     max_tokens: Optional[int] = None
+    # Agent thread to continue (messages then only carry the new turn)
+    thread_id: Optional[str] = None
 
     @classmethod
     def from_query(cls, query: str) -> "AgentInput":
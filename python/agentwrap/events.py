@@ -1,5 +1,6 @@
 """Event data structures for agent execution."""
 
+import sys
 from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Dict, Optional, Union
@@ -18,13 +19,33 @@ class EventType(Enum):
     ERROR = "error"
 
 
+# ============================================================================
+# Event Base
+# ============================================================================
+
+# Long runs emit thousands of events: on Python 3.10+ they are slotted
+# (no per-instance __dict__)
+_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+class _EventBase:
+    """Base of all events."""
+
+    __slots__ = ()
+
+
+def _event(cls):
+    """Make an event class a (slotted) dataclass."""
+    return dataclass(cls, **_DATACLASS_OPTIONS)
+
+
 # ============================================================================
 # Specific Event Types
 # ============================================================================
 
 
-@dataclass
-class ThreadStartedEvent:
+@_event
+class ThreadStartedEvent(_EventBase):
     """Event emitted when a new thread starts."""
 
     type: EventType = field(default=EventType.THREAD_STARTED, init=False)
@@ -32,8 +53,8 @@ class ThreadStartedEvent:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
-class TurnStartedEvent:
+@_event
+class TurnStartedEvent(_EventBase):
     """Event emitted when a new turn starts."""
 
     type: EventType = field(default=EventType.TURN_STARTED, init=False)
@@ -41,8 +62,8 @@ class TurnStartedEvent:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
-class ReasoningEvent:
+@_event
+class ReasoningEvent(_EventBase):
     """Event emitted when agent is reasoning/thinking."""
 
     type: EventType = field(default=EventType.REASONING, init=False)
@@ -50,8 +71,8 @@ class ReasoningEvent:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
-class CommandExecutionEvent:
+@_event
+class CommandExecutionEvent(_EventBase):
     """Event emitted when agent executes a command."""
 
     type: EventType = field(default=EventType.COMMAND_EXECUTION, init=False)
@@ -61,8 +82,8 @@ class CommandExecutionEvent:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
-class SkillInvokedEvent:
+@_event
+class SkillInvokedEvent(_EventBase):
     """Event emitted when agent invokes a skill/tool."""
 
     type: EventType = field(default=EventType.SKILL_INVOKED, init=False)
@@ -70,8 +91,8 @@ class SkillInvokedEvent:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
-class MessageEvent:
+@_event
+class MessageEvent(_EventBase):
     """Event emitted when agent produces a message."""
 
     type: EventType = field(default=EventType.MESSAGE, init=False)
@@ -79,8 +100,8 @@ class MessageEvent:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
-class TurnCompletedEvent:
+@_event
+class TurnCompletedEvent(_EventBase):
     """Event emitted when a turn completes."""
 
     type: EventType = field(default=EventType.TURN_COMPLETED, init=False)
@@ -88,8 +109,8 @@ class TurnCompletedEvent:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
-class ErrorEvent:
+@_event
+class ErrorEvent(_EventBase):
     """Event emitted when an error occurs."""
 
     type: EventType = field(default=EventType.ERROR, init=False)
@@ -0,0 +1,133 @@
+"""
+JSON Codec
+
+One place for JSON encoding and decoding on the hot paths: codex JSONL
+events, chat.completion.chunk SSE lines and dynamic MCP messages.
+
+Uses the fastest installed backend:
+- orjson (`pip install agentwrap[fast-json]`)
+- msgspec
+- stdlib json (always available)
+
+Set AGENTWRAP_JSON_BACKEND=orjson|msgspec|json to force a backend.
+
+All backends produce compact output (no spaces after separators) and keep
+non-ASCII characters as UTF-8.
+
+Example:
+    ```python
+    from agentwrap import jsoncodec
+
+    data = jsoncodec.loads(line)
+    body = jsoncodec.dumps({"ok": True})
+    ```
+"""
+
+import json
+import os
+from typing import Any, Callable, Tuple, Type, Union
+
+# Backend functions: _dumps_bytes(obj) -> bytes, _loads(str | bytes) -> Any
+_dumps_bytes: Callable[[Any], bytes]
+_loads: Callable[[Union[str, bytes]], Any]
+
+BACKEND: str
+DecodeError: Tuple[Type[Exception], ...]
+
+
+def _stdlib_dumps_bytes(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _use_stdlib() -> None:
+    global BACKEND, DecodeError, _dumps_bytes, _loads
+    BACKEND = "json"
+    DecodeError = (json.JSONDecodeError,)
+    _dumps_bytes = _stdlib_dumps_bytes
+    _loads = json.loads
+
+
+def _use_orjson() -> None:
+    import orjson
+
+    global BACKEND, DecodeError, _dumps_bytes, _loads
+    BACKEND = "orjson"
+    DecodeError = (orjson.JSONDecodeError,)
+    _dumps_bytes = orjson.dumps
+    _loads = orjson.loads
+
+
+def _use_msgspec() -> None:
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    global BACKEND, DecodeError, _dumps_bytes, _loads
+    BACKEND = "msgspec"
+    DecodeError = (msgspec.DecodeError,)
+    _dumps_bytes = encoder.encode
+    _loads = decoder.decode
+
+
+_BACKENDS = {"orjson": _use_orjson, "msgspec": _use_msgspec, "json": _use_stdlib}
+
+
+def use_backend(name: str) -> None:
+    """
+    Switch the JSON backend.
+
+    Args:
+        name: "orjson", "msgspec" or "json"
+
+    Raises:
+        ValueError: If the name is unknown
+        ImportError: If the backend is not installed
+    """
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown JSON backend '{name}', expected one of {sorted(_BACKENDS)}")
+    _BACKENDS[name]()
+
+
+def _select_default_backend() -> None:
+    """Pick the forced backend, else the first installed one."""
+    forced = os.environ.get("AGENTWRAP_JSON_BACKEND")
+    if forced:
+        use_backend(forced)
+        return
+
+    for name in ("orjson", "msgspec"):
+        try:
+            use_backend(name)
+            return
+        except ImportError:
+            continue
+
+    _use_stdlib()
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serialize `obj` to compact UTF-8 JSON bytes."""
+    try:
+        return _dumps_bytes(obj)
+    except (TypeError, OverflowError):
+        # Types the fast backends reject (e.g. ints beyond 64 bits, non-str keys)
+        return _stdlib_dumps_bytes(obj)
+
+
+def dumps(obj: Any) -> str:
+    """Serialize `obj` to a compact JSON string."""
+    return dumps_bytes(obj).decode("utf-8")
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Parse JSON from a string or UTF-8 bytes.
+
+    Raises:
+        DecodeError: If the data is not valid JSON
+    """
+    return _loads(data)
+
+
+_select_default_backend()
@@ -82,36 +82,7 @@ Respond with ONLY the JSON, no additional text.
         Convert OpenAI ChatCompletion message history to prompt.
         Used by OpenAI-compatible server to convert request messages to agent prompt.
         """
-        def format_message(message: Dict[str, Any]) -> str:
-            role = message.get('role')
-
-            # Handle tool/function messages with tool_call_id
-            if (role == 'tool' or role == 'function') and 'tool_call_id' in message:
-                tool_call_id = message['tool_call_id']
-                content = message.get('content', '')
-                return f'  <Message role="{role}" tool_call_id="{tool_call_id}">{content}</Message>'
-
-            # Handle new tool_calls format (OpenAI API 2023-11+)
-            if 'tool_calls' in message and message['tool_calls']:
-                tool_calls_xml = '\n    '.join(
-                    f'<ToolCall id="{tc["id"]}" type="{tc["type"]}" name="{tc["function"]["name"]}">'
-                    f'{tc["function"]["arguments"]}</ToolCall>'
-                    for tc in message['tool_calls']
-                )
-                return f'  <Message role="{role}">\n    {tool_calls_xml}\n  </Message>'
-
-            # Handle legacy function_call format (deprecated)
-            if 'function_call' in message and message['function_call']:
-                import json
-                func_call = message['function_call']
-                args_json = json.dumps(func_call['arguments'], indent=2)
-                return f'  <Message role="{role}"><FunctionCall name="{func_call["name"]}">{args_json}</FunctionCall></Message>'
-
-            # Regular message
-            content = message.get('content', '')
-            return f'  <Message role="{role}">{content}</Message>'
-
-        message_xml = '\n'.join(format_message(msg) for msg in messages)
+        message_xml = '\n'.join(self.format_function_call_message(msg) for msg in messages)
 
         return f"""<SystemInstructions>
 {self.system_prompt}
@@ -122,6 +93,51 @@ Respond with ONLY the JSON, no additional text.
 
 """
 
+    def function_call_continuation_prompt(self, new_messages: List[Dict[str, Any]]) -> str:
+        """
+        Convert only the new messages of a conversation to prompt.
+        Used by OpenAI-compatible server when resuming an agent thread that
+        already holds the earlier history.
+        """
+        message_xml = '\n'.join(self.format_function_call_message(msg) for msg in new_messages)
+
+        return f"""<Conversation>
+The conversation continues. New messages since your last response:
+{message_xml}
+</Conversation>
+
+"""
+
+    def format_function_call_message(self, message: Dict[str, Any]) -> str:
+        """Format a single OpenAI ChatCompletion message as prompt XML."""
+        role = message.get('role')
+
+        # Handle tool/function messages with tool_call_id
+        if (role == 'tool' or role == 'function') and 'tool_call_id' in message:
+            tool_call_id = message['tool_call_id']
+            content = message.get('content', '')
+            return f'  <Message role="{role}" tool_call_id="{tool_call_id}">{content}</Message>'
+
+        # Handle new tool_calls format (OpenAI API 2023-11+)
+        if 'tool_calls' in message and message['tool_calls']:
+            tool_calls_xml = '\n    '.join(
+                f'<ToolCall id="{tc["id"]}" type="{tc["type"]}" name="{tc["function"]["name"]}">'
+                f'{tc["function"]["arguments"]}</ToolCall>'
+                for tc in message['tool_calls']
+            )
+            return f'  <Message role="{role}">\n    {tool_calls_xml}\n  </Message>'
+
+        # Handle legacy function_call format (deprecated)
+        if 'function_call' in message and message['function_call']:
+            import json
+            func_call = message['function_call']
+            args_json = json.dumps(func_call['arguments'], indent=2)
+            return f'  <Message role="{role}"><FunctionCall name="{func_call["name"]}">{args_json}</FunctionCall></Message>'
+
+        # Regular message
+        content = message.get('content', '')
+        return f'  <Message role="{role}">{content}</Message>'
+
     def prepend_tool_calling_instructions(
         self,
         original_prompt: str,
@@ -1,7 +1,16 @@
 """Server submodule for HTTP server utilities."""
 
+from .admission import AdmissionController, AdmissionRejectedError, AdmissionTicket
 from .dynamic_mcp_bridge import dynamic_mcp_bridge, DynamicMcpBridge, RequestContext
-from .dynamic_mcp_server import DynamicMcpServer, ToolCallRecord
+from .dynamic_mcp_server import (
+    DynamicMcpServer,
+    InvalidTerminationPolicyError,
+    TerminationPolicy,
+    TerminationStats,
+    ToolCallRecord,
+)
+from .session_store import ThreadSessionStore
+from .termination_scheduler import ScheduledCall, TerminationScheduler, termination_scheduler
 from .types import (
     ChatCompletionFunction,
     ChatCompletionRequest,
@@ -11,6 +20,9 @@ from .types import (
 )
 
 __all__ = [
+    "AdmissionController",
+    "AdmissionRejectedError",
+    "AdmissionTicket",
     "ChatCompletionFunction",
     "ChatCompletionRequest",
     "ChatCompletionResponse",
@@ -19,6 +31,13 @@ __all__ = [
     "dynamic_mcp_bridge",
     "DynamicMcpBridge",
     "DynamicMcpServer",
+    "InvalidTerminationPolicyError",
+    "TerminationPolicy",
+    "TerminationStats",
     "ToolCallRecord",
     "RequestContext",
+    "ScheduledCall",
+    "TerminationScheduler",
+    "termination_scheduler",
+    "ThreadSessionStore",
 ]
@@ -0,0 +1,205 @@
+"""
+Admission control for agent servers.
+
+Each request to an agent server forks a codex process, so the number of
+requests in flight has to be capped. The controller admits up to
+`max_concurrency` requests, parks the overflow in a bounded FIFO queue, and
+rejects requests once the queue is full or a request has waited longer
+than `queue_timeout_ms`.
+
+THREAD SAFETY:
+- The controller is bound to the server's event loop
+- No locks needed: state is only mutated between awaits on that loop
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional
+
+
+class AdmissionRejectedError(Exception):
+    """Raised when a request cannot be admitted (queue full or wait timed out)."""
+
+    def __init__(self, message: str, retry_after_seconds: int):
+        super().__init__(message)
+        self.retry_after_seconds = retry_after_seconds
+
+
+@dataclass
+class AdmissionTicket:
+    """
+    A concurrency slot held by one request.
+
+    release() must be called exactly when the request's work is done;
+    calling it more than once is a no-op.
+    """
+
+    controller: "AdmissionController"
+    acquired_at: float
+    wait_seconds: float
+    released: bool = False
+
+    def release(self) -> None:
+        """Return the slot to the controller."""
+        if self.released:
+            return
+        self.released = True
+        self.controller._release(time.monotonic() - self.acquired_at)
+
+
+class AdmissionController:
+    """
+    Concurrency limiter with a bounded FIFO wait queue.
+
+    Example:
+        ```python
+        controller = AdmissionController(max_concurrency=8, max_queue_depth=32)
+        ticket = await controller.acquire()
+        try:
+            ...
+        finally:
+            ticket.release()
+        ```
+    """
+
+    # Weight of the latest sample in the moving averages
+    EWMA_ALPHA = 0.2
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue_depth: int = 100,
+        queue_timeout_ms: Optional[int] = 30000,
+    ):
+        """
+        Initialize controller.
+
+        Args:
+            max_concurrency: Maximum requests running at once
+            max_queue_depth: Maximum requests waiting for a slot (0 = no queue)
+            queue_timeout_ms: Maximum time a request waits for a slot (None = no limit)
+        """
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be >= 1, got {max_concurrency}")
+        if max_queue_depth < 0:
+            raise ValueError(f"max_queue_depth must be >= 0, got {max_queue_depth}")
+
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.queue_timeout_ms = queue_timeout_ms
+
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        # Counters
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+        # Moving averages (seconds)
+        self._avg_wait = 0.0
+        self._max_wait = 0.0
+        self._avg_hold = 0.0
+
+    async def acquire(self) -> AdmissionTicket:
+        """
+        Wait for a concurrency slot.
+
+        Returns:
+            Ticket holding the slot
+
+        Raises:
+            AdmissionRejectedError: If the queue is full or the wait timed out
+        """
+        start = time.monotonic()
+
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            return self._admit(start)
+
+        if len(self._waiters) >= self.max_queue_depth:
+            self.rejected += 1
+            raise AdmissionRejectedError(
+                f"Server is at capacity ({self._active} running, "
+                f"{len(self._waiters)} queued)",
+                self._retry_after(),
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+
+        try:
+            if self.queue_timeout_ms is None:
+                await waiter
+            else:
+                await asyncio.wait_for(waiter, self.queue_timeout_ms / 1000.0)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.timed_out += 1
+            raise AdmissionRejectedError(
+                f"Timed out after {self.queue_timeout_ms} ms waiting for a free slot",
+                self._retry_after(),
+            ) from None
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+
+        # Slot was handed over by _release(); _active already counts it
+        return self._admit(start)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get current load, counters and wait times."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue_depth": self.max_queue_depth,
+            "active": self._active,
+            "queue_depth": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_ms": round(self._avg_wait * 1000, 1),
+            "max_wait_ms": round(self._max_wait * 1000, 1),
+            "avg_run_ms": round(self._avg_hold * 1000, 1),
+        }
+
+    def _admit(self, start: float) -> AdmissionTicket:
+        """Record an admission and create its ticket."""
+        now = time.monotonic()
+        wait = now - start
+        self.admitted += 1
+        self._avg_wait += self.EWMA_ALPHA * (wait - self._avg_wait)
+        self._max_wait = max(self._max_wait, wait)
+        return AdmissionTicket(controller=self, acquired_at=now, wait_seconds=wait)
+
+    def _release(self, hold_seconds: float) -> None:
+        """Return a slot after a request held it for `hold_seconds`."""
+        self._avg_hold += self.EWMA_ALPHA * (hold_seconds - self._avg_hold)
+        self._free_slot()
+
+    def _free_slot(self) -> None:
+        """Hand the slot to the next waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+        self._active -= 1
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        """Drop a waiter that gave up, passing on a slot it was already given."""
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            # Already dequeued: if a slot was handed over, pass it on
+            if waiter.done() and not waiter.cancelled():
+                self._free_slot()
+
+    def _retry_after(self) -> int:
+        """Estimate seconds until a queued request would be admitted."""
+        backlog = len(self._waiters) + 1
+        estimate = self._avg_hold * backlog / self.max_concurrency
+        return max(1, math.ceil(estimate))
@@ -19,25 +19,50 @@ Solution:
    - Continue conversation with codex-cli
 
 Implementation notes:
-- Single global HTTP server (avoid multiple ports for concurrent requests)
+- Single global HTTP server (avoid multiple ports for concurrent requests); when an
+  agentwrap HTTP server is running, the bridge is mounted on it under /mcp instead
+- Same-host deployments can bind the standalone server to a Unix domain socket;
+  codex then reaches it through a stdio proxy script (mcp_uds_proxy.py)
+- Each request is injected with its own endpoint (/r/{requestId}), whose tools/list
+  only returns that request's functions and whose tools/call only runs them; there
+  is no shared endpoint listing or calling other requests' functions
 - Each request gets unique ID, function names prefixed with requestId (format: {requestId}_{functionName})
 - Multiple concurrent requests can coexist without conflict
 - Agent sees functions as: userDefinedFunctions.{requestId}_* in prompts for better identification
-- **THREAD SAFETY**: Uses locks to protect all shared state
+- Tool calls are routed in O(1) via a prefixed-name index and the {requestId}_ prefix
+- **THREAD SAFETY**: Uses locks to protect all shared state; routing maps are
+  copy-on-write so lookups never take a lock
 """
 
 import asyncio
-import json
+import ipaddress
+import os
 import secrets
+import socket
+import stat
+import sys
+import tempfile
 import threading
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
-from fastapi import FastAPI, Request, Response
+from fastapi import APIRouter, FastAPI, Request, Response
 from fastapi.responses import PlainTextResponse, StreamingResponse
 import uvicorn
 
-from .dynamic_mcp_server import DynamicMcpServer, ToolCallRecord
+from .. import jsoncodec
+from .dynamic_mcp_server import (
+    DynamicMcpServer,
+    TerminationPolicy,
+    TerminationStats,
+    ToolCallRecord,
+)
+
+# Stdio proxy codex launches to reach a bridge on a Unix socket (run by path:
+# it only imports the standard library)
+UDS_PROXY_SCRIPT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "mcp_uds_proxy.py"
+)
 
 
 @dataclass
@@ -61,10 +86,11 @@ class DynamicMcpBridge:
     user-defined functions with codex-cli agent.
 
     THREAD SAFETY:
-    - All methods that access shared state use locks
+    - All methods that modify shared state use locks
     - Multiple threads can safely register/unregister requests concurrently
     - HTTP server start/stop is protected by lock
-    - requests map is protected by lock
+    - requests map and function index are copy-on-write: writers replace them
+      under lock, readers use the current snapshot without locking
     """
 
     _instance: Optional["DynamicMcpBridge"] = None
@@ -91,108 +117,271 @@ class DynamicMcpBridge:
         self.server_port: Optional[int] = None
         self.server_host: str = "127.0.0.1"
         self._server_task: Optional[asyncio.Task] = None
+        self._server_ready: Optional[threading.Event] = None
+        # Unix socket path when the standalone server is bound to one
+        self.uds_path: Optional[str] = None
+        # Path prefix when mounted on a host server's app (None = standalone)
+        self.mounted_path: Optional[str] = None
 
-        # Request contexts (protected by lock)
+        # Request contexts (copy-on-write, replaced under lock)
         self._requests_lock = threading.Lock()
         self.requests: Dict[str, RequestContext] = {}
+        # Prefixed function name -> context (copy-on-write, replaced under lock)
+        self._function_index: Dict[str, RequestContext] = {}
 
         # FastAPI app
         self.app: Optional[FastAPI] = None
 
+        # Tool-call batching statistics across all requests
+        self.termination_stats = TerminationStats()
+
     async def ensure_server_started(
-        self, host: str = "127.0.0.1", port: int = 0
+        self, host: str = "127.0.0.1", port: int = 0, uds_path: Optional[str] = None
     ) -> int:
         """
         Get or create the global HTTP server for dynamic MCP bridge.
 
-        THREAD SAFETY: Uses lock to protect server state.
+        If the bridge is mounted on a host server (see mount()), that server
+        is used. Otherwise a standalone server is started in a background
+        thread; the caller's event loop keeps running while it starts.
+
+        THREAD SAFETY: Uses lock to protect server state (never held across awaits).
 
         Args:
             host: Server host
             port: Server port (0 = random port)
+            uds_path: Bind the standalone server to this Unix socket instead of TCP
 
         Returns:
-            Actual port number
+            Actual port number (0 when bound to a Unix socket)
         """
-        import socket
-        import time
+        with self._server_lock:
+            # Mounted on a host server, or standalone server already created
+            if self.mounted_path is not None or self.http_server is not None:
+                ready = self._server_ready
+            else:
+                # Bind now and hand the socket to uvicorn (no bind-then-close port race)
+                sock = self._bind_socket(host, port, uds_path)
+                if uds_path:
+                    self.uds_path = uds_path
+                    self.server_port = 0
+                else:
+                    self.uds_path = None
+                    self.server_port = sock.getsockname()[1]
+                self.server_host = host
+                ready = self._start_standalone_server(sock)
+            port = self.server_port
+
+        if ready is not None and not ready.is_set():
+            # Wait for startup off the event loop
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, ready.wait, 5)
 
         with self._server_lock:
-            # Server already running
-            if self.http_server and self.server_port is not None:
-                return self.server_port
+            if self.mounted_path is None and not (self.http_server and self.http_server.started):
+                self.http_server = None
+                self.server_port = None
+                self.uds_path = None
+                raise RuntimeError("Server failed to start")
 
-            # If port is 0, find an available port
-            if port == 0:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.bind((host, 0))
-                    s.listen(1)
-                    port = s.getsockname()[1]
+        return port
 
-            self.server_port = port
-            self.server_host = host
+    def _bind_socket(self, host: str, port: int, uds_path: Optional[str]) -> socket.socket:
+        """Bind the standalone server's listening socket (TCP or Unix domain)."""
+        if uds_path:
+            return self._bind_unix_socket(uds_path)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        return sock
 
-            # Create FastAPI app
-            self.app = FastAPI(title="Dynamic MCP Bridge")
+    def _bind_unix_socket(self, uds_path: str) -> socket.socket:
+        """
+        Bind a Unix socket at `uds_path` that only the current user can connect to.
 
-            # Register routes
-            @self.app.get("/.well-known/oauth-authorization-server")
-            async def oauth_discovery():
-                return {}
+        The socket is bound inside a private (0700) directory, restricted to
+        0600 and then renamed into place, so it is never reachable with
+        umask permissions.
 
-            @self.app.options("/")
-            async def cors_preflight():
-                return Response(
-                    status_code=200,
-                    headers={
-                        "Access-Control-Allow-Origin": "*",
-                        "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
-                        "Access-Control-Allow-Headers": "Content-Type",
-                    },
-                )
+        Raises:
+            FileExistsError: If something other than a socket is at `uds_path`
+        """
+        # Remove a stale socket left by a previous process, but nothing else
+        try:
+            mode = os.lstat(uds_path).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(f"{uds_path} exists and is not a socket")
+            os.unlink(uds_path)
+
+        # Same directory as uds_path, so the rename stays on one filesystem
+        private_dir = tempfile.mkdtemp(prefix=".uds-", dir=os.path.dirname(uds_path) or ".")
+        temp_path = os.path.join(private_dir, "s")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.bind(temp_path)
+            os.chmod(temp_path, 0o600)
+            os.rename(temp_path, uds_path)
+        except BaseException:
+            sock.close()
+            if os.path.lexists(temp_path):
+                os.unlink(temp_path)
+            raise
+        finally:
+            os.rmdir(private_dir)
+        return sock
+
+    def _start_standalone_server(self, sock: socket.socket) -> threading.Event:
+        """
+        Start a dedicated uvicorn server for the bridge in a daemon thread.
 
-            @self.app.post("/")
-            async def handle_mcp_request(request: Request):
-                return await self._handle_http_request(request)
+        THREAD SAFETY: Caller holds _server_lock.
 
-            # Configure uvicorn
-            config = uvicorn.Config(
-                app=self.app,
-                host=host,
-                port=port,
-                log_level="warning",
-            )
-            self.http_server = uvicorn.Server(config)
-
-            # Start server in background thread
-            def run_server():
-                asyncio.run(self.http_server.serve())
-
-            server_thread = threading.Thread(target=run_server, daemon=True)
-            server_thread.start()
-
-            # Wait for server to be ready
-            max_wait = 5
-            start_time = time.time()
-            while time.time() - start_time < max_wait:
-                try:
-                    # Try to connect to the server to verify it's ready
-                    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                        s.settimeout(0.1)
-                        s.connect((host, port))
-                        break
-                except (socket.error, ConnectionRefusedError):
-                    time.sleep(0.1)
-            else:
-                raise RuntimeError("Server failed to start")
+        Returns:
+            Event set once the server is listening (or failed to start)
+        """
+        ready = threading.Event()
+        self._server_ready = ready
+
+        # Create FastAPI app
+        self.app = FastAPI(title="Dynamic MCP Bridge")
+
+        # Register routes
+        @self.app.get("/.well-known/oauth-authorization-server")
+        async def oauth_discovery():
+            return {}
 
-            print(
-                f"[DynamicMcpBridge] HTTP server started on {self.server_host}:{self.server_port}"
+        self.app.include_router(self.create_router())
+
+        # Configure uvicorn (serves on the already bound socket)
+        config = uvicorn.Config(
+            app=self.app,
+            log_level="warning",
+        )
+        server = uvicorn.Server(config)
+        self.http_server = server
+
+        async def serve():
+            serve_task = asyncio.ensure_future(server.serve(sockets=[sock]))
+            while not server.started and not serve_task.done():
+                await asyncio.sleep(0.01)
+            ready.set()
+            await serve_task
+
+        # Start server in background thread
+        def run_server():
+            try:
+                asyncio.run(serve())
+            finally:
+                ready.set()
+
+        server_thread = threading.Thread(target=run_server, daemon=True)
+        server_thread.start()
+
+        print(f"[DynamicMcpBridge] HTTP server starting on {self._describe_address()}")
+
+        return ready
+
+    def create_router(self, local_only: bool = False) -> APIRouter:
+        """
+        Create the bridge's MCP routes.
+
+        Routes:
+        - POST /r/{request_id} - MCP endpoint serving one request's functions
+
+        Args:
+            local_only: Serve without CORS headers and answer peers on other
+                hosts with 403. For routers mounted on a server that may listen
+                on a public address.
+        """
+        router = APIRouter()
+
+        if local_only:
+
+            @router.post("/r/{request_id}")
+            async def handle_local_mcp_request(request_id: str, request: Request):
+                if not self._is_local_peer(request):
+                    return PlainTextResponse("Forbidden", status_code=403)
+                response = await self._handle_http_request(request, request_id)
+                del response.headers["Access-Control-Allow-Origin"]
+                return response
+
+            return router
+
+        @router.options("/r/{request_id}")
+        async def cors_preflight():
+            return Response(
+                status_code=200,
+                headers={
+                    "Access-Control-Allow-Origin": "*",
+                    "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+                    "Access-Control-Allow-Headers": "Content-Type",
+                },
             )
 
-            return self.server_port
+        @router.post("/r/{request_id}")
+        async def handle_scoped_mcp_request(request_id: str, request: Request):
+            return await self._handle_http_request(request, request_id)
+
+        return router
+
+    def _is_local_peer(self, request: Request) -> bool:
+        """Whether a request comes from this host (loopback or the address codex uses)."""
+        peer = request.client.host if request.client else None
+        if not peer:
+            return False
+        if peer == self.server_host:
+            return True
+        try:
+            return ipaddress.ip_address(peer).is_loopback
+        except ValueError:
+            return False
+
+    def mount(self, app: FastAPI, host: str, port: int, path: str = "/mcp") -> None:
+        """
+        Serve the bridge from a host server's FastAPI app.
+
+        Codex then reaches the bridge on the host server's port, handled on
+        the host's event loop, and no standalone server is started. Only the
+        per-request endpoints are mounted, and only for peers on this host
+        (see create_router(local_only=True)).
+
+        THREAD SAFETY: Uses lock to protect server state.
+
+        Args:
+            app: Host FastAPI app (before it starts serving)
+            host: Address codex should connect to (e.g. 127.0.0.1)
+            port: Port the host server listens on
+            path: Path prefix for the bridge routes
+        """
+        app.include_router(self.create_router(local_only=True), prefix=path)
 
-    def register_request(self, functions: List[Dict[str, Any]]) -> RequestContext:
+        with self._server_lock:
+            self.mounted_path = path
+            self.server_host = host
+            self.server_port = port
+
+        print(f"[DynamicMcpBridge] Mounted on host server at {host}:{port}{path}")
+
+    def unmount(self) -> None:
+        """
+        Stop using the host server (e.g. after it shut down).
+
+        THREAD SAFETY: Uses lock to protect server state.
+        """
+        with self._server_lock:
+            if self.mounted_path is None:
+                return
+            self.mounted_path = None
+            self.server_port = None
+
+    def register_request(
+        self,
+        functions: List[Dict[str, Any]],
+        termination_policy: Optional[TerminationPolicy] = None,
+    ) -> RequestContext:
         """
         Register a new OpenAI request with user-defined functions.
         Creates a dynamic MCP server instance for this request.
@@ -201,6 +390,7 @@ class DynamicMcpBridge:
 
         Args:
             functions: List of function definitions
+            termination_policy: When to stop the agent after function calls (default policy if None)
 
         Returns:
             RequestContext for this request
@@ -220,7 +410,11 @@ class DynamicMcpBridge:
             prefixed_functions.append(prefixed_fn)
 
         # Create dynamic MCP server for these user-defined functions
-        mcp_server = DynamicMcpServer(prefixed_functions)
+        mcp_server = DynamicMcpServer(
+            prefixed_functions,
+            termination_policy=termination_policy,
+            termination_stats=self.termination_stats,
+        )
 
         context = RequestContext(
             request_id=request_id,
@@ -229,9 +423,13 @@ class DynamicMcpBridge:
             function_name_map=function_name_map,
         )
 
-        # Store context (thread-safe)
+        # Store context and index its functions (copy-on-write)
         with self._requests_lock:
-            self.requests[request_id] = context
+            self.requests = {**self.requests, request_id: context}
+            self._function_index = {
+                **self._function_index,
+                **dict.fromkeys(function_name_map, context),
+            }
 
         print(
             f"[DynamicMcpBridge] Registered request {request_id} with user functions: "
@@ -253,20 +451,62 @@ class DynamicMcpBridge:
             context = self.requests.get(request_id)
             if context:
                 context.mcp_server.cancel_termination()
-                del self.requests[request_id]
+                requests = dict(self.requests)
+                del requests[request_id]
+                self.requests = requests
+                function_index = dict(self._function_index)
+                for name in context.function_name_map:
+                    del function_index[name]
+                self._function_index = function_index
                 print(f"[DynamicMcpBridge] Unregistered request {request_id}")
 
-    async def _handle_http_request(self, request: Request) -> Response:
+    def _describe_address(self) -> str:
+        """Human-readable address of the standalone server."""
+        if self.uds_path:
+            return f"unix:{self.uds_path}"
+        return f"{self.server_host}:{self.server_port}"
+
+    def get_request_skill(self, request_id: str) -> Dict[str, Any]:
+        """
+        Get the MCP skill config that connects an agent to `request_id`'s functions.
+
+        Over TCP this is the request's URL. On a Unix socket, codex launches
+        the stdio proxy script (mcp_uds_proxy.py), which forwards to the socket.
+        """
+        if self.uds_path and self.mounted_path is None:
+            return {
+                "type": "mcp",
+                "transport": "stdio",
+                "command": sys.executable,
+                "args": ["-I", "-S", UDS_PROXY_SCRIPT, self.uds_path, request_id],
+            }
+        return {
+            "type": "mcp",
+            "transport": "sse",
+            "url": self.get_request_url(request_id),
+        }
+
+    def get_request_url(self, request_id: str) -> str:
+        """Get the MCP endpoint serving only the functions of `request_id`."""
+        base_path = self.mounted_path or ""
+        return f"http://{self.server_host}:{self.server_port}{base_path}/r/{request_id}"
+
+    async def _handle_http_request(self, request: Request, request_id: str) -> Response:
         """
         Handle incoming HTTP request.
 
-        THREAD SAFETY: Accesses requests map with lock.
+        Args:
+            request: HTTP request carrying a JSON-RPC message
+            request_id: Request whose functions this endpoint serves
+
+        THREAD SAFETY: Reads a snapshot of the requests map.
         """
         try:
             body = await request.body()
-            mcp_request = json.loads(body.decode("utf-8"))
+            mcp_request = jsoncodec.loads(body)
 
-            print(f"[DynamicMcpBridge] MCP request: {json.dumps(mcp_request)}")
+            # Log the raw body instead of re-serializing the parsed message
+            print(f"[DynamicMcpBridge] MCP request: {body.decode('utf-8', 'replace')}")
 
             method = mcp_request.get("method", "")
 
@@ -288,9 +528,9 @@ class DynamicMcpBridge:
             if method == "initialize":
                 return await self._handle_initialize(mcp_request)
             elif method == "tools/list":
-                return await self._handle_tools_list(mcp_request)
+                return await self._handle_tools_list(mcp_request, request_id)
             elif method == "tools/call":
-                return await self._handle_tools_call(mcp_request)
+                return await self._handle_tools_call(mcp_request, request_id)
             else:
                 # Unknown method
                 return StreamingResponse(
@@ -338,30 +578,26 @@ class DynamicMcpBridge:
             },
         )
 
-    async def _handle_tools_list(self, mcp_request: Dict[str, Any]) -> Response:
+    async def _handle_tools_list(self, mcp_request: Dict[str, Any], request_id: str) -> Response:
         """
-        Handle tools/list by aggregating all user-defined functions from all active requests.
+        Handle tools/list with the functions of one request.
 
-        THREAD SAFETY: Accesses requests map with lock.
-        """
-        all_tools = []
+        Each request's tools are serialized once when it registers, so the
+        response splices in the cached JSON.
 
-        # Aggregate tools from all concurrent requests
-        with self._requests_lock:
-            for context in self.requests.values():
-                mcp_response = context.mcp_server.handle_request(mcp_request)
-                if mcp_response and mcp_response.get("result"):
-                    result_tools = mcp_response["result"].get("tools", [])
-                    all_tools.extend(result_tools)
+        THREAD SAFETY: Reads a snapshot of the requests map.
+        """
+        # Empty once the request is unregistered
+        context = self.requests.get(request_id)
+        tools_json = context.mcp_server.tools_json if context else "[]"
 
-        response = {
-            "jsonrpc": "2.0",
-            "id": mcp_request.get("id"),
-            "result": {"tools": all_tools},
-        }
+        body = (
+            f'data: {{"jsonrpc": "2.0", "id": {jsoncodec.dumps(mcp_request.get("id"))}, '
+            f'"result": {{"tools": {tools_json}}}}}\n\n'
+        )
 
-        return StreamingResponse(
-            self._sse_response(response),
+        return Response(
+            content=body,
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
@@ -369,11 +605,13 @@ class DynamicMcpBridge:
             },
         )
 
-    async def _handle_tools_call(self, mcp_request: Dict[str, Any]) -> Response:
+    async def _handle_tools_call(self, mcp_request: Dict[str, Any], request_id: str) -> Response:
         """
         Handle tools/call by routing to the correct server.
 
-        THREAD SAFETY: Accesses requests map with lock.
+        Only functions of `request_id` can be called.
+
+        THREAD SAFETY: Lock-free lookup; the context's server is thread-safe.
         """
         function_name = mcp_request.get("params", {}).get("name")
 
@@ -381,21 +619,22 @@ class DynamicMcpBridge:
             return PlainTextResponse("Missing function name", status_code=400)
 
         # Find the request context that has this function
-        with self._requests_lock:
-            for context in self.requests.values():
-                if function_name in context.function_name_map:
-                    # Handle the tool call with this context's server
-                    mcp_response = context.mcp_server.handle_request(mcp_request)
-
-                    if mcp_response:
-                        return StreamingResponse(
-                            self._sse_response(mcp_response),
-                            media_type="text/event-stream",
-                            headers={
-                                "Cache-Control": "no-cache",
-                                "Access-Control-Allow-Origin": "*",
-                            },
-                        )
+        context = self.get_context_by_function_name(function_name)
+        if context and context.request_id != request_id:
+            context = None
+        if context:
+            # Handle the tool call with this context's server
+            mcp_response = context.mcp_server.handle_request(mcp_request)
+
+            if mcp_response:
+                return StreamingResponse(
+                    self._sse_response(mcp_response),
+                    media_type="text/event-stream",
+                    headers={
+                        "Cache-Control": "no-cache",
+                        "Access-Control-Allow-Origin": "*",
+                    },
+                )
 
         # Function not found
         response = {
@@ -415,7 +654,14 @@ class DynamicMcpBridge:
 
     async def _sse_response(self, data: Dict[str, Any]):
         """Generate SSE response."""
-        yield f"data: {json.dumps(data)}\n\n"
+        yield f"data: {jsoncodec.dumps(data)}\n\n"
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get active request count and tool-call batching statistics."""
+        return {
+            "active_requests": len(self.requests),
+            "termination": self.termination_stats.snapshot(),
+        }
 
     def get_port(self) -> Optional[int]:
         """Get the current server port (None if not started)."""
@@ -431,13 +677,11 @@ class DynamicMcpBridge:
         Remove prefix from function name to get original name.
         Works with both old suffix format (name_id) and new prefix format (id_name).
 
-        THREAD SAFETY: Accesses requests map with lock.
+        THREAD SAFETY: Lock-free lookup in the current index snapshot.
         """
-        with self._requests_lock:
-            for context in self.requests.values():
-                original_name = context.function_name_map.get(prefixed_name)
-                if original_name:
-                    return original_name
+        context = self.get_context_by_function_name(prefixed_name)
+        if context:
+            return context.function_name_map[prefixed_name]
 
         # If not found, return as-is
         return prefixed_name
@@ -456,13 +700,17 @@ class DynamicMcpBridge:
         """
         Get request context by function name.
 
-        THREAD SAFETY: Accesses requests map with lock.
+        Resolves the {requestId}_ prefix first, then falls back to the
+        prefixed-name index (e.g. for names containing no request id).
+
+        THREAD SAFETY: Lock-free lookup in the current map snapshots.
         """
-        with self._requests_lock:
-            for context in self.requests.values():
-                if function_name in context.function_name_map:
-                    return context
-        return None
+        request_id, separator, _ = function_name.partition("_")
+        if separator:
+            context = self.requests.get(request_id)
+            if context and function_name in context.function_name_map:
+                return context
+        return self._function_index.get(function_name)
 
 
 # Export singleton instance
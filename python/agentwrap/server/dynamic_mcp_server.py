@@ -6,12 +6,19 @@ function definitions as MCP tools. When a tool is called, it records the
 call and signals the agent to stop.
 """
 
+import hashlib
 import json
 import threading
 import time
-from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional, Union
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field, fields, replace
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
+from jsonschema import SchemaError
+from jsonschema.validators import validator_for
+
+from .. import jsoncodec
+from .termination_scheduler import ScheduledCall, TerminationScheduler, termination_scheduler
 from .types import ChatCompletionFunction
 
 
@@ -52,6 +59,273 @@ class ToolCallRecord:
     function: Dict[str, str]  # {"name": str, "arguments": str (JSON)}
 
 
+class InvalidTerminationPolicyError(ValueError):
+    """Raised when a per-request termination_policy override is malformed."""
+
+
+# TerminationPolicy fields holding durations in milliseconds
+_POLICY_MS_FIELDS = ("delay_ms", "min_delay_ms", "max_delay_ms", "boundary_grace_ms")
+
+
+@dataclass
+class TerminationPolicy:
+    """
+    When to stop the agent after it calls user-defined functions.
+
+    Parallel calls arrive one by one, so the agent is stopped only once the
+    batch looks complete: either no new call arrived for `delay_ms`, or (with
+    `terminate_on_boundary`) the agent has received every call's result and
+    did not start another call within `boundary_grace_ms`.
+
+    `min_delay_ms` and `max_delay_ms` bound the stop time, counted from the
+    first call of the batch.
+    """
+
+    delay_ms: int = 2000  # Quiet period after the last call
+    min_delay_ms: int = 0  # Never stop sooner than this after the first call
+    max_delay_ms: Optional[int] = None  # Always stop by this after the first call (None = no cap)
+    terminate_on_boundary: bool = True  # Stop once all call results reached the agent
+    boundary_grace_ms: int = 100  # Wait for a follow-up call after the boundary
+
+    def __post_init__(self):
+        for name in ("delay_ms", "min_delay_ms", "max_delay_ms", "boundary_grace_ms"):
+            value = getattr(self, name)
+            if value is not None and value < 0:
+                raise ValueError(f"TerminationPolicy.{name} must be >= 0, got {value}")
+
+    def with_overrides(
+        self, overrides: Optional[Dict[str, Any]], max_ms: Optional[int] = None
+    ) -> "TerminationPolicy":
+        """
+        Create a copy with per-request overrides applied.
+
+        Overridden durations are clamped to `max_ms` (when given), and
+        `min_delay_ms` to `max_delay_ms`, so a request cannot hold a run open
+        longer than the server allows.
+
+        Raises:
+            InvalidTerminationPolicyError: If `overrides` is not an object, has
+                unknown fields or has values of the wrong type
+        """
+        if not overrides:
+            return self
+        if not isinstance(overrides, dict):
+            raise InvalidTerminationPolicyError(
+                f"termination_policy must be an object, got {type(overrides).__name__}"
+            )
+        known = {f.name for f in fields(self)}
+        unknown = set(overrides) - known
+        if unknown:
+            raise InvalidTerminationPolicyError(
+                f"Unknown termination_policy fields: {sorted(unknown)}"
+            )
+
+        values: Dict[str, Any] = {}
+        for name, value in overrides.items():
+            if name not in _POLICY_MS_FIELDS:
+                if not isinstance(value, bool):
+                    raise InvalidTerminationPolicyError(
+                        f"termination_policy.{name} must be a boolean, got {value!r}"
+                    )
+            elif value is None and name == "max_delay_ms":
+                value = max_ms
+            elif isinstance(value, bool) or not isinstance(value, int) or value < 0:
+                raise InvalidTerminationPolicyError(
+                    f"termination_policy.{name} must be an integer >= 0, got {value!r}"
+                )
+            elif max_ms is not None:
+                value = min(value, max_ms)
+            values[name] = value
+
+        min_delay_ms = values.get("min_delay_ms", self.min_delay_ms)
+        max_delay_ms = values.get("max_delay_ms", self.max_delay_ms)
+        if max_delay_ms is not None and min_delay_ms > max_delay_ms:
+            values["min_delay_ms"] = max_delay_ms
+        return replace(self, **values)
+
+    def deadline(self, first_call_at: float, now: float, boundary: bool = False) -> float:
+        """Get the time.monotonic() at which to stop the agent."""
+        wait_ms = self.boundary_grace_ms if boundary else self.delay_ms
+        deadline = now + wait_ms / 1000.0
+        if self.max_delay_ms is not None:
+            deadline = min(deadline, first_call_at + self.max_delay_ms / 1000.0)
+        return max(deadline, first_call_at + self.min_delay_ms / 1000.0)
+
+
+class TerminationStats:
+    """
+    Batching statistics shared by all dynamic MCP servers.
+
+    Records how many function calls each terminated run collected, what
+    stopped it and how long it waited after the first call, to tune
+    TerminationPolicy.
+
+    THREAD SAFETY: Uses a lock to protect counters.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.tool_calls = 0
+        self.dedup_hits = 0
+        self.max_batch_size = 0
+        self.total_wait_ms = 0.0
+        self.batch_sizes: Counter = Counter()
+        self.reasons: Counter = Counter()
+
+    def record(self, batch_size: int, reason: str, wait_ms: float) -> None:
+        """Record one terminated run."""
+        with self._lock:
+            self.batches += 1
+            self.tool_calls += batch_size
+            self.max_batch_size = max(self.max_batch_size, batch_size)
+            self.total_wait_ms += wait_ms
+            self.batch_sizes[batch_size] += 1
+            self.reasons[reason] += 1
+
+    def record_duplicate(self) -> None:
+        """Record a repeated call that was deduplicated."""
+        with self._lock:
+            self.dedup_hits += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a copy of the statistics."""
+        with self._lock:
+            batches = self.batches or 1
+            return {
+                "batches": self.batches,
+                "tool_calls": self.tool_calls,
+                "dedup_hits": self.dedup_hits,
+                "avg_batch_size": round(self.tool_calls / batches, 2),
+                "max_batch_size": self.max_batch_size,
+                "avg_wait_ms": round(self.total_wait_ms / batches, 1),
+                "batch_sizes": {str(size): n for size, n in sorted(self.batch_sizes.items())},
+                "reasons": dict(self.reasons),
+            }
+
+
+class _SchemaEntry:
+    """
+    A cached tool input schema, its JSON and its arguments validator.
+
+    The validator is compiled on first use, from the function's full
+    parameters schema.
+    """
+
+    __slots__ = ("schema", "schema_json", "_parameters", "_validator", "_compiled")
+
+    def __init__(self, parameters: Dict[str, Any]):
+        self.schema = {
+            "type": "object",
+            "properties": parameters.get("properties", {}),
+            "required": parameters.get("required", []),
+        }
+        self.schema_json = jsoncodec.dumps(self.schema)
+        self._parameters = parameters
+        self._validator = None
+        self._compiled = False
+
+    def validator(self):
+        """
+        Get the compiled arguments validator.
+
+        Returns:
+            Validator instance, or None if the schema itself is invalid
+        """
+        if not self._compiled:
+            # Compiling twice on a race is harmless: both results are equal
+            self._validator = _compile_validator(self._parameters)
+            self._compiled = True
+        return self._validator
+
+
+class _SchemaCache:
+    """
+    LRU cache of tool input schemas keyed by content hash.
+
+    Clients resend the same function definitions every turn, so requests
+    share one schema object, its serialized JSON and its compiled validator
+    instead of rebuilding them.
+
+    THREAD SAFETY: Uses a lock to protect the cache.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, _SchemaEntry] = OrderedDict()
+
+    def get(self, parameters: Dict[str, Any]) -> _SchemaEntry:
+        """Get the cached schema entry for a function's parameters."""
+        key = hashlib.sha256(
+            json.dumps(parameters, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        ).hexdigest()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        entry = _SchemaEntry(parameters)
+
+        with self._lock:
+            entry = self._entries.setdefault(key, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+# Input schemas shared by all dynamic MCP servers
+_schema_cache = _SchemaCache()
+
+
+def _compile_validator(schema: Dict[str, Any]):
+    """
+    Compile a JSON schema validator.
+
+    Returns:
+        Validator instance, or None if the schema itself is invalid
+    """
+    validator_class = validator_for(schema)
+    try:
+        validator_class.check_schema(schema)
+    except SchemaError as error:
+        print(f"[DynamicMcpServer] Not validating arguments, invalid schema: {error.message}")
+        return None
+    return validator_class(schema)
+
+
+def _normalize_json(value: Any) -> Any:
+    """Normalize numbers (1.0 -> 1) so equal arguments have one canonical form."""
+    if isinstance(value, dict):
+        return {key: _normalize_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_normalize_json(item) for item in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def canonical_arguments_hash(arguments: Any) -> str:
+    """Hash call arguments independently of key order and number formatting."""
+    canonical = json.dumps(
+        _normalize_json(arguments), sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _argument_errors(validator, arguments: Any, limit: int = 5) -> List[str]:
+    """Describe why `arguments` do not match the validator's schema (empty if valid)."""
+    errors = sorted(validator.iter_errors(arguments), key=lambda e: list(e.absolute_path))
+    messages = []
+    for error in errors[:limit]:
+        path = ".".join(str(part) for part in error.absolute_path)
+        messages.append(f"{path}: {error.message}" if path else error.message)
+    return messages
+
+
 class DynamicMcpServer:
     """
     Dynamic MCP Server that proxies user-defined functions.
@@ -59,6 +333,7 @@ class DynamicMcpServer:
     THREAD SAFETY:
     - Uses locks to protect tool_calls list
     - Uses threading.Event for termination signaling
+    - Termination deadlines run on the shared TerminationScheduler thread
     - Safe for concurrent access from multiple threads
     """
 
@@ -66,6 +341,9 @@ class DynamicMcpServer:
         self,
         functions: List[Dict[str, Any]],
         termination_delay_ms: int = 2000,
+        termination_policy: Optional[TerminationPolicy] = None,
+        termination_stats: Optional[TerminationStats] = None,
+        scheduler: Optional[TerminationScheduler] = None,
     ):
         """
         Initialize dynamic MCP server.
@@ -73,39 +351,73 @@ class DynamicMcpServer:
         Args:
             functions: List of function definitions
             termination_delay_ms: Delay before terminating agent (to collect multiple tool calls)
+            termination_policy: Batching policy (default: TerminationPolicy(delay_ms=termination_delay_ms))
+            termination_stats: Where to record batch statistics (optional)
+            scheduler: Runs the termination deadline (default: shared termination_scheduler)
         """
         self.functions = functions
-        self.termination_delay_ms = termination_delay_ms
+        self.termination_policy = termination_policy or TerminationPolicy(
+            delay_ms=termination_delay_ms
+        )
+        self.termination_delay_ms = self.termination_policy.delay_ms
+        self.termination_stats = termination_stats
+        self.scheduler = scheduler or termination_scheduler
 
         # Thread-safe state
         self._tool_calls_lock = threading.Lock()
         self.tool_calls: List[ToolCallRecord] = []
         self.next_tool_call_id = 0
+        # (name, canonical arguments hash) of recorded calls, for deduplication
+        self._call_keys: Set[Tuple[str, str]] = set()
+        self.dedup_hits = 0
 
-        # Termination signaling
+        # Termination signaling (batch state protected by _tool_calls_lock)
         self.termination_event = threading.Event()
-        self.termination_timer: Optional[threading.Timer] = None
+        self.termination_timer: Optional[ScheduledCall] = None
+        self._first_call_at: Optional[float] = None
+        self._calls_in_flight = 0
+        # Function name -> rejected calls not yet followed by a valid call
+        self._pending_retries: Counter = Counter()
 
         # Event callbacks
         self._on_tool_call: Optional[Callable[[ToolCallRecord], None]] = None
         self._on_terminate: Optional[Callable[[List[ToolCallRecord]], None]] = None
 
-    def get_tools(self) -> List[MCPTool]:
-        """Get the tools list in MCP format."""
+        # Tools are fixed for the server's lifetime: build and serialize them once
+        self._parameter_schemas: Dict[str, _SchemaEntry] = {}  # Function name -> schema
+        self._tools, self.tools_json = self._build_tools()
+
+    def _build_tools(self) -> Tuple[List[MCPTool], str]:
+        """
+        Convert function definitions to MCP tools.
+
+        Returns:
+            (tools, JSON array of the tools in tools/list format)
+        """
         tools = []
+        fragments = []
         for fn in self.functions:
             # Convert function def to MCP tool
+            parameters = fn.get("parameters", {})
+            schema = _schema_cache.get(parameters)
+            if parameters:
+                self._parameter_schemas[fn["name"]] = schema
             tool = MCPTool(
                 name=fn["name"],
                 description=fn.get("description", f"User-defined function: {fn['name']}"),
-                input_schema={
-                    "type": "object",
-                    "properties": fn.get("parameters", {}).get("properties", {}),
-                    "required": fn.get("parameters", {}).get("required", []),
-                },
+                input_schema=schema.schema,
             )
             tools.append(tool)
-        return tools
+            fragments.append(
+                f'{{"name": {jsoncodec.dumps(tool.name)}, '
+                f'"description": {jsoncodec.dumps(tool.description)}, '
+                f'"inputSchema": {schema.schema_json}}}'
+            )
+        return tools, f"[{', '.join(fragments)}]"
+
+    def get_tools(self) -> List[MCPTool]:
+        """Get the tools list in MCP format."""
+        return list(self._tools)
 
     def handle_request(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -169,7 +481,6 @@ class DynamicMcpServer:
 
     def _handle_tools_list(self, req_id: Optional[Union[str, int]]) -> Dict[str, Any]:
         """Handle tools/list request."""
-        tools = self.get_tools()
         return {
             "jsonrpc": "2.0",
             "id": req_id,
@@ -180,7 +491,7 @@ class DynamicMcpServer:
                         "description": tool.description,
                         "inputSchema": tool.input_schema,
                     }
-                    for tool in tools
+                    for tool in self._tools
                 ],
             },
         }
@@ -193,20 +504,52 @@ class DynamicMcpServer:
 
         This records the function call and schedules agent termination.
 
+        Arguments that do not match the function's parameters schema are
+        not recorded: the agent gets an error result and can retry. Until the
+        retry arrives, the batch does not end at a boundary (see
+        notify_call_completed()).
+
         THREAD SAFETY: Uses lock to protect tool_calls list.
         """
         name = params.get("name", "")
         args = params.get("arguments", {})
-        args_string = json.dumps(args)
 
-        # Check if this exact tool call already exists (deduplicate)
+        errors = self.validate_arguments(name, args)
+        if errors:
+            print(f"[DynamicMcpServer] Rejecting invalid arguments for {name}: {errors}")
+            with self._tool_calls_lock:
+                self._pending_retries[name] += 1
+            return {
+                "jsonrpc": "2.0",
+                "id": req_id,
+                "result": {
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": f"[AgentWrap] Invalid arguments for function {name}: "
+                            + "; ".join(errors)
+                            + ". Fix the arguments and call the function again.",
+                        }
+                    ],
+                    "isError": True,
+                },
+            }
+
+        args_string = jsoncodec.dumps(args)
+        call_key = (name, canonical_arguments_hash(args))
+
+        # Check if an equal tool call already exists (deduplicate)
         with self._tool_calls_lock:
-            is_duplicate = any(
-                tc.function["name"] == name and tc.function["arguments"] == args_string
-                for tc in self.tool_calls
-            )
+            if self._pending_retries[name]:
+                self._pending_retries[name] -= 1
+                if not self._pending_retries[name]:
+                    del self._pending_retries[name]
+
+            is_duplicate = call_key in self._call_keys
 
             if not is_duplicate:
+                self._call_keys.add(call_key)
+
                 # Generate unique tool call ID
                 tool_call_id = f"call_{int(time.time() * 1000)}_{self.next_tool_call_id}"
                 self.next_tool_call_id += 1
@@ -227,10 +570,16 @@ class DynamicMcpServer:
                     self._on_tool_call(tool_call)
 
                 # Schedule agent termination (delayed to allow multiple tool calls)
+                if self._first_call_at is None:
+                    self._first_call_at = time.monotonic()
                 self._schedule_termination()
             else:
+                self.dedup_hits += 1
                 print(f"[DynamicMcpServer] Skipping duplicate tool call: {name} with args {args_string}")
 
+        if is_duplicate and self.termination_stats:
+            self.termination_stats.record_duplicate()
+
         # Return success response
         return {
             "jsonrpc": "2.0",
@@ -245,30 +594,105 @@ class DynamicMcpServer:
             },
         }
 
-    def _schedule_termination(self) -> None:
+    def validate_arguments(self, name: str, arguments: Any) -> List[str]:
+        """
+        Validate call arguments against the function's parameters schema.
+
+        Returns:
+            Error messages (empty if valid or the function has no schema)
+        """
+        schema = self._parameter_schemas.get(name)
+        if schema is None:
+            return []
+        validator = schema.validator()
+        if validator is None:
+            return []
+        return _argument_errors(validator, arguments)
+
+    def _schedule_termination(self, boundary: bool = False) -> None:
         """
         Schedule agent termination.
 
         Delays termination to allow multiple tool calls to be collected.
 
-        THREAD SAFETY: Uses threading.Timer which is thread-safe.
+        THREAD SAFETY: Caller holds _tool_calls_lock; the scheduler is thread-safe.
         """
         # Cancel existing timer
         if self.termination_timer:
             self.termination_timer.cancel()
 
-        # Schedule new timer
-        def terminate():
-            with self._tool_calls_lock:
-                tool_calls_copy = list(self.tool_calls)
+        now = time.monotonic()
+        deadline = self.termination_policy.deadline(self._first_call_at, now, boundary)
+        if boundary:
+            reason = "boundary"
+        elif deadline < now + self.termination_policy.delay_ms / 1000.0:
+            reason = "max_delay"
+        else:
+            reason = "delay"
+
+        self.termination_timer = self.scheduler.call_at(deadline, self._terminate, reason)
+
+    def _terminate(self, reason: str) -> None:
+        """Signal termination with the calls collected so far (runs at most once)."""
+        with self._tool_calls_lock:
+            if self.termination_event.is_set():
+                return
             self.termination_event.set()
-            if self._on_terminate:
-                self._on_terminate(tool_calls_copy)
+            tool_calls_copy = list(self.tool_calls)
+            first_call_at = self._first_call_at
 
-        self.termination_timer = threading.Timer(
-            self.termination_delay_ms / 1000.0, terminate
-        )
-        self.termination_timer.start()
+        if self.termination_stats and first_call_at is not None:
+            wait_ms = (time.monotonic() - first_call_at) * 1000
+            self.termination_stats.record(len(tool_calls_copy), reason, wait_ms)
+
+        if self._on_terminate:
+            self._on_terminate(tool_calls_copy)
+
+    def notify_call_started(self) -> None:
+        """
+        Tell the server the agent started calling one of its functions.
+
+        Holds off a pending boundary termination until the call arrives.
+
+        THREAD SAFETY: Uses lock to protect batch state.
+        """
+        with self._tool_calls_lock:
+            self._calls_in_flight += 1
+            if self.tool_calls and not self.termination_event.is_set():
+                self._schedule_termination()
+
+    def notify_call_completed(self) -> None:
+        """
+        Tell the server the agent received the result of one of its functions.
+
+        Once every call has returned, the batch is at a boundary: the agent
+        is stopped after `boundary_grace_ms` unless it starts another call.
+        While a call rejected for invalid arguments awaits its retry, the
+        batch is not complete, so the `delay_ms` window applies instead.
+
+        THREAD SAFETY: Uses lock to protect batch state.
+        """
+        with self._tool_calls_lock:
+            self._calls_in_flight = max(0, self._calls_in_flight - 1)
+            if (
+                self.termination_policy.terminate_on_boundary
+                and self._calls_in_flight == 0
+                and self.tool_calls
+                and not self.termination_event.is_set()
+            ):
+                self._schedule_termination(boundary=not self._pending_retries)
+
+    def notify_turn_completed(self) -> None:
+        """
+        Tell the server the agent finished its turn.
+
+        Calls collected so far are final, so termination happens right away.
+        """
+        with self._tool_calls_lock:
+            if not self.tool_calls:
+                return
+            self.cancel_termination()
+        self._terminate("turn_completed")
 
     def get_tool_calls(self) -> List[ToolCallRecord]:
         """
@@ -288,12 +712,16 @@ class DynamicMcpServer:
         with self._tool_calls_lock:
             self.tool_calls = []
             self.next_tool_call_id = 0
+            self._call_keys = set()
+            self._first_call_at = None
+            self._calls_in_flight = 0
+            self._pending_retries = Counter()
 
     def cancel_termination(self) -> None:
         """
         Cancel termination timeout.
 
-        THREAD SAFETY: Timer.cancel() is thread-safe.
+        THREAD SAFETY: ScheduledCall.cancel() is thread-safe.
         """
         if self.termination_timer:
             self.termination_timer.cancel()
@@ -0,0 +1,131 @@
+"""
+Stdio to Unix Socket Proxy for the Dynamic MCP Bridge
+
+Problem: codex connects to MCP servers over stdio or HTTP URLs only, so a
+bridge bound to a Unix domain socket cannot be injected as a URL.
+
+Solution: codex launches this file as a stdio MCP server, by path:
+
+    python -I -S /path/to/mcp_uds_proxy.py <socket_path> <request_id>
+
+The proxy starts once per agent run, so it is a standalone script that
+only imports the standard library: running it by path (instead of with
+-m) skips importing agentwrap and its server dependencies, and -I -S skip
+site-packages and keep this package directory off sys.path.
+
+Each JSON-RPC message read from stdin is POSTed to the bridge's
+/r/{request_id} endpoint over one persistent HTTP/1.1 connection on the
+Unix socket, and the JSON-RPC messages in the reply are written to stdout,
+one per line.
+"""
+
+import http.client
+import json
+import socket
+import sys
+from typing import List, Optional, TextIO
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix domain socket."""
+
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if self.timeout is not None:
+            sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self.sock = sock
+
+
+def parse_messages(body: str) -> List[str]:
+    """Extract JSON-RPC messages from an SSE or plain JSON response body."""
+    body = body.strip()
+    if not body:
+        return []
+    if not body.startswith("data:"):
+        return [body]
+    return [
+        line[len("data:"):].strip()
+        for line in body.splitlines()
+        if line.startswith("data:")
+    ]
+
+
+def forward(connection: UnixHTTPConnection, path: str, message: str) -> List[str]:
+    """
+    POST one JSON-RPC message to the bridge.
+
+    Retries once on a fresh connection if the kept-alive one was closed.
+
+    Returns:
+        JSON-RPC messages to write back to codex
+    """
+    headers = {
+        "Content-Type": "application/json",
+        "Accept": "application/json, text/event-stream",
+    }
+
+    for attempt in range(2):
+        try:
+            connection.request("POST", path, body=message.encode("utf-8"), headers=headers)
+            response = connection.getresponse()
+            body = response.read().decode("utf-8")
+            break
+        except (http.client.HTTPException, ConnectionError):
+            connection.close()
+            if attempt:
+                raise
+
+    if response.status >= 400:
+        request_id = json.loads(message).get("id")
+        if request_id is None:
+            return []
+        error = {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "error": {"code": -32603, "message": f"Bridge error {response.status}: {body}"},
+        }
+        return [json.dumps(error)]
+
+    return parse_messages(body)
+
+
+def run(
+    socket_path: str,
+    request_id: str,
+    stdin: TextIO = sys.stdin,
+    stdout: TextIO = sys.stdout,
+) -> None:
+    """Relay JSON-RPC messages between stdio and the bridge until stdin closes."""
+    connection = UnixHTTPConnection(socket_path)
+    path = f"/r/{request_id}"
+
+    try:
+        for line in stdin:
+            line = line.strip()
+            if not line:
+                continue
+            for message in forward(connection, path, line):
+                stdout.write(message + "\n")
+            stdout.flush()
+    finally:
+        connection.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point: mcp_uds_proxy <socket_path> <request_id>."""
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 2:
+        print("usage: mcp_uds_proxy.py <socket_path> <request_id>", file=sys.stderr)
+        return 2
+
+    run(args[0], args[1])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Thread Session Store
+
+Maps OpenAI conversation prefixes to agent threads so a multi-turn
+conversation can continue an existing codex thread instead of replaying
+its whole history into a new one.
+
+How it works:
+- After each turn, the server stores fingerprint(messages + [assistant reply]) -> thread_id
+- On the next turn, the client resends that history plus new messages
+- The longest stored prefix of the new request identifies the thread to resume,
+  and only the messages after that prefix are sent to the agent
+
+Fingerprints are chained SHA-256 hashes over a canonical form of each
+message, so all prefixes of a conversation are hashed in one pass. The
+chain is seeded with a scope (e.g. model, function schemas and caller), so
+equal histories from different callers or under different tools never
+share a thread.
+
+THREAD SAFETY: Uses a lock to protect the session map.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _canonical_message(message: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reduce a message to the fields that identify it.
+
+    Clients echo assistant messages back with extra or reordered fields
+    (e.g. "refusal": null), so only the conversational content is kept.
+    """
+    canonical: Dict[str, Any] = {
+        "role": message.get("role"),
+        "content": message.get("content") or "",
+    }
+
+    tool_calls = message.get("tool_calls")
+    if tool_calls:
+        canonical["tool_calls"] = [
+            [tc.get("id"), tc["function"]["name"], tc["function"]["arguments"]]
+            for tc in tool_calls
+        ]
+
+    for key in ("tool_call_id", "name", "function_call"):
+        if message.get(key):
+            canonical[key] = message[key]
+
+    return canonical
+
+
+def fingerprint_prefixes(messages: List[Dict[str, Any]], scope: str = "") -> List[str]:
+    """
+    Fingerprint every prefix of a conversation.
+
+    Args:
+        messages: OpenAI-style messages
+        scope: Seed separating conversations that must not share threads
+
+    Returns:
+        List where item i is the fingerprint of messages[: i + 1]
+    """
+    digest = hashlib.sha256(scope.encode("utf-8"))
+    digest.update(b"\x00")
+    fingerprints = []
+
+    for message in messages:
+        encoded = json.dumps(
+            _canonical_message(message), sort_keys=True, separators=(",", ":")
+        )
+        digest.update(encoded.encode("utf-8"))
+        digest.update(b"\x00")
+        fingerprints.append(digest.copy().hexdigest())
+
+    return fingerprints
+
+
+class ThreadSessionStore:
+    """
+    LRU map of conversation fingerprints to agent thread ids.
+
+    Example:
+        ```python
+        store = ThreadSessionStore()
+        store.put(messages + [assistant_message], thread_id)
+
+        match = store.find(next_request_messages)
+        if match:
+            thread_id, prefix_length = match
+            new_messages = next_request_messages[prefix_length:]
+        ```
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 3600.0):
+        """
+        Initialize store.
+
+        Args:
+            max_entries: Maximum conversations remembered (least recently used evicted)
+            ttl_seconds: Forget conversations not continued within this time
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        # fingerprint -> (thread_id, stored_at)
+        self._sessions: OrderedDict[str, Tuple[str, float]] = OrderedDict()
+
+    def put(self, messages: List[Dict[str, Any]], thread_id: str, scope: str = "") -> None:
+        """
+        Remember that `thread_id` has seen exactly `messages`.
+
+        Args:
+            messages: Full conversation including the agent's last reply
+            thread_id: Agent thread holding that conversation
+            scope: Scope the conversation belongs to (see fingerprint_prefixes)
+        """
+        if not messages or not thread_id:
+            return
+
+        fingerprint = fingerprint_prefixes(messages, scope)[-1]
+
+        with self._lock:
+            self._sessions[fingerprint] = (thread_id, time.monotonic())
+            self._sessions.move_to_end(fingerprint)
+            while len(self._sessions) > self.max_entries:
+                self._sessions.popitem(last=False)
+
+    def find(
+        self, messages: List[Dict[str, Any]], scope: str = ""
+    ) -> Optional[Tuple[str, int]]:
+        """
+        Find the thread holding the longest known prefix of `messages`.
+
+        Only proper prefixes match: there must be at least one new message
+        to send to the resumed thread.
+
+        Args:
+            messages: Conversation from the incoming request
+            scope: Scope the conversation belongs to (see fingerprint_prefixes)
+
+        Returns:
+            (thread_id, prefix_length) or None if no prefix is known
+        """
+        fingerprints = fingerprint_prefixes(messages, scope)
+        now = time.monotonic()
+
+        with self._lock:
+            for length in range(len(messages) - 1, 0, -1):
+                fingerprint = fingerprints[length - 1]
+                entry = self._sessions.get(fingerprint)
+                if entry is None:
+                    continue
+
+                thread_id, stored_at = entry
+                if now - stored_at > self.ttl_seconds:
+                    del self._sessions[fingerprint]
+                    continue
+
+                self._sessions.move_to_end(fingerprint)
+                return thread_id, length
+
+        return None
+
+    def discard(self, thread_id: str) -> None:
+        """Forget every conversation mapped to `thread_id` (e.g. thread no longer exists)."""
+        with self._lock:
+            stale = [fp for fp, (tid, _) in self._sessions.items() if tid == thread_id]
+            for fingerprint in stale:
+                del self._sessions[fingerprint]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
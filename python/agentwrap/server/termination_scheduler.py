@@ -0,0 +1,124 @@
+"""
+Termination Scheduler
+
+Runs the termination deadlines of all dynamic MCP servers on one thread.
+
+A function-calling request reschedules its termination on every tool call.
+With one threading.Timer per deadline, hundreds of concurrent requests meant
+hundreds of short-lived OS threads. The scheduler keeps all deadlines in a
+heap instead: scheduling is O(log n) and cancelling only marks the entry,
+which is dropped when it reaches the top of the heap.
+
+THREAD SAFETY:
+- call_later()/call_at() and ScheduledCall.cancel() may be used from any thread
+- Callbacks run on the scheduler thread and must be quick
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class ScheduledCall:
+    """A pending callback; cancel() prevents it from running."""
+
+    __slots__ = ("deadline", "callback", "args", "cancelled")
+
+    def __init__(self, deadline: float, callback: Callable[..., None], args: Tuple[Any, ...]):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Cancel the call (no-op if it already ran)."""
+        self.cancelled = True
+
+
+class TerminationScheduler:
+    """
+    Heap-based timer driven by a single daemon thread.
+
+    The thread is started on first use.
+
+    Example:
+        ```python
+        call = termination_scheduler.call_later(2.0, terminate, "delay")
+        call.cancel()
+        ```
+    """
+
+    def __init__(self):
+        """Initialize scheduler."""
+        self._condition = threading.Condition()
+        # (deadline, sequence, call); sequence keeps equal deadlines in FIFO order
+        self._heap: List[Tuple[float, int, ScheduledCall]] = []
+        self._sequence = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+
+    def call_at(self, deadline: float, callback: Callable[..., None], *args: Any) -> ScheduledCall:
+        """
+        Run `callback(*args)` at `deadline` (a time.monotonic() value).
+
+        Returns:
+            Handle to cancel the call
+        """
+        call = ScheduledCall(deadline, callback, args)
+
+        with self._condition:
+            heapq.heappush(self._heap, (deadline, next(self._sequence), call))
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="agentwrap-termination-scheduler", daemon=True
+                )
+                self._thread.start()
+            elif self._heap[0][2] is call:
+                # New earliest deadline: wake the thread to shorten its wait
+                self._condition.notify()
+
+        return call
+
+    def call_later(self, delay: float, callback: Callable[..., None], *args: Any) -> ScheduledCall:
+        """Run `callback(*args)` after `delay` seconds."""
+        return self.call_at(time.monotonic() + delay, callback, *args)
+
+    def pending(self) -> int:
+        """Number of scheduled calls that have not run or been cancelled."""
+        with self._condition:
+            return sum(1 for _, _, call in self._heap if not call.cancelled)
+
+    def _run(self) -> None:
+        """Scheduler thread: run calls as their deadlines pass."""
+        while True:
+            call = self._next_due()
+            if call.cancelled:
+                continue
+            try:
+                call.callback(*call.args)
+            except Exception as error:
+                print(f"[TerminationScheduler] Callback failed: {error}")
+
+    def _next_due(self) -> ScheduledCall:
+        """Wait for and pop the next due call, dropping cancelled ones."""
+        with self._condition:
+            while True:
+                while self._heap and self._heap[0][2].cancelled:
+                    heapq.heappop(self._heap)
+
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+
+                deadline = self._heap[0][0]
+                now = time.monotonic()
+                if deadline <= now:
+                    return heapq.heappop(self._heap)[2]
+
+                self._condition.wait(deadline - now)
+
+
+# Shared scheduler for all dynamic MCP servers
+termination_scheduler = TerminationScheduler()
@@ -141,6 +141,10 @@ class ChatCompletionRequest:
     # Other parameters
     temperature: Optional[float] = None
     max_tokens: Optional[int] = None
+    # agentwrap extension: per-request TerminationPolicy overrides
+    termination_policy: Optional[Dict[str, Any]] = None
+    # End-user identifier; conversations of different users never share a thread
+    user: Optional[str] = None
 
 
 @dataclass
@@ -5,6 +5,8 @@ Adapts any BaseAgent implementation to provide OpenAI Chat Completion
 compatible interface.
 """
 
+import asyncio
+import contextlib
 import json
 import time
 import uuid
@@ -12,18 +14,32 @@ from dataclasses import dataclass
 from typing import Any, Callable, Dict, List, Optional
 
 from fastapi import Request, Response
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
 
+from .. import jsoncodec
 from ..agent import BaseAgent
-from ..base_server import BaseServer, ToolCall
+from ..base_server import BaseServer, HttpServerOptions, ToolCall
 from ..config import AgentInput, AllAgentConfigs
 from ..prompts import Prompts
 from ..events import (
     CommandExecutionEvent,
+    ErrorEvent,
     MessageEvent,
     ReasoningEvent,
     SkillInvokedEvent,
+    ThreadStartedEvent,
+    TurnCompletedEvent,
+    TurnStartedEvent,
 )
+from ..server.admission import AdmissionController, AdmissionRejectedError
+from ..server.dynamic_mcp_bridge import RequestContext
+from ..server.dynamic_mcp_server import (
+    InvalidTerminationPolicyError,
+    TerminationPolicy,
+    ToolCallRecord,
+)
+from ..server.session_store import ThreadSessionStore
 from ..server.types import (
     ChatCompletionAssistantMessage,
     ChatCompletionChoice,
@@ -34,16 +50,39 @@ from ..server.types import (
 )
 
 
+# Closes a chat.completion.chunk that has no finish_reason (see _chunk_envelope)
+_OPEN_CHUNK_SUFFIX = ',"finish_reason":null}]}\n\n'
+
+
 @dataclass
 class OpenAIServerOptions:
     """Options for OpenAI compatible server."""
 
     mcp_server_port: int = 0  # 0 = random port
     mcp_server_host: str = "127.0.0.1"
+    # Serve the dynamic MCP bridge from this server's HTTP app (under /mcp) when
+    # start_http_server() is used, instead of a separate server on mcp_server_port
+    mcp_bridge_on_host: bool = True
+    # Bind the dynamic MCP bridge to this Unix socket instead of TCP (same-host only;
+    # codex reaches it through a stdio proxy). Takes precedence over mcp_bridge_on_host.
+    mcp_server_uds: Optional[str] = None
     termination_delay_ms: int = 2000
+    # When to stop the agent after function calls (default: TerminationPolicy(delay_ms=termination_delay_ms));
+    # requests can override fields with a "termination_policy" object in the body
+    termination_policy: Optional[TerminationPolicy] = None
+    # Upper bound for durations in per-request termination_policy overrides
+    termination_override_max_ms: int = 60000
     bypass_request: Optional[
         Callable[[ChatCompletionRequest, Request, Response], bool]
     ] = None
+    # Admission control (None = unlimited concurrent agent runs)
+    max_concurrency: Optional[int] = None
+    max_queue_depth: int = 100  # Requests waiting for a slot before 429
+    queue_timeout_ms: Optional[int] = 30000  # Max wait for a slot before 429
+    # Continue agent threads across turns instead of replaying full history
+    # (requires an agent that honours AgentInput.thread_id, e.g. CodexAgent)
+    thread_resume: bool = False
+    session_store: Optional[ThreadSessionStore] = None  # Default: in-memory store
 
 
 class OpenAICompatibleServer(BaseServer[ChatCompletionRequest, ChatCompletionResponse]):
@@ -72,12 +111,38 @@ class OpenAICompatibleServer(BaseServer[ChatCompletionRequest, ChatCompletionRes
             options = OpenAIServerOptions()
         self.mcp_server_port = options.mcp_server_port
         self.mcp_server_host = options.mcp_server_host
+        self.mcp_server_uds = options.mcp_server_uds
+        self.mcp_bridge_on_host = options.mcp_bridge_on_host and not options.mcp_server_uds
         self.termination_delay_ms = options.termination_delay_ms
+        self.termination_policy = options.termination_policy or TerminationPolicy(
+            delay_ms=options.termination_delay_ms
+        )
+        self.termination_override_max_ms = options.termination_override_max_ms
         self.bypass_request = options.bypass_request
         self.prompts = Prompts()
+        self.admission: Optional[AdmissionController] = None
+        if options.max_concurrency is not None:
+            self.admission = AdmissionController(
+                max_concurrency=options.max_concurrency,
+                max_queue_depth=options.max_queue_depth,
+                queue_timeout_ms=options.queue_timeout_ms,
+            )
+        self.session_store: Optional[ThreadSessionStore] = None
+        if options.thread_resume:
+            self.session_store = (
+                options.session_store if options.session_store is not None else ThreadSessionStore()
+            )
 
     def register_routes(self, app):
-        """Register OpenAI-specific HTTP routes."""
+        """Register OpenAI-specific HTTP routes (and the dynamic MCP bridge, if enabled)."""
+        if self.mcp_bridge_on_host:
+            from ..server.dynamic_mcp_bridge import dynamic_mcp_bridge
+
+            # Codex connects over loopback when listening on all interfaces
+            host = self.http_host
+            if host in ("0.0.0.0", "::", ""):
+                host = "127.0.0.1"
+            dynamic_mcp_bridge.mount(app, host, self.http_port)
 
         @app.post("/v1/chat/completions")
         async def chat_completions(request: Request):
@@ -95,6 +160,31 @@ class OpenAICompatibleServer(BaseServer[ChatCompletionRequest, ChatCompletionRes
                 # Handle request (supports both streaming and non-streaming)
                 return await self.handle_request(chat_request)
 
+            except InvalidTerminationPolicyError as error:
+                return JSONResponse(
+                    {
+                        "error": {
+                            "message": str(error),
+                            "type": "invalid_request_error",
+                            "code": "invalid_termination_policy",
+                        }
+                    },
+                    status_code=400,
+                )
+
+            except AdmissionRejectedError as error:
+                return JSONResponse(
+                    {
+                        "error": {
+                            "message": str(error),
+                            "type": "rate_limit_error",
+                            "code": "rate_limit_exceeded",
+                        }
+                    },
+                    status_code=429,
+                    headers={"Retry-After": str(error.retry_after_seconds)},
+                )
+
             except Exception as error:
                 print(f"[OpenAICompatibleServer] Error: {error}")
                 return {
@@ -105,6 +195,35 @@ class OpenAICompatibleServer(BaseServer[ChatCompletionRequest, ChatCompletionRes
                     }
                 }
 
+        @app.get("/v1/stats")
+        async def stats():
+            return JSONResponse(self.get_stats())
+
+    async def start_http_server(self, options: Optional[HttpServerOptions] = None) -> None:
+        """Start HTTP server; the dynamic MCP bridge is unmounted when it stops."""
+        try:
+            await super().start_http_server(options)
+        finally:
+            if self.mcp_bridge_on_host:
+                from ..server.dynamic_mcp_bridge import dynamic_mcp_bridge
+
+                dynamic_mcp_bridge.unmount()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get server load statistics.
+
+        Includes admission control state (running requests, queue depth and
+        wait times) when max_concurrency is set, and how many function calls
+        each terminated run batched.
+        """
+        from ..server.dynamic_mcp_bridge import dynamic_mcp_bridge
+
+        return {
+            "admission": self.admission.stats() if self.admission else None,
+            "function_calling": dynamic_mcp_bridge.get_stats(),
+        }
+
     async def handle_request(
         self, request: ChatCompletionRequest, response: Optional[Response] = None
     ) -> ChatCompletionResponse:
@@ -116,6 +235,10 @@ class OpenAICompatibleServer(BaseServer[ChatCompletionRequest, ChatCompletionRes
         2. Runs agent with unified event processing
         3. Returns tool_calls response if functions were called, otherwise normal response
         4. Supports both streaming and non-streaming modes
+
+        Raises:
+            InvalidTerminationPolicyError: If the request's termination_policy is malformed
+            AdmissionRejectedError: If max_concurrency is set and no slot is available
         """
         # Extract functions (if any)
         functions = self._extract_functions(request)
@@ -128,115 +251,203 @@ class OpenAICompatibleServer(BaseServer[ChatCompletionRequest, ChatCompletionRes
         config_overrides = None
         terminated = False
         tool_calls_result = []
+        stream_owns_cleanup = False
+        # Set (thread-safely) when the dynamic MCP server terminates the run
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        # Function calls as they are recorded (streamed as tool_calls deltas)
+        tool_call_queue: asyncio.Queue[ToolCallRecord] = asyncio.Queue()
+
+        # Validate per-request termination overrides before taking a slot
+        termination_policy = (
+            self.termination_policy.with_overrides(
+                request.termination_policy, max_ms=self.termination_override_max_ms
+            )
+            if functions
+            else None
+        )
 
-        if functions:
-            from ..server.dynamic_mcp_bridge import dynamic_mcp_bridge
+        # Wait for a concurrency slot (raises AdmissionRejectedError on overflow)
+        ticket = await self.admission.acquire() if self.admission else None
 
-            # Register request with dynamic MCP bridge
-            mcp_context = dynamic_mcp_bridge.register_request(functions)
+        cleaned_up = False
 
-            # Ensure MCP server is started
-            port = await dynamic_mcp_bridge.ensure_server_started(
-                self.mcp_server_host, self.mcp_server_port
-            )
+        def cleanup():
+            """
+            Unregister the request (but keep dynamic MCP bridge running) and free its slot.
 
-            print(
-                f"[OpenAICompatibleServer] Using dynamic MCP bridge on "
-                f"{self.mcp_server_host}:{port}"
-            )
-            print(
-                f"[OpenAICompatibleServer] Request {mcp_context.request_id} functions: "
-                f"{[f['name'] for f in functions]}"
-            )
+            Idempotent: a streaming response runs it both when the stream ends and
+            as its background task.
+            """
+            nonlocal cleaned_up
+            if cleaned_up:
+                return
+            cleaned_up = True
+            if mcp_context:
+                from ..server.dynamic_mcp_bridge import dynamic_mcp_bridge
+
+                dynamic_mcp_bridge.unregister_request(mcp_context.request_id)
+            if ticket:
+                ticket.release()
 
-            # Create temporary dynamic MCP skill
-            dynamic_mcp_skill = {
-                "type": "mcp",
-                "transport": "sse",
-                "url": f"http://{self.mcp_server_host}:{port}",
-            }
+        async def acleanup():
+            """cleanup() as an async background task, so it runs on the event loop."""
+            cleanup()
 
-            # Build configOverrides with dynamic MCP skill
-            config_overrides = AllAgentConfigs.from_dict(
-                {
-                    "agent_config": {"type": "codex-agent"},
-                    "skills": [dynamic_mcp_skill],
+        try:
+            if functions:
+                from ..server.dynamic_mcp_bridge import dynamic_mcp_bridge
+
+                # Register request with dynamic MCP bridge
+                mcp_context = dynamic_mcp_bridge.register_request(functions, termination_policy)
+
+                # Ensure MCP server is started
+                port = await dynamic_mcp_bridge.ensure_server_started(
+                    self.mcp_server_host, self.mcp_server_port, self.mcp_server_uds
+                )
+
+                address = (
+                    f"unix:{dynamic_mcp_bridge.uds_path}"
+                    if dynamic_mcp_bridge.uds_path
+                    else f"{dynamic_mcp_bridge.get_host()}:{port}"
+                )
+                print(f"[OpenAICompatibleServer] Using dynamic MCP bridge on {address}")
+                print(
+                    f"[OpenAICompatibleServer] Request {mcp_context.request_id} functions: "
+                    f"{[f['name'] for f in functions]}"
+                )
+
+                # Create temporary dynamic MCP skill (endpoint scoped to this request's functions),
+                # named as the tool calling instructions refer to it
+                dynamic_mcp_skill = {
+                    **dynamic_mcp_bridge.get_request_skill(mcp_context.request_id),
+                    "name": Prompts.USER_DEFINED_FUNCTIONS_MCP_NAME,
                 }
-            )
 
-            # Setup termination handler
-            def on_terminate(tool_calls):
-                nonlocal terminated, tool_calls_result
-                terminated = True
-                tool_calls_result = tool_calls
+                # Build configOverrides with dynamic MCP skill
+                config_overrides = AllAgentConfigs.from_dict(
+                    {
+                        "agent_config": {"type": "codex-agent"},
+                        "skills": [dynamic_mcp_skill],
+                    }
+                )
 
-            mcp_context.mcp_server.on_terminate(on_terminate)
+                # Setup termination handler (runs on the termination timer thread)
+                def on_terminate(tool_calls):
+                    nonlocal terminated, tool_calls_result
+                    terminated = True
+                    tool_calls_result = tool_calls
+                    # Wake the event loop so the agent is stopped right away
+                    loop.call_soon_threadsafe(stop_event.set)
 
-        # Convert request to prompt (with tool calling instructions if functions are provided)
-        base_prompt = self.convert_request_to_prompt(request)
-        if functions and mcp_context:
-            prompt = self.prompts.prepend_tool_calling_instructions(
-                base_prompt, functions, mcp_context.request_id
-            )
-        else:
-            prompt = base_prompt
-        agent_input = AgentInput.from_query(prompt)
+                mcp_context.mcp_server.on_terminate(on_terminate)
 
-        collected_content: List[str] = []
+                if is_streaming:
+                    # Runs on the bridge's thread when a call is recorded
+                    def on_tool_call(tool_call):
+                        loop.call_soon_threadsafe(tool_call_queue.put_nowait, tool_call)
 
-        async def generate_stream():
-            """Generator for streaming response."""
-            nonlocal terminated
-            try:
-                # Send initial chunk with role
-                yield f"data: {json.dumps({
-                    'id': response_id,
-                    'object': 'chat.completion.chunk',
-                    'created': created,
-                    'model': request.model,
-                    'choices': [{'index': 0, 'delta': {'role': 'assistant'}, 'finish_reason': None}]
-                })}\n\n"
-
-                # ===== Unified event processing (streaming vs non-streaming, with or without functions) =====
-                for event in self.agent.run(agent_input, config_overrides):
-                    # Check if terminated (function calling completed)
-                    if terminated:
-                        print("[OpenAICompatibleServer] Function calls detected, stopping event processing")
-                        break
-
-                    content_chunk = self._convert_event_to_content_chunk(event)
-                    if content_chunk:
-                        # Collect message content for final response
-                        if isinstance(event, MessageEvent):
-                            collected_content.append(content_chunk)
-
-                        # Stream the chunk
-                        yield f"data: {json.dumps({
-                            'id': response_id,
-                            'object': 'chat.completion.chunk',
-                            'created': created,
-                            'model': request.model,
-                            'choices': [{'index': 0, 'delta': {'content': content_chunk}, 'finish_reason': None}]
-                        })}\n\n"
-
-                # Send final chunk based on whether functions were called
-                finish_reason = 'tool_calls' if terminated else 'stop'
-                yield f"data: {json.dumps({
-                    'id': response_id,
-                    'object': 'chat.completion.chunk',
-                    'created': created,
-                    'model': request.model,
-                    'choices': [{'index': 0, 'delta': {}, 'finish_reason': finish_reason}]
-                })}\n\n"
-                yield "data: [DONE]\n\n"
+                    mcp_context.mcp_server.on_tool_call(on_tool_call)
 
-            except Exception as error:
-                print(f"[OpenAICompatibleServer] Streaming error: {error}")
-                yield f"data: {json.dumps({'error': {'message': str(error), 'type': 'internal_error'}})}\n\n"
+            # Convert request to prompt (with tool calling instructions if functions are provided)
+            base_prompt = self.convert_request_to_prompt(request)
+            if functions and mcp_context:
+                prompt = self.prompts.prepend_tool_calling_instructions(
+                    base_prompt, functions, mcp_context.request_id
+                )
+            else:
+                prompt = base_prompt
+            agent_input = AgentInput.from_query(prompt)
+
+            # Continue a known agent thread with only the new messages (if enabled)
+            resume_input = self._build_resume_input(request, functions, mcp_context)
+
+            collected_content: List[str] = []
+            thread_id: Optional[str] = None
+
+            async def generate_stream():
+                """Generator for streaming response."""
+                nonlocal terminated, thread_id
+                envelope = self._chunk_envelope(response_id, created, request.model)
+                streamed_content: List[str] = []
+                streamed_call_ids: List[str] = []
+
+                def tool_call_chunk(tool_call: ToolCall) -> str:
+                    streamed_call_ids.append(tool_call.id)
+                    delta = self._tool_call_delta(len(streamed_call_ids) - 1, tool_call)
+                    return self._format_chunk(envelope, delta)
+
+                try:
+                    # Send initial chunk with role
+                    yield self._format_chunk(
+                        envelope, {"role": "assistant"}
+                    )
 
-        try:
-            # For streaming, return StreamingResponse
+                    # ===== Unified event processing (streaming vs non-streaming, with or without functions) =====
+                    events = self._run_agent(agent_input, config_overrides, resume_input)
+                    queue = tool_call_queue if mcp_context else None
+                    async for event in self._until_stopped(events, stop_event, queue):
+                        # Stream function calls as soon as they are recorded
+                        if isinstance(event, ToolCallRecord):
+                            yield tool_call_chunk(self._unprefixed_tool_call(mcp_context, event))
+                            continue
+
+                        # Check if terminated (function calling completed)
+                        if terminated:
+                            print("[OpenAICompatibleServer] Function calls detected, stopping event processing")
+                            break
+
+                        if isinstance(event, ThreadStartedEvent):
+                            thread_id = event.thread_id
+
+                        if self._track_function_calls(event, mcp_context):
+                            continue
+
+                        content_chunk = self._convert_event_to_content_chunk(event)
+                        if content_chunk:
+                            # Collect message content for final response
+                            if isinstance(event, MessageEvent):
+                                collected_content.append(content_chunk)
+                            streamed_content.append(content_chunk)
+
+                            # Stream the chunk
+                            yield self._format_chunk(
+                                envelope, {"content": content_chunk}
+                            )
+
+                    # Remember the thread as the client will see this turn
+                    if terminated and mcp_context:
+                        tool_calls = self._collect_tool_calls(mcp_context)
+
+                        # Stream calls recorded after the last relayed one
+                        for tool_call in tool_calls:
+                            if tool_call.id not in streamed_call_ids:
+                                yield tool_call_chunk(tool_call)
+
+                        self._remember_turn(request, thread_id, tool_calls=tool_calls)
+                    else:
+                        self._remember_turn(request, thread_id, content="".join(streamed_content))
+
+                    # Send final chunk based on whether functions were called
+                    finish_reason = 'tool_calls' if terminated else 'stop'
+                    yield self._format_chunk(
+                        envelope, {}, finish_reason
+                    )
+                    yield "data: [DONE]\n\n"
+
+                except Exception as error:
+                    print(f"[OpenAICompatibleServer] Streaming error: {error}")
+                    error_payload = {"error": {"message": str(error), "type": "internal_error"}}
+                    yield f"data: {jsoncodec.dumps(error_payload)}\n\n"
+
+                finally:
+                    cleanup()
+
+            # For streaming, return StreamingResponse (the stream cleans up when done).
+            # The background task also cleans up if the stream never starts, e.g.
+            # when the client disconnects before the first chunk.
             if is_streaming:
+                stream_owns_cleanup = True
                 return StreamingResponse(
                     generate_stream(),
                     media_type="text/event-stream",
@@ -244,15 +455,23 @@ class OpenAICompatibleServer(BaseServer[ChatCompletionRequest, ChatCompletionRes
                         "Cache-Control": "no-cache",
                         "Connection": "keep-alive",
                     },
+                    background=BackgroundTask(acleanup),
                 )
 
-            # For non-streaming, process events synchronously
-            for event in self.agent.run(agent_input, config_overrides):
+            # For non-streaming, consume events on the event loop
+            events = self._run_agent(agent_input, config_overrides, resume_input)
+            async for event in self._until_stopped(events, stop_event):
                 # Check if terminated (function calling completed)
                 if terminated:
                     print("[OpenAICompatibleServer] Function calls detected, stopping event processing")
                     break
 
+                if isinstance(event, ThreadStartedEvent):
+                    thread_id = event.thread_id
+
+                if self._track_function_calls(event, mcp_context):
+                    continue
+
                 content_chunk = self._convert_event_to_content_chunk(event)
                 if content_chunk:
                     # Collect message content for final response
@@ -262,36 +481,269 @@ class OpenAICompatibleServer(BaseServer[ChatCompletionRequest, ChatCompletionRes
             # Return response based on whether functions were called
             if terminated and mcp_context:
                 # Function calls were made - return tool_calls response
-                from ..server.dynamic_mcp_bridge import dynamic_mcp_bridge
-
-                tool_calls = mcp_context.mcp_server.get_tool_calls()
-
-                # Remove prefix from function names before returning
-                original_tool_calls = [
-                    ToolCall(
-                        id=tc.id,
-                        function={
-                            "name": dynamic_mcp_bridge.remove_function_prefix(
-                                tc.function["name"]
-                            ),
-                            "arguments": tc.function["arguments"],
-                        },
-                    )
-                    for tc in tool_calls
-                ]
-
+                original_tool_calls = self._collect_tool_calls(mcp_context)
+                self._remember_turn(request, thread_id, tool_calls=original_tool_calls)
                 return self.create_tool_call_response(request, original_tool_calls)
             else:
                 # Normal response - no function calls
                 content = "".join(collected_content)
+                self._remember_turn(request, thread_id, content=content)
                 return self.create_normal_response(request, content)
 
         finally:
-            # Cleanup: unregister request (but keep dynamic MCP bridge running)
-            if mcp_context:
-                from ..server.dynamic_mcp_bridge import dynamic_mcp_bridge
+            if not stream_owns_cleanup:
+                cleanup()
+
+    async def _run_agent(
+        self,
+        agent_input: AgentInput,
+        config_overrides: Optional[AllAgentConfigs],
+        resume_input: Optional[AgentInput] = None,
+    ):
+        """
+        Run the agent, continuing a stored thread when possible.
 
-                dynamic_mcp_bridge.unregister_request(mcp_context.request_id)
+        If the resumed thread fails before producing any output (e.g. the
+        thread no longer exists), it is forgotten and the full history is
+        replayed in a new thread instead.
+        """
+        if resume_input is not None:
+            produced_output = False
+            failed = False
+
+            events = self.agent.arun(resume_input, config_overrides)
+            try:
+                async for event in events:
+                    if isinstance(event, ErrorEvent) and not produced_output:
+                        failed = True
+                        continue
+                    if not isinstance(event, (ThreadStartedEvent, TurnStartedEvent)):
+                        produced_output = True
+                    yield event
+            finally:
+                await events.aclose()
+
+            if not failed:
+                return
+
+            print(
+                f"[OpenAICompatibleServer] Could not resume thread {resume_input.thread_id}, "
+                "replaying full history"
+            )
+            if self.session_store is not None:
+                self.session_store.discard(resume_input.thread_id)
+
+        events = self.agent.arun(agent_input, config_overrides)
+        try:
+            async for event in events:
+                yield event
+        finally:
+            await events.aclose()
+
+    async def _until_stopped(
+        self,
+        events,
+        stop_event: asyncio.Event,
+        tool_call_queue: Optional["asyncio.Queue[ToolCallRecord]"] = None,
+    ):
+        """
+        Relay agent events until `stop_event` is set.
+
+        Waiting for the next event races the stop signal, so a run terminated
+        by a function call ends immediately instead of when the agent next
+        emits an event. Closing the agent's event stream stops its process.
+
+        If `tool_call_queue` is given, function calls put on it are relayed
+        (as ToolCallRecords) as soon as they arrive, between agent events.
+        """
+        stop_task = asyncio.ensure_future(stop_event.wait())
+        call_task = asyncio.ensure_future(tool_call_queue.get()) if tool_call_queue else None
+        next_task = None
+        try:
+            while not stop_event.is_set():
+                if next_task is None:
+                    next_task = asyncio.ensure_future(events.__anext__())
+
+                waiters = {next_task, stop_task}
+                if call_task is not None:
+                    waiters.add(call_task)
+                await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+
+                if call_task is not None and call_task.done():
+                    yield call_task.result()
+                    call_task = asyncio.ensure_future(tool_call_queue.get())
+                    continue
+
+                if not next_task.done():
+                    # Stopped while the agent was busy: abandon the pending read
+                    break
+
+                done_task, next_task = next_task, None
+                try:
+                    event = done_task.result()
+                except StopAsyncIteration:
+                    break
+                yield event
+        finally:
+            stop_task.cancel()
+            if call_task is not None:
+                call_task.cancel()
+            if next_task is not None:
+                next_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError, StopAsyncIteration):
+                    await next_task
+            await events.aclose()
+
+    def _track_function_calls(self, event, mcp_context: Optional[RequestContext]) -> bool:
+        """
+        Report the agent's progress on user-defined function calls to the
+        request's MCP server, which uses it to end the batch early.
+
+        Returns:
+            True if the event is a user-defined function call (not shown to the client)
+        """
+        if mcp_context is None:
+            return False
+
+        mcp_server = mcp_context.mcp_server
+        if isinstance(event, TurnCompletedEvent):
+            mcp_server.notify_turn_completed()
+            return False
+
+        if not isinstance(event, SkillInvokedEvent):
+            return False
+        if event.metadata.get("tool") not in mcp_context.function_name_map:
+            return False
+
+        if event.metadata.get("status") == "in_progress":
+            mcp_server.notify_call_started()
+        else:
+            mcp_server.notify_call_completed()
+        return True
+
+    def _build_resume_input(
+        self,
+        request: ChatCompletionRequest,
+        functions: List[Dict[str, Any]],
+        mcp_context: Optional[RequestContext],
+    ) -> Optional[AgentInput]:
+        """Build input continuing a stored thread, or None to replay the full history."""
+        if self.session_store is None:
+            return None
+
+        match = self.session_store.find(request.messages, self._session_scope(request, functions))
+        if not match:
+            return None
+
+        thread_id, prefix_length = match
+        prompt = self.prompts.function_call_continuation_prompt(
+            request.messages[prefix_length:]
+        )
+        if functions and mcp_context:
+            prompt = self.prompts.prepend_tool_calling_instructions(
+                prompt, functions, mcp_context.request_id
+            )
+
+        print(
+            f"[OpenAICompatibleServer] Resuming thread {thread_id} with "
+            f"{len(request.messages) - prefix_length} new messages"
+        )
+        return AgentInput(messages=[{"role": "user", "content": prompt}], thread_id=thread_id)
+
+    def _remember_turn(
+        self,
+        request: ChatCompletionRequest,
+        thread_id: Optional[str],
+        content: Optional[str] = None,
+        tool_calls: Optional[List[ToolCall]] = None,
+    ) -> None:
+        """Map the conversation including this turn's reply to the agent thread."""
+        if self.session_store is None or not thread_id:
+            return
+
+        assistant_message: Dict[str, Any] = {"role": "assistant", "content": content}
+        if tool_calls:
+            assistant_message["tool_calls"] = [
+                {"id": tc.id, "type": "function", "function": tc.function}
+                for tc in tool_calls
+            ]
+
+        self.session_store.put(
+            list(request.messages) + [assistant_message],
+            thread_id,
+            self._session_scope(request, self._extract_functions(request)),
+        )
+
+    def _session_scope(
+        self, request: ChatCompletionRequest, functions: List[Dict[str, Any]]
+    ) -> str:
+        """
+        Scope of a conversation in the session store: threads are only resumed
+        for the same model, function schemas and caller (`user`).
+        """
+        return json.dumps(
+            {"model": request.model, "functions": functions, "user": request.user},
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str,
+        )
+
+    def _collect_tool_calls(self, mcp_context: RequestContext) -> List[ToolCall]:
+        """Get the request's recorded tool calls with the request prefix removed."""
+        return [
+            self._unprefixed_tool_call(mcp_context, tc)
+            for tc in mcp_context.mcp_server.get_tool_calls()
+        ]
+
+    def _unprefixed_tool_call(
+        self, mcp_context: RequestContext, record: ToolCallRecord
+    ) -> ToolCall:
+        """Convert a recorded tool call to the name the client defined."""
+        name = record.function["name"]
+        return ToolCall(
+            id=record.id,
+            function={
+                "name": mcp_context.function_name_map.get(name, name),
+                "arguments": record.function["arguments"],
+            },
+        )
+
+    def _tool_call_delta(self, index: int, tool_call: ToolCall) -> Dict[str, Any]:
+        """Build the chat.completion.chunk delta announcing one complete tool call."""
+        return {
+            "tool_calls": [
+                {
+                    "index": index,
+                    "id": tool_call.id,
+                    "type": "function",
+                    "function": tool_call.function,
+                }
+            ]
+        }
+
+    def _chunk_envelope(self, response_id: str, created: int, model: str) -> str:
+        """
+        Serialize the part of a chat.completion.chunk SSE line that is the
+        same for every chunk of a response, up to the delta.
+        """
+        header = jsoncodec.dumps(
+            {"id": response_id, "object": "chat.completion.chunk", "created": created, "model": model}
+        )
+        return f'data: {header[:-1]},"choices":[{{"index":0,"delta":'
+
+    def _format_chunk(
+        self,
+        envelope: str,
+        delta: Dict[str, Any],
+        finish_reason: Optional[str] = None,
+    ) -> str:
+        """Format a chat.completion.chunk as an SSE data line, splicing the delta into `envelope`."""
+        if finish_reason is None:
+            return f"{envelope}{jsoncodec.dumps(delta)}{_OPEN_CHUNK_SUFFIX}"
+        return (
+            f"{envelope}{jsoncodec.dumps(delta)},"
+            f'"finish_reason":{jsoncodec.dumps(finish_reason)}}}]}}\n\n'
+        )
 
     def _convert_event_to_content_chunk(self, event) -> Optional[str]:
         """
@@ -304,6 +756,9 @@ class OpenAICompatibleServer(BaseServer[ChatCompletionRequest, ChatCompletionRes
             output_part = f"{event.output}\n" if event.output else ""
             return f"[Command] {event.command}\n{output_part}"
         elif isinstance(event, SkillInvokedEvent):
+            # MCP tool calls are reported when started and again when completed
+            if event.metadata.get("status") not in (None, "in_progress"):
+                return None
             return f"[Skill] {event.skill_name}\n"
         elif isinstance(event, MessageEvent):
             return event.content
@@ -316,7 +771,11 @@ class OpenAICompatibleServer(BaseServer[ChatCompletionRequest, ChatCompletionRes
         # New tools format
         if request.tools:
             for tool in request.tools:
-                if tool.type == "function" and tool.function:
+                # Tools parsed from an HTTP body are plain dicts
+                if isinstance(tool, dict):
+                    if tool.get("type") == "function" and tool.get("function"):
+                        functions.append(tool["function"])
+                elif tool.type == "function" and tool.function:
                     functions.append(tool.function.to_dict())
 
         # Legacy functions format
@@ -396,4 +855,6 @@ class OpenAICompatibleServer(BaseServer[ChatCompletionRequest, ChatCompletionRes
             stream=body.get("stream", False),
             temperature=body.get("temperature"),
             max_tokens=body.get("max_tokens"),
+            termination_policy=body.get("termination_policy"),
+            user=body.get("user"),
         )
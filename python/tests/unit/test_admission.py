@@ -0,0 +1,109 @@
+"""
+Unit tests for AdmissionController.
+"""
+
+import asyncio
+
+import pytest
+
+from agentwrap.server.admission import AdmissionController, AdmissionRejectedError
+
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.asyncio
+async def test_admits_up_to_max_concurrency():
+    """Test that requests up to max_concurrency are admitted immediately."""
+    controller = AdmissionController(max_concurrency=2, max_queue_depth=0)
+
+    first = await controller.acquire()
+    second = await controller.acquire()
+    assert controller.stats()["active"] == 2
+
+    with pytest.raises(AdmissionRejectedError) as exc_info:
+        await controller.acquire()
+    assert exc_info.value.retry_after_seconds >= 1
+
+    first.release()
+    second.release()
+    assert controller.stats()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queued_requests_are_admitted_in_fifo_order():
+    """Test that waiters get slots in arrival order."""
+    controller = AdmissionController(max_concurrency=1, max_queue_depth=2)
+    holder = await controller.acquire()
+    order = []
+
+    async def waiter(name):
+        ticket = await controller.acquire()
+        order.append(name)
+        ticket.release()
+
+    tasks = [asyncio.create_task(waiter("a")), asyncio.create_task(waiter("b"))]
+    await asyncio.sleep(0)
+    assert controller.stats()["queue_depth"] == 2
+
+    holder.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["a", "b"]
+    assert controller.stats()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_rejects_request():
+    """Test that a request waiting longer than queue_timeout_ms is rejected."""
+    controller = AdmissionController(
+        max_concurrency=1, max_queue_depth=1, queue_timeout_ms=50
+    )
+    holder = await controller.acquire()
+
+    with pytest.raises(AdmissionRejectedError):
+        await controller.acquire()
+
+    stats = controller.stats()
+    assert stats["timed_out"] == 1
+    assert stats["queue_depth"] == 0
+
+    holder.release()
+    assert controller.stats()["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_release_is_idempotent():
+    """Test that releasing a ticket twice frees only one slot."""
+    controller = AdmissionController(max_concurrency=2, max_queue_depth=0)
+    first = await controller.acquire()
+    await controller.acquire()
+
+    first.release()
+    first.release()
+    assert controller.stats()["active"] == 1
+
+
+@pytest.mark.asyncio
+async def test_unstarted_stream_releases_its_slot():
+    """Test that a streaming response frees its slot even if never iterated."""
+    from agentwrap.events import MessageEvent
+    from agentwrap.server.types import ChatCompletionRequest
+    from agentwrap.servers.openai_compatible import OpenAICompatibleServer, OpenAIServerOptions
+
+    class _Agent:
+        async def arun(self, agent_input, config_overrides=None):
+            yield MessageEvent(content="hi")
+
+    server = OpenAICompatibleServer(_Agent(), OpenAIServerOptions(max_concurrency=1))
+    request = ChatCompletionRequest(
+        model="agentwrap-codex", messages=[{"role": "user", "content": "hi"}], stream=True
+    )
+
+    response = await server.handle_request(request)
+    assert server.admission.stats()["active"] == 1
+
+    # Client disconnected before the first chunk: only the background task runs
+    await response.background()
+    await response.background()
+    assert server.admission.stats()["active"] == 0
@@ -0,0 +1,102 @@
+"""
+Unit tests for validating and deduplicating user-defined function calls.
+"""
+
+import pytest
+
+from agentwrap.server import dynamic_mcp_server
+from agentwrap.server.dynamic_mcp_server import DynamicMcpServer
+
+
+pytestmark = pytest.mark.unit
+
+FUNCTIONS = [
+    {
+        "name": "get_weather",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "city": {"type": "string"},
+                "days": {"type": "integer", "minimum": 1},
+            },
+            "required": ["city"],
+        },
+    },
+    {"name": "ping"},
+]
+
+
+def _call(server, name, arguments):
+    return server.handle_request(
+        {
+            "jsonrpc": "2.0",
+            "id": 7,
+            "method": "tools/call",
+            "params": {"name": name, "arguments": arguments},
+        }
+    )
+
+
+def test_valid_arguments_are_recorded():
+    """Test that calls matching the schema are recorded."""
+    server = DynamicMcpServer(FUNCTIONS)
+    response = _call(server, "get_weather", {"city": "Paris", "days": 2})
+    server.cancel_termination()
+
+    assert "isError" not in response["result"]
+    assert len(server.get_tool_calls()) == 1
+
+
+def test_invalid_arguments_return_error_and_are_not_recorded():
+    """Test that schema violations are reported back to the agent instead of recorded."""
+    server = DynamicMcpServer(FUNCTIONS)
+    response = _call(server, "get_weather", {"days": 0})
+
+    assert response["id"] == 7
+    assert response["result"]["isError"] is True
+    text = response["result"]["content"][0]["text"]
+    assert "'city' is a required property" in text
+    assert "days: 0 is less than the minimum of 1" in text
+    assert server.get_tool_calls() == []
+    assert server.termination_timer is None
+
+
+def test_functions_without_schema_accept_any_arguments():
+    """Test that functions without parameters are not validated."""
+    server = DynamicMcpServer(FUNCTIONS)
+    _call(server, "ping", {"anything": True})
+    server.cancel_termination()
+
+    assert len(server.get_tool_calls()) == 1
+
+
+def test_validators_are_shared_across_servers(monkeypatch):
+    """Test that identical schemas compile one validator."""
+    compiled = []
+    compile_validator = dynamic_mcp_server._compile_validator
+
+    def counting_compile(schema):
+        compiled.append(schema)
+        return compile_validator(schema)
+
+    monkeypatch.setattr(dynamic_mcp_server, "_compile_validator", counting_compile)
+    monkeypatch.setattr(dynamic_mcp_server, "_schema_cache", dynamic_mcp_server._SchemaCache())
+    servers = [DynamicMcpServer(FUNCTIONS) for _ in range(3)]
+    for server in servers:
+        assert server.validate_arguments("get_weather", {"city": "Paris"}) == []
+
+    assert len(compiled) == 1
+    first, _, last = (server._parameter_schemas["get_weather"] for server in servers)
+    assert first is last
+
+
+def test_equal_calls_are_deduplicated():
+    """Test that calls differing only in key order or number format are deduplicated."""
+    server = DynamicMcpServer(FUNCTIONS)
+    _call(server, "get_weather", {"city": "Paris", "days": 2})
+    _call(server, "get_weather", {"days": 2.0, "city": "Paris"})
+    _call(server, "get_weather", {"city": "Paris", "days": 3})
+    server.cancel_termination()
+
+    assert len(server.get_tool_calls()) == 2
+    assert server.dedup_hits == 1
@@ -0,0 +1,75 @@
+"""
+Unit tests for concurrent agent runs.
+
+Two runs are started together; each emits an event, waits, and emits
+another. If the runs blocked each other (or the event loop), all events of
+one run would arrive before the other's.
+"""
+
+import asyncio
+import sys
+import time
+
+import pytest
+
+from agentwrap import BaseAgent, CodexAgent, MessageEvent
+
+
+pytestmark = pytest.mark.unit
+
+# Stands in for codex: reports "<prompt>:1", sleeps, then reports "<prompt>:2"
+SLOW_CODEX = (
+    "import json, sys, time\n"
+    "def say(text):\n"
+    "    print(json.dumps({'type': 'item.completed', 'item': {'type': 'agent_message', 'text': text}}), flush=True)\n"
+    "say(sys.argv[1] + ':1')\n"
+    "time.sleep(0.3)\n"
+    "say(sys.argv[1] + ':2')\n"
+)
+
+
+class _SleepyAgent(BaseAgent):
+    """Agent with a blocking run(), driven by the default arun()."""
+
+    def run(self, agent_input, config_overrides=None):
+        prompt = self._normalize_input(agent_input).messages[0]["content"]
+        yield MessageEvent(content=f"{prompt}:1")
+        time.sleep(0.3)
+        yield MessageEvent(content=f"{prompt}:2")
+
+
+async def _interleaving(agent):
+    order = []
+
+    async def consume(prompt):
+        async for event in agent.arun(prompt):
+            order.append(event.content)
+
+    await asyncio.gather(consume("a"), consume("b"))
+    return order
+
+
+def _assert_interleaved(order):
+    assert sorted(order) == ["a:1", "a:2", "b:1", "b:2"]
+    # Both runs started before either finished
+    assert {order[0], order[1]} == {"a:1", "b:1"}
+
+
+@pytest.mark.asyncio
+async def test_codex_arun_runs_concurrently(monkeypatch):
+    """Test that CodexAgent.arun() runs overlap on one event loop."""
+    agent = CodexAgent()
+    monkeypatch.setattr(agent, "check_prerequisites", lambda: None)
+    monkeypatch.setattr(
+        agent,
+        "_build_command",
+        lambda config, prompt, thread_id=None, **kwargs: [sys.executable, "-c", SLOW_CODEX, prompt],
+    )
+
+    _assert_interleaved(await _interleaving(agent))
+
+
+@pytest.mark.asyncio
+async def test_base_arun_runs_blocking_run_concurrently():
+    """Test that the default BaseAgent.arun() keeps blocking runs off the event loop."""
+    _assert_interleaved(await _interleaving(_SleepyAgent()))
@@ -0,0 +1,78 @@
+"""
+Unit tests for decoding codex JSONL events.
+"""
+
+import sys
+from dataclasses import asdict
+
+import pytest
+
+from agentwrap import CodexAgent, CommandExecutionEvent, MessageEvent, ReasoningEvent
+from agentwrap.agents import codex_agent
+
+
+pytestmark = pytest.mark.unit
+
+LINES = [
+    b'{"type":"thread.started","thread_id":"t-1"}',
+    b'{"type":"turn.started"}',
+    b'{"type":"item.completed","item":{"id":"i0","type":"reasoning","text":"thinking"}}',
+    b'{"type":"item.completed","item":{"id":"i1","type":"command_execution","command":"ls",'
+    b'"aggregated_output":"a\\n","exit_code":0,"status":"completed"}}',
+    b'{"type":"item.started","item":{"id":"i2","type":"mcp_tool_call","server":"s",'
+    b'"tool":"t","status":"in_progress","arguments":{"x":1}}}',
+    b'{"type":"item.completed","item":{"id":"i3","type":"agent_message","text":"Using skill `pdf`"}}',
+    b'{"type":"item.completed","item":{"id":"i4","type":"agent_message","text":"done"}}',
+    b'{"type":"turn.completed","usage":{"input_tokens":10,"output_tokens":2}}',
+    # Unexpected field type: decoded through the dict fallback
+    b'{"type":"item.completed","item":{"type":"command_execution","command":"ls","exit_code":"1"}}',
+    b'{"type":"item.completed",',
+    b"   ",
+]
+
+
+def _decode_all(agent):
+    events = [agent._decode_line(line) for line in LINES]
+    return [(event, event.metadata if event else None) for event in events]
+
+
+@pytest.mark.skipif(codex_agent.msgspec is None, reason="msgspec not installed")
+def test_typed_decoding_matches_dict_decoding(monkeypatch):
+    """Test that msgspec structs produce the same events as parsed dicts."""
+    agent = CodexAgent()
+
+    typed = _decode_all(agent)
+    monkeypatch.setattr(codex_agent, "_codex_event_decoder", None)
+    untyped = _decode_all(agent)
+
+    assert typed == untyped
+    assert typed[-2:] == [(None, None), (None, None)]
+    assert typed[-3][0].exit_code == "1"
+    assert typed[4][1] == {"server": "s", "tool": "t", "status": "in_progress", "item_id": "i2"}
+
+
+def test_metadata_defaults_to_a_fresh_dict():
+    """Test that events get their own mutable metadata dict."""
+    event = ReasoningEvent(content="thinking")
+    assert event.metadata == {}
+
+    event.metadata["step"] = 1
+    assert event.metadata == {"step": 1}
+    assert ReasoningEvent(content="again").metadata == {}
+    assert MessageEvent("hi", {"source": "test"}).metadata == {"source": "test"}
+
+
+def test_metadata_is_a_dataclass_field():
+    """Test that metadata takes part in asdict(), repr() and ==."""
+    event = MessageEvent("hi", {"source": "test"})
+
+    assert asdict(event)["metadata"] == {"source": "test"}
+    assert "source" in repr(event)
+    assert event != MessageEvent("hi")
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="slotted dataclasses need Python 3.10")
+def test_events_are_slotted():
+    """Test that events have no per-instance __dict__."""
+    event = CommandExecutionEvent(command="ls", output="", exit_code=0)
+    assert not hasattr(event, "__dict__")
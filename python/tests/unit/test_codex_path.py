@@ -0,0 +1,86 @@
+"""
+Unit tests for resolving and caching the codex executable.
+
+A small Python script stands in for codex and reports an agent message.
+"""
+
+import sys
+
+import pytest
+
+from agentwrap import CodexAgent
+from agentwrap.agents import codex_agent
+
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def fake_codex(tmp_path):
+    script = tmp_path / "codex"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import json\n"
+        "print(json.dumps({'type': 'item.completed', "
+        "'item': {'type': 'agent_message', 'text': 'ok'}}))\n"
+    )
+    script.chmod(0o755)
+    return str(script)
+
+
+@pytest.fixture
+def which_calls(monkeypatch, fake_codex):
+    calls = []
+
+    def which(name):
+        calls.append(name)
+        return fake_codex
+
+    monkeypatch.setattr(codex_agent.shutil, "which", which)
+    return calls
+
+
+def test_path_lookup_is_cached(which_calls, fake_codex):
+    """Test that codex is looked up in PATH once, not per run."""
+    agent = CodexAgent()
+
+    for _ in range(3):
+        assert [event.content for event in agent.run("hi")] == ["ok"]
+
+    assert which_calls == ["codex"]
+    assert agent.codex_path == fake_codex
+    assert agent._build_command(codex_agent.CodexAgentConfig(), "hi")[0] == fake_codex
+
+
+@pytest.mark.asyncio
+async def test_pinned_codex_path_skips_path_lookup(which_calls, fake_codex):
+    """Test that CodexAgentConfig.codex_path is used without a PATH lookup."""
+    agent = CodexAgent().configure({"agent_config": {"codex_path": fake_codex}})
+
+    events = [event async for event in agent.arun("hi")]
+
+    assert [event.content for event in events] == ["ok"]
+    assert which_calls == []
+
+
+def test_missing_pinned_codex_path_is_reported(which_calls, tmp_path):
+    """Test that a pinned path that does not exist fails the prerequisite check."""
+    agent = CodexAgent().configure({"agent_config": {"codex_path": str(tmp_path / "nope")}})
+
+    with pytest.raises(RuntimeError, match="codex_path"):
+        agent.check_prerequisites()
+
+
+@pytest.mark.asyncio
+async def test_cached_path_is_resolved_again_when_missing(which_calls, fake_codex, tmp_path):
+    """Test that a run re-resolves codex when the cached binary is gone."""
+    agent = CodexAgent()
+    agent.codex_path = str(tmp_path / "removed-codex")
+
+    assert [event.content for event in agent.run("hi")] == ["ok"]
+    assert which_calls == ["codex"]
+
+    agent.codex_path = str(tmp_path / "removed-codex")
+    events = [event async for event in agent.arun("hi")]
+    assert [event.content for event in events] == ["ok"]
+    assert agent.codex_path == fake_codex
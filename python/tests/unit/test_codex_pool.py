@@ -0,0 +1,89 @@
+"""
+Unit tests for CodexProcessPool.
+
+Uses a small Python command in place of codex: it reads its prompt from
+stdin and echoes it back, like `codex exec -` would consume it.
+"""
+
+import sys
+
+import pytest
+
+from agentwrap import CodexProcessPool
+
+
+pytestmark = pytest.mark.unit
+
+ECHO_CMD = [sys.executable, "-c", "import sys; print(sys.stdin.read())", "-"]
+
+
+async def _run(process, prompt: str) -> str:
+    stdout, _ = await process.communicate(prompt.encode())
+    return stdout.decode().strip()
+
+
+@pytest.mark.asyncio
+async def test_prewarm_parks_min_size_processes():
+    """Test that prewarm parks min_size processes for a command."""
+    pool = CodexProcessPool(min_size=2, max_size=4)
+    try:
+        await pool.prewarm(ECHO_CMD)
+        assert pool.stats()["parked"] == 2
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_acquire_uses_warm_process_and_replenishes():
+    """Test that acquire hands out a parked process and refills the pool."""
+    pool = CodexProcessPool(min_size=1, max_size=2)
+    try:
+        await pool.prewarm(ECHO_CMD)
+
+        process = await pool.acquire(ECHO_CMD)
+        assert await _run(process, "hello") == "hello"
+        assert pool.hits == 1
+        assert pool.misses == 0
+
+        # Let the background replenish finish
+        await pool.prewarm(ECHO_CMD)
+        assert pool.stats()["parked"] == 1
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_acquire_unknown_command_spawns_cold():
+    """Test that a command without parked processes falls back to a cold spawn."""
+    pool = CodexProcessPool(min_size=0, max_size=1)
+    try:
+        process = await pool.acquire(ECHO_CMD)
+        assert await _run(process, "cold") == "cold"
+        assert pool.misses == 1
+        assert pool.stats()["parked"] == 0
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_dead_processes_are_recycled():
+    """Test that parked processes that exited are not handed out."""
+    pool = CodexProcessPool(min_size=1, max_size=1)
+    try:
+        await pool.prewarm(ECHO_CMD)
+        parked = next(iter(pool._parked.values()))[0].process
+        parked.kill()
+        await parked.wait()
+
+        process = await pool.acquire(ECHO_CMD)
+        assert process is not parked
+        assert await _run(process, "fresh") == "fresh"
+        assert pool.misses == 1
+    finally:
+        await pool.close()
+
+
+def test_invalid_sizes_rejected():
+    """Test that min_size larger than max_size is rejected."""
+    with pytest.raises(ValueError):
+        CodexProcessPool(min_size=3, max_size=2)
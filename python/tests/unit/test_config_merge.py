@@ -0,0 +1,81 @@
+"""
+Unit tests for frozen configs and runtime override merging.
+"""
+
+import dataclasses
+
+import pytest
+
+from agentwrap import AllAgentConfigs, CodexAgent, CodexAgentConfig, MCPSSESkillConfig
+from agentwrap.agents import codex_agent
+
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def base():
+    return AllAgentConfigs.from_dict(
+        {
+            "agent_config": {"model": "gpt-5", "codex_config": {"a": 1}},
+            "skills": [{"type": "mcp", "transport": "sse", "url": "http://x/mcp"}],
+        }
+    )
+
+
+def test_configs_are_frozen(base):
+    """Test that configs cannot be changed in place."""
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        base.agent_config.model = "other"
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        base.skills[0].url = "http://y/mcp"
+
+
+def test_merge_overrides_is_a_shallow_overlay(base):
+    """Test that merging shares unchanged parts and leaves the base untouched."""
+    skill_only = AllAgentConfigs(
+        agent_config=CodexAgentConfig(),
+        skills=[MCPSSESkillConfig(url="http://bridge/mcp")],
+    )
+    merged = base.merge_overrides(skill_only)
+    assert merged.agent_config is base.agent_config
+    assert merged.skills is skill_only.skills
+
+    merged = base.merge_overrides(
+        AllAgentConfigs(agent_config=CodexAgentConfig(model="o3", codex_config={"b": 2}))
+    )
+    assert merged.skills is base.skills
+    assert merged.agent_config.model == "o3"
+    assert merged.agent_config.codex_config == {"a": 1, "b": 2}
+    assert base.agent_config.model == "gpt-5"
+    assert base.agent_config.codex_config == {"a": 1}
+
+
+def test_effective_config_and_flags_are_memoized(base):
+    """Test that repeated overrides reuse the merged config and its flags."""
+    agent = CodexAgent()
+    agent.config = base
+
+    first = agent._get_effective_config(
+        AllAgentConfigs(agent_config=CodexAgentConfig(sandbox_mode="workspace-write"))
+    )
+    second = agent._get_effective_config(
+        AllAgentConfigs(agent_config=CodexAgentConfig(sandbox_mode="workspace-write"))
+    )
+    assert first is second
+    assert first.sandbox_mode == "workspace-write"
+
+    hits = codex_agent._codex_config_args.cache_info().hits
+    command = agent._build_command(first, "hi")
+    agent._build_command(second, "again")
+    assert codex_agent._codex_config_args.cache_info().hits == hits + 1
+    assert command[command.index("-m") :] == ["-m", "gpt-5", "-c", "a=1", "hi"]
+
+
+def test_equal_configs_hash_equal():
+    """Test that configs whose codex_config values compare equal hash alike."""
+    first = CodexAgentConfig(codex_config={"x": 1, "nested": {"y": [1]}})
+    second = CodexAgentConfig(codex_config={"nested": {"y": [1.0]}, "x": 1.0})
+
+    assert first == second
+    assert hash(first) == hash(second)
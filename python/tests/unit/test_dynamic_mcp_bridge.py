@@ -0,0 +1,187 @@
+"""
+Unit tests for DynamicMcpBridge request registration and tool routing.
+"""
+
+import json
+import os
+import socket
+import stat
+
+import pytest
+
+from agentwrap.server.dynamic_mcp_bridge import DynamicMcpBridge, dynamic_mcp_bridge
+
+
+pytestmark = pytest.mark.unit
+
+FUNCTIONS = [{"name": "get_weather"}, {"name": "get_time"}]
+
+
+@pytest.fixture
+def contexts():
+    """Register two requests with the same function names."""
+    registered = [
+        dynamic_mcp_bridge.register_request(FUNCTIONS),
+        dynamic_mcp_bridge.register_request(FUNCTIONS),
+    ]
+    yield registered
+    for context in registered:
+        dynamic_mcp_bridge.unregister_request(context.request_id)
+
+
+def test_function_names_route_to_their_request(contexts):
+    """Test that prefixed names resolve to the request that registered them."""
+    for context in contexts:
+        name = f"{context.request_id}_get_weather"
+        assert dynamic_mcp_bridge.get_context_by_function_name(name) is context
+        assert dynamic_mcp_bridge.remove_function_prefix(name) == "get_weather"
+
+
+def test_unknown_names_are_not_routed(contexts):
+    """Test that unknown names and request ids resolve to nothing."""
+    assert dynamic_mcp_bridge.get_context_by_function_name("get_weather") is None
+    assert dynamic_mcp_bridge.get_context_by_function_name("000000000000_get_weather") is None
+    assert dynamic_mcp_bridge.remove_function_prefix("get_weather") == "get_weather"
+
+
+def test_unregister_removes_index_entries(contexts):
+    """Test that unregistering a request drops its functions from the index."""
+    first, second = contexts
+    dynamic_mcp_bridge.unregister_request(first.request_id)
+
+    assert dynamic_mcp_bridge.get_context_by_function_name(f"{first.request_id}_get_time") is None
+    assert dynamic_mcp_bridge.get_context_by_function_name(f"{second.request_id}_get_time") is second
+    assert f"{first.request_id}_get_time" not in dynamic_mcp_bridge._function_index
+
+
+async def _tools_list(request_id):
+    response = await dynamic_mcp_bridge._handle_tools_list(
+        {"jsonrpc": "2.0", "id": 1, "method": "tools/list"}, request_id
+    )
+    payload = json.loads(response.body.decode()[len("data: "):])
+    return sorted(tool["name"] for tool in payload["result"]["tools"])
+
+
+@pytest.mark.asyncio
+async def test_scoped_tools_list_returns_only_request_tools(contexts):
+    """Test that a request's endpoint lists only its own functions."""
+    first, second = contexts
+
+    assert await _tools_list(first.request_id) == [
+        f"{first.request_id}_get_time",
+        f"{first.request_id}_get_weather",
+    ]
+    assert await _tools_list("000000000000") == []
+
+
+@pytest.mark.asyncio
+async def test_scoped_tools_call_rejects_other_requests(contexts):
+    """Test that a request's endpoint cannot call another request's functions."""
+    first, second = contexts
+    response = await dynamic_mcp_bridge._handle_tools_call(
+        {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "tools/call",
+            "params": {"name": f"{second.request_id}_get_time", "arguments": {}},
+        },
+        first.request_id,
+    )
+    body = "".join([chunk async for chunk in response.body_iterator])
+
+    assert json.loads(body[len("data: "):])["error"]["code"] == -32601
+    assert second.mcp_server.get_tool_calls() == []
+
+
+def test_mounted_bridge_serves_from_host_app(contexts):
+    """Test that a mounted bridge is served by the host app and needs no own server."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    first, _ = contexts
+    app = FastAPI()
+    dynamic_mcp_bridge.mount(app, "127.0.0.1", 8123)
+    try:
+        url = dynamic_mcp_bridge.get_request_url(first.request_id)
+        assert url == f"http://127.0.0.1:8123/mcp/r/{first.request_id}"
+
+        response = TestClient(app, client=("127.0.0.1", 50000)).post(
+            f"/mcp/r/{first.request_id}",
+            json={"jsonrpc": "2.0", "id": 1, "method": "tools/list"},
+        )
+        payload = json.loads(response.text[len("data: "):])
+        assert len(payload["result"]["tools"]) == 2
+        assert "access-control-allow-origin" not in response.headers
+    finally:
+        dynamic_mcp_bridge.unmount()
+
+    assert dynamic_mcp_bridge.mounted_path is None
+
+
+def test_no_shared_endpoint_lists_all_requests(contexts):
+    """Test that the standalone router has no endpoint exposing every request's functions."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    app = FastAPI()
+    app.include_router(dynamic_mcp_bridge.create_router())
+    message = {"jsonrpc": "2.0", "id": 1, "method": "tools/list"}
+
+    assert TestClient(app).post("/", json=message).status_code in (404, 405)
+
+
+def test_mounted_bridge_is_scoped_and_local_only(contexts):
+    """Test that a mounted bridge serves no aggregate endpoint and refuses remote peers."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    first, _ = contexts
+    app = FastAPI()
+    dynamic_mcp_bridge.mount(app, "127.0.0.1", 8123)
+    try:
+        message = {"jsonrpc": "2.0", "id": 1, "method": "tools/list"}
+        local = TestClient(app, client=("127.0.0.1", 50000))
+        remote = TestClient(app, client=("203.0.113.7", 50000))
+
+        assert local.post("/mcp/", json=message).status_code in (404, 405)
+        assert local.post(f"/mcp/r/{first.request_id}", json=message).status_code == 200
+        assert remote.post(f"/mcp/r/{first.request_id}", json=message).status_code == 403
+    finally:
+        dynamic_mcp_bridge.unmount()
+
+
+def test_identical_schemas_are_shared_across_requests(contexts):
+    """Test that requests resending the same definitions share cached schemas."""
+    first, second = contexts
+    first_tool = first.mcp_server.get_tools()[0]
+    second_tool = second.mcp_server.get_tools()[0]
+
+    assert first_tool.input_schema is second_tool.input_schema
+    assert json.loads(first.mcp_server.tools_json)[0] == {
+        "name": first_tool.name,
+        "description": first_tool.description,
+        "inputSchema": first_tool.input_schema,
+    }
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets only")
+def test_unix_socket_is_private_and_replaces_only_sockets(tmp_path):
+    """Test that the bridge socket is 0600, replaces stale sockets and spares other files."""
+    bridge = DynamicMcpBridge()
+    path = str(tmp_path / "bridge.sock")
+
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+
+    sock = bridge._bind_socket("127.0.0.1", 0, path)
+    sock.close()
+    assert stat.S_ISSOCK(os.lstat(path).st_mode)
+    assert stat.S_IMODE(os.lstat(path).st_mode) == 0o600
+    assert os.listdir(tmp_path) == ["bridge.sock"]
+
+    regular = tmp_path / "notes.txt"
+    regular.write_text("keep me")
+    with pytest.raises(FileExistsError):
+        bridge._bind_socket("127.0.0.1", 0, str(regular))
+    assert regular.read_text() == "keep me"
@@ -0,0 +1,60 @@
+"""
+Unit tests for the jsoncodec backends.
+"""
+
+import json
+
+import pytest
+
+from agentwrap import jsoncodec
+
+
+pytestmark = pytest.mark.unit
+
+
+def _available_backends():
+    backends = ["json"]
+    for name in ("orjson", "msgspec"):
+        try:
+            __import__(name)
+            backends.append(name)
+        except ImportError:
+            pass
+    return backends
+
+
+@pytest.fixture(params=_available_backends())
+def backend(request):
+    """Run a test against each installed backend, restoring the default afterwards."""
+    default = jsoncodec.BACKEND
+    jsoncodec.use_backend(request.param)
+    yield request.param
+    jsoncodec.use_backend(default)
+
+
+def test_round_trip_is_compact_utf8(backend):
+    """Test that all backends produce the same compact output."""
+    data = {"city": "Zürich", "n": [1, 2.5, None, True]}
+
+    encoded = jsoncodec.dumps(data)
+
+    assert encoded == '{"city":"Zürich","n":[1,2.5,null,true]}'
+    assert jsoncodec.loads(encoded) == data
+    assert jsoncodec.loads(encoded.encode("utf-8") + b"\n") == data
+
+
+def test_invalid_json_raises_decode_error(backend):
+    """Test that malformed input raises one of the backend's DecodeError types."""
+    with pytest.raises(jsoncodec.DecodeError):
+        jsoncodec.loads('{"type": ')
+
+
+def test_unsupported_values_fall_back_to_stdlib(backend):
+    """Test that values fast backends reject are still encoded."""
+    assert json.loads(jsoncodec.dumps({"big": 2**70})) == {"big": 2**70}
+
+
+def test_unknown_backend_is_rejected():
+    """Test that use_backend() validates the name."""
+    with pytest.raises(ValueError):
+        jsoncodec.use_backend("simplejson")
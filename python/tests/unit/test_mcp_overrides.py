@@ -0,0 +1,118 @@
+"""
+Unit tests for passing per-run MCP skills to codex as -c flags.
+"""
+
+import sys
+
+import pytest
+
+from agentwrap import AllAgentConfigs, CodexAgent, CodexProcessPool
+from agentwrap.agents import codex_agent
+
+
+pytestmark = pytest.mark.unit
+
+
+def _overrides(*skills):
+    return AllAgentConfigs.from_dict({"agent_config": {}, "skills": list(skills)})
+
+
+def test_sse_and_stdio_skills_become_flags():
+    """Test the -c flags generated for each MCP transport."""
+    overrides = _overrides(
+        {
+            "type": "mcp",
+            "transport": "sse",
+            "name": "userDefinedFunctions",
+            "url": "http://127.0.0.1:8000/mcp/r/abc",
+        },
+        {
+            "type": "mcp",
+            "transport": "stdio",
+            "command": "/usr/bin/python3",
+            "args": ["-m", "proxy", "/tmp/bridge.sock"],
+            "env": {"MODE": "fast"},
+            "config": {"tool_timeout_sec": 30},
+        },
+        {"type": "anthropic-skill", "path": "./skills/pdf"},
+    )
+
+    args = codex_agent._mcp_override_args(overrides.skills)
+
+    assert list(args) == [
+        "-c", 'mcp_servers.userDefinedFunctions.url="http://127.0.0.1:8000/mcp/r/abc"',
+        "-c", 'mcp_servers.-usr-bin-python3.command="/usr/bin/python3"',
+        "-c", 'mcp_servers.-usr-bin-python3.args=["-m", "proxy", "/tmp/bridge.sock"]',
+        "-c", "mcp_servers.-usr-bin-python3.tool_timeout_sec=30",
+        "-c", 'mcp_servers.-usr-bin-python3.env_vars=["MODE"]',
+    ]
+    assert codex_agent._mcp_override_env(overrides.skills) == {"MODE": "fast"}
+
+
+def test_generated_server_names_are_flag_safe():
+    """Test that dots in generated names cannot split the -c key."""
+    overrides = _overrides({"type": "mcp", "transport": "sse", "url": "http://example.com/mcp"})
+
+    args = codex_agent._mcp_override_args(overrides.skills)
+
+    assert args == ("-c", 'mcp_servers.http-example_com-mcp.url="http://example.com/mcp"')
+
+
+def test_run_passes_override_skills_without_touching_config_toml(monkeypatch, tmp_path):
+    """Test that override MCP skills reach the command, not config.toml."""
+    config_path = tmp_path / "config.toml"
+    monkeypatch.setattr(codex_agent, "CODEX_CONFIG_PATH", config_path)
+    agent = CodexAgent()
+    overrides = _overrides(
+        {"type": "mcp", "transport": "sse", "name": "fns", "url": "http://h/r/1"}
+    )
+
+    config, prompt, thread_id, mcp_args, mcp_env = agent._prepare_run("hi", overrides)
+    cmd = agent._build_command(config, prompt, thread_id, mcp_args=mcp_args)
+
+    assert cmd[-3:] == ["-c", 'mcp_servers.fns.url="http://h/r/1"', "hi"]
+    assert mcp_env == {}
+    assert not config_path.exists()
+
+
+def test_stdio_skill_env_stays_off_the_command_line():
+    """Test that env values reach codex's environment, not its argv."""
+    agent = CodexAgent()
+    overrides = _overrides(
+        {
+            "type": "mcp",
+            "transport": "stdio",
+            "name": "db",
+            "command": "db-mcp",
+            "env": {"DB_TOKEN": "s3cret"},
+        }
+    )
+
+    config, prompt, thread_id, mcp_args, mcp_env = agent._prepare_run("hi", overrides)
+    cmd = agent._build_command(config, prompt, thread_id, mcp_args=mcp_args)
+
+    assert not any("s3cret" in arg for arg in cmd)
+    assert 'mcp_servers.db.env_vars=["DB_TOKEN"]' in cmd
+    assert agent._process_env(mcp_env)["DB_TOKEN"] == "s3cret"
+
+
+@pytest.mark.asyncio
+async def test_runs_with_override_skills_bypass_the_pool(monkeypatch):
+    """Test that per-run MCP servers spawn fresh processes instead of pooled ones."""
+    pool = CodexProcessPool(min_size=1, max_size=2)
+    agent = CodexAgent(process_pool=pool)
+    monkeypatch.setattr(agent, "check_prerequisites", lambda: None)
+    monkeypatch.setattr(
+        agent,
+        "_build_command",
+        lambda *args, **kwargs: [sys.executable, "-c", "print('{}')"],
+    )
+    overrides = _overrides({"type": "mcp", "transport": "sse", "url": "http://h/r/1"})
+
+    try:
+        events = [event async for event in agent.arun("hi", overrides)]
+    finally:
+        await pool.close()
+
+    assert events == []
+    assert pool.stats()["misses"] == 0
@@ -0,0 +1,105 @@
+"""
+Unit tests for the stdio to Unix socket MCP proxy.
+"""
+
+import io
+import json
+import socketserver
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from agentwrap.server import mcp_uds_proxy
+from agentwrap.server.dynamic_mcp_bridge import DynamicMcpBridge
+
+
+pytestmark = pytest.mark.unit
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    """Answers JSON-RPC requests as SSE and notifications with 202, like the bridge."""
+
+    protocol_version = "HTTP/1.1"
+    paths = []
+
+    def address_string(self):
+        return "unix"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        message = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.paths.append(self.path)
+
+        if "id" not in message:
+            self.send_response(202)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        reply = {"jsonrpc": "2.0", "id": message["id"], "result": {"method": message["method"]}}
+        body = f"data: {json.dumps(reply)}\n\n".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    """Serve _EchoHandler on a Unix socket."""
+    path = str(tmp_path / "bridge.sock")
+    server = socketserver.ThreadingUnixStreamServer(path, _EchoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield path
+    server.shutdown()
+    server.server_close()
+
+
+def test_parse_messages_handles_sse_and_json():
+    """Test that SSE data lines and plain JSON bodies are both extracted."""
+    assert mcp_uds_proxy.parse_messages('data: {"id": 1}\n\n') == ['{"id": 1}']
+    assert mcp_uds_proxy.parse_messages('{"id": 1}') == ['{"id": 1}']
+    assert mcp_uds_proxy.parse_messages("") == []
+
+
+def test_proxy_relays_requests_to_request_endpoint(socket_path):
+    """Test that requests are answered on stdout and notifications produce no output."""
+    _EchoHandler.paths = []
+    stdin = io.StringIO(
+        json.dumps({"jsonrpc": "2.0", "id": 1, "method": "initialize"}) + "\n"
+        + json.dumps({"jsonrpc": "2.0", "method": "notifications/initialized"}) + "\n"
+        + json.dumps({"jsonrpc": "2.0", "id": 2, "method": "tools/list"}) + "\n"
+    )
+    stdout = io.StringIO()
+
+    mcp_uds_proxy.run(socket_path, "abc123", stdin=stdin, stdout=stdout)
+
+    replies = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert [reply["result"]["method"] for reply in replies] == ["initialize", "tools/list"]
+    assert set(_EchoHandler.paths) == {"/r/abc123"}
+
+
+def test_proxy_script_starts_without_server_dependencies(socket_path):
+    """Test that codex's proxy command relays messages without importing agentwrap or fastapi."""
+    bridge = DynamicMcpBridge()
+    bridge.uds_path = socket_path
+    skill = bridge.get_request_skill("abc123")
+
+    result = subprocess.run(
+        [skill["command"], "-X", "importtime", *skill["args"]],
+        input=json.dumps({"jsonrpc": "2.0", "id": 1, "method": "initialize"}) + "\n",
+        capture_output=True,
+        text=True,
+        timeout=10,
+    )
+
+    assert json.loads(result.stdout)["result"]["method"] == "initialize"
+    imported = {line.split("|")[-1].strip() for line in result.stderr.splitlines()}
+    assert "http.client" in imported
+    assert not {"agentwrap", "fastapi", "uvicorn"} & imported
@@ -0,0 +1,116 @@
+"""
+Unit tests for ThreadSessionStore.
+"""
+
+import pytest
+
+from agentwrap.server.session_store import ThreadSessionStore, fingerprint_prefixes
+
+
+pytestmark = pytest.mark.unit
+
+
+def _conversation():
+    return [
+        {"role": "user", "content": "What's the weather in Paris?"},
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": "call_1",
+                    "type": "function",
+                    "function": {"name": "get_weather", "arguments": '{"city": "Paris"}'},
+                }
+            ],
+        },
+    ]
+
+
+def test_fingerprints_are_prefix_stable():
+    """Test that appending messages does not change earlier prefix fingerprints."""
+    messages = _conversation()
+    extended = messages + [{"role": "tool", "tool_call_id": "call_1", "content": "sunny"}]
+
+    assert fingerprint_prefixes(extended)[:2] == fingerprint_prefixes(messages)
+
+
+def test_fingerprints_ignore_extra_fields():
+    """Test that fields clients add when echoing messages do not change fingerprints."""
+    messages = _conversation()
+    echoed = [dict(messages[0]), {**messages[1], "refusal": None}]
+
+    assert fingerprint_prefixes(echoed) == fingerprint_prefixes(messages)
+
+
+def test_find_returns_longest_stored_prefix():
+    """Test that find returns the thread and how many messages it already holds."""
+    store = ThreadSessionStore()
+    messages = _conversation()
+    store.put(messages, "thread-1")
+
+    next_turn = messages + [{"role": "tool", "tool_call_id": "call_1", "content": "sunny"}]
+    assert store.find(next_turn) == ("thread-1", 2)
+
+
+def test_find_requires_new_messages():
+    """Test that an identical conversation is not resumed (nothing new to send)."""
+    store = ThreadSessionStore()
+    messages = _conversation()
+    store.put(messages, "thread-1")
+
+    assert store.find(messages) is None
+
+
+def test_discard_forgets_thread():
+    """Test that discarded threads are no longer found."""
+    store = ThreadSessionStore()
+    messages = _conversation()
+    store.put(messages, "thread-1")
+    store.discard("thread-1")
+
+    assert store.find(messages + [{"role": "user", "content": "again"}]) is None
+    assert len(store) == 0
+
+
+def test_lru_eviction():
+    """Test that the least recently used conversation is evicted."""
+    store = ThreadSessionStore(max_entries=1)
+    store.put([{"role": "user", "content": "a"}], "thread-a")
+    store.put([{"role": "user", "content": "b"}], "thread-b")
+
+    assert store.find([{"role": "user", "content": "a"}, {"role": "user", "content": "x"}]) is None
+    assert store.find([{"role": "user", "content": "b"}, {"role": "user", "content": "x"}]) == (
+        "thread-b",
+        1,
+    )
+
+
+def test_scopes_do_not_share_threads():
+    """Test that equal histories in different scopes resume different threads."""
+    store = ThreadSessionStore()
+    messages = _conversation()
+    store.put(messages, "thread-alice", scope="alice")
+
+    next_turn = messages + [{"role": "tool", "tool_call_id": "call_1", "content": "sunny"}]
+    assert store.find(next_turn, scope="alice") == ("thread-alice", 2)
+    assert store.find(next_turn, scope="bob") is None
+    assert store.find(next_turn) is None
+
+
+def test_server_scope_covers_model_functions_and_user():
+    """Test that the server's session scope changes with model, tools and user."""
+    from agentwrap.server.types import ChatCompletionRequest
+    from agentwrap.servers.openai_compatible import OpenAICompatibleServer
+
+    server = OpenAICompatibleServer(agent=None)
+    base = ChatCompletionRequest(model="m", messages=[], user="alice")
+    functions = [{"name": "get_weather", "parameters": {}}]
+
+    scopes = {
+        server._session_scope(base, []),
+        server._session_scope(ChatCompletionRequest(model="other", messages=[], user="alice"), []),
+        server._session_scope(base, functions),
+        server._session_scope(ChatCompletionRequest(model="m", messages=[], user="bob"), []),
+    }
+    assert len(scopes) == 4
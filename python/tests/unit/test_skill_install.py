@@ -0,0 +1,183 @@
+"""
+Unit tests for skill installation caching, MCP server configuration and
+isolated codex homes.
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+import toml
+
+from agentwrap.agents import codex_agent
+from agentwrap.config import (
+    AllAgentConfigs,
+    AnthropicSkillConfig,
+    CodexAgentConfig,
+    MCPSSESkillConfig,
+    MCPStdioSkillConfig,
+)
+
+
+pytestmark = pytest.mark.unit
+
+FIXTURE_SKILL = Path(__file__).parent.parent / "fixtures" / "skills" / "echo_skill"
+
+
+@pytest.fixture
+def skills_dir(tmp_path, monkeypatch):
+    """Install skills into a temporary codex skills directory."""
+    target = tmp_path / "skills"
+    target.mkdir()
+    monkeypatch.setattr(codex_agent, "CODEX_SKILLS_DIR", target)
+    return target
+
+
+@pytest.fixture
+def skill_source(tmp_path):
+    """Copy of the echo skill fixture that tests can modify."""
+    source = tmp_path / "src" / "echo_skill"
+    shutil.copytree(FIXTURE_SKILL, source, ignore=shutil.ignore_patterns("__pycache__"))
+    return source
+
+
+def _install(source: Path) -> None:
+    codex_agent._install_anthropic_skill(AnthropicSkillConfig(path=str(source)))
+
+
+def test_install_copies_skill(skills_dir, skill_source):
+    """Test that a skill is installed with its files and an install marker."""
+    _install(skill_source)
+
+    installed = skills_dir / "echo_skill"
+    assert (installed / "SKILL.md").read_text() == (skill_source / "SKILL.md").read_text()
+    assert (installed / "scripts" / "echo.py").exists()
+    assert (installed / codex_agent.SKILL_MARKER_NAME).exists()
+
+
+def test_unchanged_skill_is_not_reinstalled(skills_dir, skill_source):
+    """Test that reinstalling an unchanged skill keeps the installed directory."""
+    _install(skill_source)
+    inode = (skills_dir / "echo_skill").stat().st_ino
+
+    _install(skill_source)
+    assert (skills_dir / "echo_skill").stat().st_ino == inode
+
+
+def test_touched_but_identical_skill_is_not_reinstalled(skills_dir, skill_source):
+    """Test that a newer mtime with identical content does not trigger a copy."""
+    _install(skill_source)
+    inode = (skills_dir / "echo_skill").stat().st_ino
+
+    skill_md = skill_source / "SKILL.md"
+    stat = skill_md.stat()
+    os.utime(skill_md, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    _install(skill_source)
+    assert (skills_dir / "echo_skill").stat().st_ino == inode
+
+
+def test_changed_skill_is_swapped_in(skills_dir, skill_source):
+    """Test that changed content replaces the installed skill without leftovers."""
+    _install(skill_source)
+
+    (skill_source / "scripts" / "extra.py").write_text("print('new')\n")
+    _install(skill_source)
+
+    assert (skills_dir / "echo_skill" / "scripts" / "extra.py").exists()
+    assert sorted(p.name for p in skills_dir.iterdir()) == ["echo_skill"]
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch):
+    """Write MCP servers into a temporary codex config.toml."""
+    path = tmp_path / "config.toml"
+    monkeypatch.setattr(codex_agent, "CODEX_CONFIG_PATH", path)
+    return path
+
+
+def test_mcp_servers_written_in_one_pass(config_path):
+    """Test that all MCP servers are merged into existing config in one write."""
+    config_path.write_text('model = "gpt-5"\n')
+    skills = [
+        MCPStdioSkillConfig(command="npx server-a", args=["--x"]),
+        MCPSSESkillConfig(url="http://127.0.0.1:9000"),
+    ]
+
+    codex_agent._configure_mcp_servers(skills)
+
+    config = toml.loads(config_path.read_text())
+    assert config["model"] == "gpt-5"
+    assert config["mcp_servers"]["npx"] == {"command": "npx server-a", "args": ["--x"]}
+    assert config["mcp_servers"]["http-127.0.0.1-9000"] == {"url": "http://127.0.0.1:9000"}
+
+
+def test_unchanged_mcp_servers_skip_write(config_path):
+    """Test that config.toml is not rewritten when servers are already configured."""
+    skills = [MCPSSESkillConfig(url="http://127.0.0.1:9000")]
+    codex_agent._configure_mcp_servers(skills)
+    mtime = config_path.stat().st_mtime_ns
+
+    os.utime(config_path, ns=(mtime - 10**9, mtime - 10**9))
+    codex_agent._configure_mcp_servers(skills)
+
+    assert config_path.stat().st_mtime_ns == mtime - 10**9
+
+
+@pytest.fixture
+def homes_dir(tmp_path, monkeypatch):
+    """Materialize isolated codex homes under a temporary directory."""
+    target = tmp_path / "codex-homes"
+    monkeypatch.setattr(codex_agent, "CODEX_HOMES_DIR", target)
+    monkeypatch.setattr(codex_agent, "CODEX_AUTH_PATH", tmp_path / "global" / "auth.json")
+    monkeypatch.setattr(codex_agent, "_codex_homes", {})
+    return target
+
+
+def test_isolated_home_holds_auth_and_skills(homes_dir, config_path, skill_source):
+    """Test that an isolated home gets its own auth, skills and seeded config."""
+    config_path.write_text('model = "gpt-5"\n')
+    config = AllAgentConfigs(
+        agent_config=CodexAgentConfig(isolated_home=True),
+        skills=[
+            AnthropicSkillConfig(path=str(skill_source)),
+            MCPSSESkillConfig(url="http://127.0.0.1:9000"),
+        ],
+    )
+
+    home = codex_agent._materialize_codex_home(config, "sk-test")
+
+    assert home.parent == homes_dir
+    assert json.loads((home / "auth.json").read_text()) == {"OPENAI_API_KEY": "sk-test"}
+    assert (home / "skills" / "echo_skill" / "SKILL.md").exists()
+    home_config = toml.loads((home / "config.toml").read_text())
+    assert home_config["model"] == "gpt-5"
+    assert "http-127.0.0.1-9000" in home_config["mcp_servers"]
+    # The global config is left untouched
+    assert "mcp_servers" not in toml.loads(config_path.read_text())
+
+
+def test_isolated_home_is_cached_by_config(homes_dir, config_path):
+    """Test that identical configs share a home and different ones do not."""
+    config = AllAgentConfigs(agent_config=CodexAgentConfig(isolated_home=True))
+    other = AllAgentConfigs(
+        agent_config=CodexAgentConfig(isolated_home=True),
+        skills=[MCPSSESkillConfig(url="http://127.0.0.1:9000")],
+    )
+
+    home = codex_agent._materialize_codex_home(config, "sk-test")
+
+    assert codex_agent._materialize_codex_home(config, "sk-test") == home
+    assert codex_agent._materialize_codex_home(other, "sk-test") != home
+    assert codex_agent._materialize_codex_home(config, "sk-other") != home
+
+
+def test_isolated_home_is_passed_in_environment():
+    """Test that codex processes get CODEX_HOME when a home is materialized."""
+    agent = codex_agent.CodexAgent()
+    assert agent._process_env() is None
+
+    agent.codex_home = Path("/tmp/codex-home")
+    assert agent._process_env()["CODEX_HOME"] == "/tmp/codex-home"
@@ -0,0 +1,76 @@
+"""
+Unit tests for draining codex stderr while a run streams stdout.
+
+A small Python command stands in for codex: it writes far more than a pipe
+buffer to stderr before its only stdout event, then fails.
+"""
+
+import sys
+
+import pytest
+
+from agentwrap import CodexAgent, ErrorEvent, MessageEvent
+from agentwrap.agents import codex_agent
+
+
+pytestmark = pytest.mark.unit
+
+NOISY_CODEX = [
+    sys.executable,
+    "-c",
+    "import sys\n"
+    "for i in range(4096):\n"
+    "    sys.stderr.write(f'warning {i:04d} ' + 'x' * 240 + '\\n')\n"
+    "sys.stderr.flush()\n"
+    "print('{\"type\":\"item.completed\",\"item\":{\"type\":\"agent_message\",\"text\":\"hi\"}}')\n"
+    "sys.exit(3)\n",
+]
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    agent = CodexAgent()
+    monkeypatch.setattr(agent, "check_prerequisites", lambda: None)
+    monkeypatch.setattr(agent, "_build_command", lambda *args, **kwargs: NOISY_CODEX)
+    return agent
+
+
+def _check_events(events):
+    assert isinstance(events[0], MessageEvent)
+    error = events[-1]
+    assert isinstance(error, ErrorEvent)
+    assert error.content.endswith("warning 4095 " + "x" * 240 + "\n")
+    assert "earlier bytes of stderr dropped" in error.content
+    assert len(error.content) < codex_agent.STDERR_TAIL_BYTES + 200
+    assert error.metadata["returncode"] == 3
+
+
+def test_run_drains_stderr_beyond_pipe_buffer(agent):
+    """Test that the sync run does not stall on a full stderr pipe."""
+    _check_events(list(agent.run("hello")))
+
+
+@pytest.mark.asyncio
+async def test_arun_keeps_bounded_stderr_tail(agent):
+    """Test that the async run reports only the tail of stderr."""
+    _check_events([event async for event in agent.arun("hello")])
+
+
+def test_tail_drops_oldest_chunks():
+    """Test that the tail keeps the newest bytes within its limit."""
+    tail = codex_agent._StderrTail(limit=10)
+    for chunk in (b"aaaa", b"bbbb", b"cccc", b"dddd"):
+        tail.append(chunk)
+
+    assert tail.text() == "[... 6 earlier bytes of stderr dropped]\nbbccccdddd"
+
+
+def test_error_event_reports_the_bytes_it_dropped():
+    """Test that the dropped count in metadata matches the one in the content."""
+    tail = codex_agent._StderrTail(limit=10)
+    tail.append(b"x" * 25)
+
+    error = tail.error_event(returncode=1)
+
+    assert error.metadata["stderr_dropped_bytes"] == 15
+    assert "[... 15 earlier bytes of stderr dropped]" in error.content
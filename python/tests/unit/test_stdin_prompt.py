@@ -0,0 +1,108 @@
+"""
+Unit tests for sending large prompts to codex over stdin.
+
+A small Python command stands in for codex: it reports the prompt it got,
+reading stdin when the prompt argument is "-".
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from agentwrap import CodexAgent
+from agentwrap.agents import codex_agent
+
+
+pytestmark = pytest.mark.unit
+
+ECHO_CODEX = (
+    "import json, sys\n"
+    "prompt = sys.stdin.buffer.read().decode('utf-8') if sys.argv[1] == '-' else sys.argv[1]\n"
+    "text = json.dumps({'via': 'stdin' if sys.argv[1] == '-' else 'argv', 'size': len(prompt)})\n"
+    "print(json.dumps({'type': 'item.completed', 'item': {'type': 'agent_message', 'text': text}}))\n"
+)
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    agent = CodexAgent()
+    monkeypatch.setattr(agent, "check_prerequisites", lambda: None)
+    monkeypatch.setattr(
+        agent,
+        "_build_command",
+        lambda config, prompt, thread_id=None, **kwargs: [sys.executable, "-c", ECHO_CODEX, prompt],
+    )
+    return agent
+
+
+# Beyond the 128 KiB single-argument limit on Linux
+LARGE_PROMPT = "é" * (200 * 1024)
+
+
+def test_run_sends_large_prompt_over_stdin(agent):
+    """Test that the sync run pipes prompts above the threshold."""
+    small = list(agent.run("hello"))[0].content
+    large = list(agent.run(LARGE_PROMPT))[0].content
+
+    assert small == '{"via": "argv", "size": 5}'
+    assert large == f'{{"via": "stdin", "size": {len(LARGE_PROMPT)}}}'
+
+
+@pytest.mark.asyncio
+async def test_arun_sends_large_prompt_over_stdin(agent):
+    """Test that the async run pipes prompts above the threshold."""
+    events = [event async for event in agent.arun(LARGE_PROMPT)]
+
+    assert events[0].content == f'{{"via": "stdin", "size": {len(LARGE_PROMPT)}}}'
+
+
+def test_threshold_counts_utf8_bytes():
+    """Test that multi-byte characters count toward the threshold."""
+    limit = codex_agent.STDIN_PROMPT_THRESHOLD
+    assert not codex_agent._prompt_via_stdin("a" * limit)
+    assert codex_agent._prompt_via_stdin("é" * (limit // 2 + 1))
+
+
+def test_run_sends_utf8_prompt_under_ascii_locale(tmp_path):
+    """Test that the sync run does not depend on the locale to encode the prompt."""
+    script = (
+        "import sys\n"
+        "from agentwrap import CodexAgent\n"
+        "agent = CodexAgent()\n"
+        "agent.check_prerequisites = lambda: None\n"
+        "agent._build_command = lambda config, prompt, thread_id=None, **kwargs: "
+        "[sys.executable, '-c', sys.argv[1], prompt]\n"
+        "print(list(agent.run('\\u00e9' * 40000))[0].content)\n"
+    )
+    env = {**os.environ, "LC_ALL": "C", "LANG": "C", "PYTHONUTF8": "0"}
+
+    result = subprocess.run(
+        [sys.executable, "-c", script, ECHO_CODEX],
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=30,
+    )
+
+    assert result.stdout.strip() == '{"via": "stdin", "size": 40000}', result.stderr
+
+
+def test_prompt_stream_is_closed_when_write_fails():
+    """Test that stdin is closed even if writing the prompt raises."""
+
+    class _Stream:
+        closed = False
+
+        def write(self, data):
+            raise UnicodeEncodeError("ascii", data, 0, 1, "ordinal not in range(128)")
+
+        def close(self):
+            self.closed = True
+
+    stream = _Stream()
+    with pytest.raises(UnicodeEncodeError):
+        codex_agent._write_prompt_sync(stream, "é")
+
+    assert stream.closed
@@ -0,0 +1,92 @@
+"""
+Unit tests for streaming tool_calls deltas from OpenAICompatibleServer.
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+
+from agentwrap.events import ThreadStartedEvent
+from agentwrap.server.dynamic_mcp_bridge import dynamic_mcp_bridge
+from agentwrap.server.dynamic_mcp_server import TerminationPolicy
+from agentwrap.server.types import ChatCompletionRequest
+from agentwrap.servers.openai_compatible import OpenAICompatibleServer, OpenAIServerOptions
+
+
+pytestmark = pytest.mark.unit
+
+TOOLS = [
+    {
+        "type": "function",
+        "function": {"name": "get_weather", "parameters": {"properties": {"city": {"type": "string"}}}},
+    }
+]
+
+
+class _CallingAgent:
+    """Stands in for codex: calls get_weather twice, then keeps thinking."""
+
+    def __init__(self):
+        self.calls_streamed_before_stop = None
+
+    def run(self, agent_input, config_overrides=None):
+        return iter(())
+
+    async def arun(self, agent_input, config_overrides=None):
+        request_id = config_overrides.skills[0].url.rsplit("/", 1)[-1]
+        mcp_server = dynamic_mcp_bridge.requests[request_id].mcp_server
+
+        yield ThreadStartedEvent(thread_id="thread-1")
+        for city in ("Paris", "Tokyo"):
+            mcp_server.handle_request(
+                {
+                    "jsonrpc": "2.0",
+                    "id": city,
+                    "method": "tools/call",
+                    "params": {"name": f"{request_id}_get_weather", "arguments": {"city": city}},
+                }
+            )
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(60)
+
+
+@pytest.fixture
+def mounted_bridge():
+    """Mount the bridge on a dummy app so no standalone server is started."""
+    dynamic_mcp_bridge.mount(FastAPI(), "127.0.0.1", 8123)
+    yield
+    dynamic_mcp_bridge.unmount()
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_are_streamed_as_they_are_recorded(mounted_bridge):
+    """Test that each recorded call is streamed as a delta.tool_calls chunk."""
+    options = OpenAIServerOptions(
+        mcp_bridge_on_host=False,
+        termination_policy=TerminationPolicy(delay_ms=300, terminate_on_boundary=False),
+    )
+    server = OpenAICompatibleServer(_CallingAgent(), options)
+    request = ChatCompletionRequest(
+        model="agentwrap-codex",
+        messages=[{"role": "user", "content": "Weather in Paris and Tokyo?"}],
+        tools=TOOLS,
+        stream=True,
+    )
+
+    response = await server.handle_request(request)
+    chunks = []
+    async for line in response.body_iterator:
+        if line.startswith("data: {"):
+            chunks.append(json.loads(line[len("data: "):]))
+
+    tool_call_deltas = [
+        chunk["choices"][0]["delta"]["tool_calls"][0]
+        for chunk in chunks
+        if "tool_calls" in chunk["choices"][0]["delta"]
+    ]
+    assert [delta["index"] for delta in tool_call_deltas] == [0, 1]
+    assert [delta["function"]["name"] for delta in tool_call_deltas] == ["get_weather"] * 2
+    assert json.loads(tool_call_deltas[1]["function"]["arguments"]) == {"city": "Tokyo"}
+    assert chunks[-1]["choices"][0]["finish_reason"] == "tool_calls"
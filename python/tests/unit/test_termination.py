@@ -0,0 +1,116 @@
+"""
+Unit tests for stopping agent runs when a function call terminates them.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from agentwrap import CodexAgent
+from agentwrap.agents import codex_agent
+from agentwrap.servers.openai_compatible import OpenAICompatibleServer
+
+
+pytestmark = pytest.mark.unit
+
+
+class _StubAgent:
+    """Agent stand-in; the server only needs it for construction."""
+
+    def run(self, agent_input, config_overrides=None):
+        return iter(())
+
+
+async def _slow_events(closed):
+    """Emit one event, then hang like codex waiting on the model."""
+    try:
+        yield "first"
+        await asyncio.sleep(60)
+        yield "never"
+    finally:
+        closed.append(True)
+
+
+@pytest.mark.asyncio
+async def test_stop_event_interrupts_pending_read():
+    """Test that setting the stop event ends the stream without waiting for the agent."""
+    server = OpenAICompatibleServer(_StubAgent())
+    stop_event = asyncio.Event()
+    closed = []
+    received = []
+
+    loop = asyncio.get_running_loop()
+    loop.call_later(0.05, stop_event.set)
+
+    start = time.monotonic()
+    async for event in server._until_stopped(_slow_events(closed), stop_event):
+        received.append(event)
+
+    assert received == ["first"]
+    assert closed == [True]
+    assert time.monotonic() - start < 1
+
+
+@pytest.mark.asyncio
+async def test_process_group_is_reaped_in_background():
+    """Test that terminated codex processes are signalled and reaped without blocking."""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-c", "import time; time.sleep(60)", start_new_session=True
+    )
+
+    codex_agent._signal_process_group(process, codex_agent.signal.SIGTERM)
+    await asyncio.wait_for(codex_agent._reap_process_group(process), timeout=5)
+
+    assert process.returncode is not None
+
+
+def test_process_signalled_directly_without_process_groups(monkeypatch):
+    """Test that platforms without os.killpg (Windows) signal the process itself."""
+    process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    monkeypatch.delattr(codex_agent.os, "killpg")
+
+    codex_agent._signal_process_group(process, codex_agent.signal.SIGTERM)
+
+    assert process.wait(timeout=5) is not None
+
+
+@pytest.mark.asyncio
+async def test_cancel_while_sending_prompt_terminates_codex(monkeypatch, tmp_path):
+    """Test that a run cancelled before codex read its prompt does not leak the process."""
+    pid_file = tmp_path / "pid"
+    # Never reads stdin, so a large prompt blocks in drain()
+    stuck_codex = [
+        sys.executable,
+        "-c",
+        f"import os, time; open({str(pid_file)!r}, 'w').write(str(os.getpid())); time.sleep(60)",
+    ]
+    agent = CodexAgent()
+    monkeypatch.setattr(agent, "check_prerequisites", lambda: None)
+    monkeypatch.setattr(agent, "_build_command", lambda *args, **kwargs: stuck_codex)
+
+    async def consume():
+        async for _ in agent.arun("x" * (1024 * 1024)):
+            pass
+
+    task = asyncio.ensure_future(consume())
+    for _ in range(100):
+        if pid_file.exists() and pid_file.read_text():
+            break
+        await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    pid = int(pid_file.read_text())
+    for _ in range(100):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            break
+        await asyncio.sleep(0.05)
+    else:
+        pytest.fail("codex process was not terminated")
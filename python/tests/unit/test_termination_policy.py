@@ -0,0 +1,188 @@
+"""
+Unit tests for TerminationPolicy batching of user-defined function calls.
+"""
+
+import threading
+import time
+
+import pytest
+
+from agentwrap.server.dynamic_mcp_server import (
+    DynamicMcpServer,
+    InvalidTerminationPolicyError,
+    TerminationPolicy,
+    TerminationStats,
+)
+
+
+pytestmark = pytest.mark.unit
+
+FUNCTIONS = [{"name": "get_weather", "parameters": {"properties": {"city": {"type": "string"}}}}]
+
+
+def _server(policy: TerminationPolicy, stats=None):
+    server = DynamicMcpServer(FUNCTIONS, termination_policy=policy, termination_stats=stats)
+    terminated = threading.Event()
+    batches = []
+
+    def on_terminate(tool_calls):
+        batches.append(tool_calls)
+        terminated.set()
+
+    server.on_terminate(on_terminate)
+    return server, terminated, batches
+
+
+def _call(server, city: str) -> None:
+    server.handle_request(
+        {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "tools/call",
+            "params": {"name": "get_weather", "arguments": {"city": city}},
+        }
+    )
+
+
+def test_deadline_respects_min_and_max():
+    """Test that the stop time is clamped to [first + min, first + max]."""
+    policy = TerminationPolicy(delay_ms=2000, min_delay_ms=500, max_delay_ms=1000)
+
+    assert policy.deadline(first_call_at=0.0, now=0.0) == 1.0
+    assert policy.deadline(first_call_at=0.0, now=0.0, boundary=True) == 0.5
+
+
+def test_overrides_reject_unknown_fields():
+    """Test that per-request overrides replace fields and reject unknown ones."""
+    policy = TerminationPolicy().with_overrides({"delay_ms": 50})
+    assert policy.delay_ms == 50
+
+    with pytest.raises(ValueError):
+        policy.with_overrides({"delay": 50})
+    with pytest.raises(ValueError):
+        policy.with_overrides({"delay_ms": -1})
+
+
+def test_boundary_terminates_before_delay():
+    """Test that the run stops once all call results reached the agent."""
+    stats = TerminationStats()
+    server, terminated, batches = _server(
+        TerminationPolicy(delay_ms=10000, boundary_grace_ms=0), stats
+    )
+
+    server.notify_call_started()
+    server.notify_call_started()
+    _call(server, "Paris")
+    _call(server, "Tokyo")
+    server.notify_call_completed()
+    assert not terminated.wait(0.1)
+
+    server.notify_call_completed()
+    assert terminated.wait(1)
+    assert len(batches[0]) == 2
+
+    snapshot = stats.snapshot()
+    assert snapshot["batches"] == 1
+    assert snapshot["batch_sizes"] == {"2": 1}
+    assert snapshot["reasons"] == {"boundary": 1}
+
+
+def test_delay_applies_without_boundary():
+    """Test that the quiet-period delay still applies when boundaries are disabled."""
+    server, terminated, _ = _server(TerminationPolicy(delay_ms=50, terminate_on_boundary=False))
+
+    start = time.monotonic()
+    server.notify_call_started()
+    _call(server, "Paris")
+    server.notify_call_completed()
+
+    assert terminated.wait(1)
+    assert time.monotonic() - start >= 0.05
+
+
+def test_turn_completed_terminates_once():
+    """Test that finishing the turn stops the run immediately, exactly once."""
+    server, terminated, batches = _server(TerminationPolicy(delay_ms=10000))
+
+    _call(server, "Paris")
+    server.notify_turn_completed()
+    server.notify_turn_completed()
+
+    assert terminated.is_set()
+    assert len(batches) == 1
+
+
+def test_overrides_reject_wrong_types():
+    """Test that malformed per-request overrides are rejected, not passed through."""
+    policy = TerminationPolicy()
+
+    for overrides in (
+        [1],
+        {"delay_ms": "50"},
+        {"delay_ms": 1.5},
+        {"delay_ms": True},
+        {"terminate_on_boundary": 1},
+    ):
+        with pytest.raises(InvalidTerminationPolicyError):
+            policy.with_overrides(overrides)
+
+
+def test_overrides_clamped_to_server_maximum():
+    """Test that overrides cannot hold a run open longer than the server allows."""
+    policy = TerminationPolicy(max_delay_ms=1000).with_overrides(
+        {"delay_ms": 10**9, "min_delay_ms": 10**9}, max_ms=5000
+    )
+
+    assert policy.delay_ms == 5000
+    assert policy.min_delay_ms == 1000
+    assert policy.deadline(first_call_at=0.0, now=0.0) == 1.0
+
+    uncapped = TerminationPolicy().with_overrides({"max_delay_ms": None}, max_ms=5000)
+    assert uncapped.max_delay_ms == 5000
+
+
+def test_invalid_override_is_a_bad_request():
+    """Test that the chat completions route answers malformed overrides with a 400."""
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from agentwrap.servers.openai_compatible import OpenAICompatibleServer
+
+    app = FastAPI()
+    OpenAICompatibleServer(agent=None).register_routes(app)
+
+    response = TestClient(app).post(
+        "/v1/chat/completions",
+        json={
+            "messages": [{"role": "user", "content": "hi"}],
+            "functions": FUNCTIONS,
+            "termination_policy": {"delay_ms": "soon"},
+        },
+    )
+
+    assert response.status_code == 400
+    assert response.json()["error"]["type"] == "invalid_request_error"
+
+
+def test_rejected_call_holds_off_boundary_until_retried():
+    """Test that a batch with a rejected call waits for its corrected retry."""
+    server, terminated, batches = _server(
+        TerminationPolicy(delay_ms=10000, boundary_grace_ms=0)
+    )
+
+    server.notify_call_started()
+    server.notify_call_started()
+    _call(server, "Paris")
+    _call(server, 2)  # Invalid: city must be a string
+    server.notify_call_completed()
+    server.notify_call_completed()
+    assert not terminated.wait(0.2)
+
+    server.notify_call_started()
+    _call(server, "Tokyo")
+    server.notify_call_completed()
+    assert terminated.wait(1)
+    assert [call.function["arguments"] for call in batches[0]] == [
+        '{"city":"Paris"}',
+        '{"city":"Tokyo"}',
+    ]
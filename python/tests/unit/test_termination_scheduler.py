@@ -0,0 +1,68 @@
+"""
+Unit tests for TerminationScheduler.
+"""
+
+import threading
+import time
+
+import pytest
+
+from agentwrap.server.termination_scheduler import TerminationScheduler
+
+
+pytestmark = pytest.mark.unit
+
+
+def test_calls_run_in_deadline_order():
+    """Test that calls run in deadline order regardless of scheduling order."""
+    scheduler = TerminationScheduler()
+    order = []
+    done = threading.Event()
+
+    scheduler.call_later(0.06, lambda: (order.append("late"), done.set()))
+    scheduler.call_later(0.02, order.append, "early")
+    scheduler.call_later(0.04, order.append, "middle")
+
+    assert done.wait(1)
+    assert order == ["early", "middle", "late"]
+
+
+def test_cancelled_calls_do_not_run():
+    """Test that cancelled calls are skipped and not counted as pending."""
+    scheduler = TerminationScheduler()
+    ran = []
+    done = threading.Event()
+
+    call = scheduler.call_later(0.01, ran.append, "cancelled")
+    scheduler.call_later(0.03, done.set)
+    call.cancel()
+    assert scheduler.pending() == 1
+
+    assert done.wait(1)
+    assert ran == []
+
+
+def test_earlier_deadline_wakes_waiting_thread():
+    """Test that a new earliest deadline is not delayed by a later pending one."""
+    scheduler = TerminationScheduler()
+    done = threading.Event()
+
+    scheduler.call_later(10, lambda: None)
+    time.sleep(0.01)
+    start = time.monotonic()
+    scheduler.call_later(0.02, done.set)
+
+    assert done.wait(1)
+    assert time.monotonic() - start < 0.5
+
+
+def test_single_thread_for_many_deadlines():
+    """Test that many pending deadlines share one scheduler thread."""
+    scheduler = TerminationScheduler()
+    before = threading.active_count()
+
+    calls = [scheduler.call_later(10, lambda: None) for _ in range(200)]
+
+    assert threading.active_count() <= before + 1
+    for call in calls:
+        call.cancel()